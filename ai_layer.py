@@ -14,40 +14,148 @@ Scoring rubric (1 point each, direction-agnostic):
   6. No high impact event within 60 minutes?
   7. Volatility normal (not elevated or extreme)?
   8. Fewer than 3 SL hits today?
+
+Every Claude request goes through call_claude: a hard deadline, an
+optional hedged second request when the first is slow, and a circuit
+breaker that stops calling for a while after repeated failures (callers
+then fall back to neutral sentiment / no events). Within a trading cycle
+the only Claude call is sentiment, so a cycle spends at most
+SENTIMENT_DEADLINE in AI.
 """
 
 import anthropic
+import bisect
+import calendar
 import hashlib
 import json
-from datetime import datetime, timezone, date
-from config import ANTHROPIC_API_KEY, ASSET_CONFIG
-
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
-_sentiment_cache = {
-    "articles_hash": None,
-    "result":        None,
-}
-_calendar_cache = {
-    "date":   None,
-    "events": [],
-}
-
-
-def get_economic_calendar() -> list:
-    global _calendar_cache
-    today = date.today().isoformat()
-    if _calendar_cache["date"] == today and _calendar_cache["events"] is not None:
-        print(f"[AI] Using cached calendar ({len(_calendar_cache['events'])} events)")
-        return _calendar_cache["events"]
-
-    print("[AI] Fetching today's economic calendar via Claude...")
-    try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=500,
-            tools=[{"type": "web_search_20250305", "name": "web_search"}],
-            messages=[{"role": "user", "content": f"""Search for today's economic calendar {today}.
+import os
+import re
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone, date, timedelta
+from config import ANTHROPIC_API_KEY, ASSET_CONFIG, SENTIMENT_CONFIG
+from metrics import count, observe, timed
+
+# ─── Claude Calls ──────────────────────────────────────────────────────────────
+
+SENTIMENT_DEADLINE = 8       # seconds, hard cap per sentiment call
+CALENDAR_DEADLINE  = 45      # web search is slower; only runs outside the cycle
+HEDGE_AFTER        = 3       # seconds before a duplicate request is raced
+BREAKER_FAILURES   = 3       # consecutive failures that open the circuit
+BREAKER_COOLDOWN   = 300     # seconds the circuit stays open
+
+# Retries are the wrapper's job; the SDK timeout frees abandoned threads
+client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=CALENDAR_DEADLINE, max_retries=0)
+
+_claude_pool    = ThreadPoolExecutor(max_workers=4, thread_name_prefix="claude")
+_breaker        = {"failures": 0, "open_until": 0.0, "reason": ""}
+_breaker_lock   = threading.Lock()
+
+
+class ClaudeUnavailable(Exception):
+    """Raised by call_claude on deadline, error, or an open circuit."""
+
+
+def _record_failure(reason: str):
+    with _breaker_lock:
+        _breaker["failures"] += 1
+        # No credits will not fix itself on a retry — open straight away
+        if _breaker["failures"] >= BREAKER_FAILURES or "credit balance is too low" in reason:
+            _breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN
+            _breaker["reason"]     = reason
+            print(f"[AI] Circuit open for {BREAKER_COOLDOWN}s: {reason[:80]}")
+
+
+@timed("call_claude")
+def call_claude(deadline: float = SENTIMENT_DEADLINE, hedge_after: float = HEDGE_AFTER,
+                label: str = "claude", **request):
+    """
+    client.messages.create(**request) that returns within `deadline` seconds
+    or raises ClaudeUnavailable. If no answer has come after `hedge_after`
+    seconds a second identical request is raced against the first (None
+    disables hedging).
+    """
+    with _breaker_lock:
+        if time.monotonic() < _breaker["open_until"]:
+            count("claude_circuit_open")
+            raise ClaudeUnavailable(f"circuit open ({_breaker['reason'][:60]})")
+
+    started = time.monotonic()
+    end     = started + deadline
+    pending = {_claude_pool.submit(client.messages.create, **request)}
+    hedged  = hedge_after is None
+    sent    = 1
+    error   = None
+
+    while pending:
+        timeout = min(end, started + hedge_after) if not hedged else end
+        done, pending = wait(pending, timeout=max(0.0, timeout - time.monotonic()),
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                error = e
+                continue
+            # Answered calls only, per label: what HEDGE_AFTER and the deadlines are tuned on
+            latency = time.monotonic() - started
+            observe(f"claude_answer_{label}", latency)
+            if sent > 1:
+                count("claude_hedged")
+            with _breaker_lock:
+                _breaker["failures"] = 0
+            print(f"[AI] {label} answered in {latency * 1000:.0f}ms{' (hedged)' if sent > 1 else ''}")
+            return response
+
+        if time.monotonic() >= end:
+            break
+        # Slow first attempt, or one that failed fast — either way send one more
+        if not hedged and (not done or not pending):
+            pending.add(_claude_pool.submit(client.messages.create, **request))
+            hedged = True
+            sent  += 1
+
+    reason = str(error) if error else f"no answer within {deadline}s"
+    _record_failure(reason)
+    print(f"[AI] {label} failed after {(time.monotonic() - started) * 1000:.0f}ms: {reason[:80]}")
+    raise ClaudeUnavailable(reason)
+
+
+# Per-article sentiment, least recently used first, persisted across restarts
+SENTIMENT_CACHE_FILE = "sentiment_cache.json"
+SENTIMENT_CACHE_SIZE = 2000
+SENTIMENT_TTL        = 48 * 3600   # seconds
+SENTIMENT_ARTICLES   = 5           # newest articles that make up a reading
+
+_sentiment_cache  = OrderedDict()  # article key -> {"direction", "confidence", "reasoning", "scored_at"}
+_sentiment_loaded = False
+
+_SIGN = {"bullish": 1, "bearish": -1}
+# Economic calendar, one JSON file per UTC date so restarts and backtests
+# reuse earlier fetches
+CALENDAR_DIR      = "calendar"
+CALENDAR_PREFETCH = 1     # days ahead fetched alongside today
+CALENDAR_REFRESH  = 900   # seconds between prefetch passes; a failed day is retried on the next
+
+_calendar_cache = {}      # "YYYY-MM-DD" -> events, stored days only (failures are retried)
+_live_index     = {"key": None, "index": None}
+
+
+def _calendar_path(day: str) -> str:
+    return os.path.join(CALENDAR_DIR, f"{day}.json")
+
+
+def _fetch_calendar(day: str) -> list:
+    response = call_claude(
+        deadline=CALENDAR_DEADLINE, hedge_after=None, label="calendar",
+        model="claude-haiku-4-5-20251001",
+        max_tokens=500,
+        tools=[{"type": "web_search_20250305", "name": "web_search"}],
+        messages=[{"role": "user", "content": f"""Search for the economic calendar for {day}.
 Find ALL high impact events that affect gold (XAU/USD):
 - FOMC decisions, minutes, Fed speeches
 - US CPI, PPI, PCE
@@ -58,118 +166,396 @@ Find ALL high impact events that affect gold (XAU/USD):
 Return ONLY a valid JSON array, no other text:
 [{{"time_utc": "14:00", "event": "FOMC Minutes", "impact": "high"}}]
 
-If no high impact events today return exactly: []"""}]
-        )
+If no high impact events that day return exactly: []"""}]
+    )
 
-        text = ""
-        for block in response.content:
-            if hasattr(block, "text"):
-                text += block.text
+    text = ""
+    for block in response.content:
+        if hasattr(block, "text"):
+            text += block.text
+
+    text  = text.strip()
+    start = text.find("[")
+    end   = text.rfind("]") + 1
+    if start >= 0 and end > start:
+        return json.loads(text[start:end])
+    return []
 
-        text  = text.strip()
-        start = text.find("[")
-        end   = text.rfind("]") + 1
-        if start >= 0 and end > start:
-            events = json.loads(text[start:end])
-        else:
-            events = []
 
-        _calendar_cache["date"]   = today
-        _calendar_cache["events"] = events
-        print(f"[AI] Calendar: {len(events)} high impact events today")
-        return events
+def get_economic_calendar(day: str = None, fetch: bool = True) -> list:
+    """
+    High impact events for a UTC date ("YYYY-MM-DD", default today).
+    Looks in memory, then CALENDAR_DIR, then asks Claude and stores the result.
+    fetch=False only reads what is already stored.
+    """
+    day = day or datetime.now(timezone.utc).date().isoformat()
+    if day in _calendar_cache:
+        return _calendar_cache[day]
 
+    try:
+        with open(_calendar_path(day)) as f:
+            _calendar_cache[day] = json.load(f)
+        return _calendar_cache[day]
+    except (OSError, ValueError):
+        pass
+    if not fetch:
+        return []
+
+    print(f"[AI] Fetching economic calendar for {day} via Claude...")
+    try:
+        events = _fetch_calendar(day)
     except Exception as e:
+        # Neither stored nor cached, so the next prefetch pass tries again
         print(f"[AI] Calendar fetch failed: {e}")
-        _calendar_cache["date"]   = today
-        _calendar_cache["events"] = []
         return []
 
+    os.makedirs(CALENDAR_DIR, exist_ok=True)
+    tmp = _calendar_path(day) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(events, f)
+    os.replace(tmp, _calendar_path(day))
+
+    _calendar_cache[day] = events
+    _live_index["key"]   = None      # rebuild with the new day's events
+    print(f"[AI] Calendar {day}: {len(events)} high impact events")
+    return events
+
+
+def prefetch_calendar(days_ahead: int = CALENDAR_PREFETCH) -> bool:
+    """
+    Makes sure today and the next `days_ahead` days are stored and drops
+    days before yesterday from memory. Cheap once everything is stored, so
+    it is run every CALENDAR_REFRESH seconds; returns False if a day failed.
+    """
+    today = datetime.now(timezone.utc).date()
+    for day in [d for d in _calendar_cache if d < (today - timedelta(days=1)).isoformat()]:
+        del _calendar_cache[day]
+
+    complete = True
+    for offset in range(days_ahead + 1):
+        day = (today + timedelta(days=offset)).isoformat()
+        get_economic_calendar(day)
+        if day not in _calendar_cache:
+            complete = False
+            if offset == 0:
+                print(f"[AI] WARNING: no calendar for {day} — event filter is off until a retry succeeds")
+    return complete
+
+
+def load_calendar(start, end) -> dict:
+    """Stored calendar days in [start, end] as {"YYYY-MM-DD": events} (no fetching)."""
+    days = [d.date().isoformat() for d in pd.date_range(pd.Timestamp(start).normalize(), end, freq="D")]
+    return {d: ev for d in days if (ev := get_economic_calendar(d, fetch=False))}
+
+
+# ─── Event Index ──────────────────────────────────────────────────────────────
+
+class EventIndex:
+    """
+    Calendar events from any number of days on one sorted UTC timeline, so
+    the next event around a time is a binary search, including events just
+    past midnight on the following day.
+    """
+
+    def __init__(self, calendar_days: dict):
+        timeline = []
+        for day, events in calendar_days.items():
+            midnight = calendar.timegm(date.fromisoformat(day).timetuple())
+            for event in events or []:
+                try:
+                    hour, minute = map(int, event.get("time_utc", "").split(":"))
+                except (ValueError, AttributeError):
+                    continue
+                timeline.append((midnight + hour * 3600 + minute * 60, event.get("event", "Unknown")))
+        timeline.sort()
+        self.times = [t for t, _ in timeline]
+        self.names = [n for _, n in timeline]
+
+    def upcoming(self, now: datetime, minutes_ahead: int = 60, minutes_after: int = 30) -> dict:
+        """The first event from `minutes_after` ago to `minutes_ahead` from now."""
+        ts = now.timestamp()
+        i  = bisect.bisect_left(self.times, ts - minutes_after * 60)
+        if i < len(self.times) and self.times[i] <= ts + minutes_ahead * 60:
+            return {
+                "blocked":      True,
+                "event":        self.names[i],
+                "minutes_away": int((self.times[i] - ts) / 60),
+            }
+        return {"blocked": False, "event": None, "minutes_away": None}
+
+    def blocked_mask(self, epochs, minutes_ahead: int = 60, minutes_after: int = 30):
+        """upcoming()["blocked"] for an array of epoch seconds, vectorized."""
+        times  = np.asarray(self.times, dtype=float)
+        epochs = np.asarray(epochs, dtype=float)
+        if not len(times):
+            return np.zeros(len(epochs), dtype=bool)
+        i = np.searchsorted(times, epochs - minutes_after * 60, side="left")
+        return (i < len(times)) & (times[np.minimum(i, len(times) - 1)] <= epochs + minutes_ahead * 60)
+
+
+def _current_index(now: datetime) -> EventIndex:
+    """Yesterday, today and tomorrow from the stored calendar, rebuilt when the day changes."""
+    today = now.date()
+    if _live_index["key"] != today:
+        days = [(today + timedelta(days=d)).isoformat() for d in (-1, 0, 1)]
+        # Stored days only — fetching is prefetch_calendar's job, outside the cycle
+        _live_index["index"] = EventIndex({d: get_economic_calendar(d, fetch=False) for d in days})
+        _live_index["key"]   = today
+    return _live_index["index"]
+
+
+def has_upcoming_event(minutes_ahead: int = 60, now: datetime = None, events: list = None,
+                       index: EventIndex = None) -> dict:
+    """
+    Checks the calendar for a high impact event in the next `minutes_ahead`
+    (or that started under 30 minutes ago). `now` and an EventIndex can be
+    injected to replay history; `events` is a single day's list for `now`.
+    """
+    now = now or datetime.now(timezone.utc)
+    if index is None:
+        index = EventIndex({now.date().isoformat(): events}) if events is not None else _current_index(now)
+    return index.upcoming(now, minutes_ahead)
+
+
+def _article_key(article: dict) -> str:
+    if article.get("id"):
+        return str(article["id"])
+    return hashlib.md5((article.get("headline", "") + article.get("url", "")).encode()).hexdigest()
+
+
+def _load_sentiment_cache():
+    global _sentiment_loaded
+    _sentiment_loaded = True
+    try:
+        with open(SENTIMENT_CACHE_FILE) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    cutoff = time.time() - SENTIMENT_TTL
+    for key, entry in entries:
+        if entry.get("scored_at", 0) >= cutoff:
+            _sentiment_cache[key] = entry
+
+
+def _save_sentiment_cache():
+    tmp = SENTIMENT_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(list(_sentiment_cache.items()), f)
+        os.replace(tmp, SENTIMENT_CACHE_FILE)
+    except OSError as e:
+        print(f"[AI] Could not save sentiment cache: {e}")
+
+
+def _cached_sentiment(key: str):
+    entry = _sentiment_cache.get(key)
+    if entry is None:
+        return None
+    if time.time() - entry["scored_at"] > SENTIMENT_TTL:
+        del _sentiment_cache[key]
+        return None
+    _sentiment_cache.move_to_end(key)
+    return entry
+
+
+def _store_sentiment(key: str, entry: dict):
+    _sentiment_cache[key] = entry
+    _sentiment_cache.move_to_end(key)
+    while len(_sentiment_cache) > SENTIMENT_CACHE_SIZE:
+        _sentiment_cache.popitem(last=False)
+
+
+def _score_articles(articles: list) -> dict:
+    """One Claude call scoring each article separately. Returns {index: entry}."""
+    news_text = "\n\n".join(
+        f"[{i + 1}] Headline: {a['headline']}\nSummary: {a['summary']}"
+        for i, a in enumerate(articles)
+    )
+    response = call_claude(
+        label="sentiment",
+        model="claude-haiku-4-5-20251001",
+        max_tokens=60 * len(articles) + 50,
+        messages=[{"role": "user", "content": f"""Analyze each of these gold (XAU/USD) news articles separately.
 
-def has_upcoming_event(minutes_ahead: int = 60) -> dict:
-    events = get_economic_calendar()
-    now    = datetime.now(timezone.utc)
+{news_text}
 
-    for event in events:
-        try:
-            time_str     = event.get("time_utc", "")
-            hour, minute = map(int, time_str.split(":"))
-            event_dt     = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            diff_mins    = (event_dt - now).total_seconds() / 60
-
-            if -30 <= diff_mins <= minutes_ahead:
-                return {
-                    "blocked":      True,
-                    "event":        event.get("event", "Unknown"),
-                    "minutes_away": int(diff_mins),
-                }
-        except Exception:
+Respond with exactly one line per article, in order, in this format:
+[n] SENTIMENT: [BULLISH or BEARISH or NEUTRAL] | CONFIDENCE: [0.0 to 1.0] | REASONING: [one short sentence]"""}]
+    )
+
+    raw     = response.content[0].text.strip()
+    scored  = {}
+    pattern = re.compile(r"\[(\d+)\]\s*SENTIMENT:\s*(\w+)\s*\|\s*CONFIDENCE:\s*([\d.]+)\s*\|\s*REASONING:\s*(.*)",
+                         re.IGNORECASE)
+    now = time.time()
+    for line in raw.split("\n"):
+        m = pattern.search(line)
+        if not m:
             continue
+        i = int(m.group(1)) - 1
+        if 0 <= i < len(articles):
+            try:
+                confidence = min(max(float(m.group(3)), 0.0), 1.0)
+            except ValueError:
+                confidence = 0.0
+            scored[i] = {
+                "direction":  m.group(2).lower(),
+                "confidence": confidence,
+                "reasoning":  m.group(4).strip(),
+                "scored_at":  now,
+            }
+    return scored
+
+
+def _aggregate_sentiment(entries: list) -> dict:
+    """Mean signed confidence over the scored articles, bucketed with SENTIMENT_CONFIG."""
+    score = sum(_SIGN.get(e["direction"], 0) * e["confidence"] for e in entries) / len(entries)
+
+    if score >= SENTIMENT_CONFIG["bullish_threshold"]:
+        direction = "bullish"
+    elif score <= SENTIMENT_CONFIG["bearish_threshold"]:
+        direction = "bearish"
+    else:
+        direction = "neutral"
+
+    # Lead with the strongest article that agrees with the overall reading
+    agreeing  = [e for e in entries if e["direction"] == direction] or entries
+    lead      = max(agreeing, key=lambda e: e["confidence"])
+    counts    = {d: sum(e["direction"] == d for e in entries) for d in ("bullish", "bearish", "neutral")}
+    reasoning = (f"{lead['reasoning']} ({counts['bullish']} bullish, "
+                 f"{counts['bearish']} bearish, {counts['neutral']} neutral)")
+
+    return {"direction": direction, "confidence": round(abs(score), 2), "reasoning": reasoning}
+
+
+# ─── Local Sentiment Tier ─────────────────────────────────────────────────────
+
+# Phrase -> weight for gold: positive is bullish for XAU. A preceding "no",
+# "not" or "without" flips the sign ("no rate cut").
+GOLD_LEXICON = {
+    # bullish
+    "safe haven": 1.5, "safe-haven": 1.5, "rate cut": 1.5, "rate cuts": 1.5, "dovish": 1.5,
+    "easing": 1.0, "geopolitical": 1.0, "tensions": 1.0, "escalation": 1.0, "conflict": 1.0,
+    "sanctions": 0.75, "recession": 1.0, "uncertainty": 0.75, "weaker dollar": 1.5,
+    "dollar weakens": 1.5, "dollar falls": 1.5, "dollar slides": 1.5, "yields fall": 1.0,
+    "yields drop": 1.0, "inflation rises": 1.0, "hot inflation": 1.0, "central bank buying": 1.5,
+    "etf inflows": 1.0, "record high": 1.0, "all-time high": 1.0, "rallies": 1.0, "rally": 1.0,
+    "surges": 1.0, "jumps": 0.75, "gains": 0.5, "rises": 0.5, "climbs": 0.5,
+    # bearish
+    "rate hike": -1.5, "rate hikes": -1.5, "hawkish": -1.5, "tightening": -1.0,
+    "stronger dollar": -1.5, "strong dollar": -1.5, "dollar strengthens": -1.5,
+    "dollar rises": -1.5, "dollar gains": -1.5, "yields rise": -1.0, "yields climb": -1.0,
+    "risk-on": -1.0, "ceasefire": -1.0, "de-escalation": -1.0, "cooling inflation": -1.0,
+    "etf outflows": -1.0, "profit-taking": -0.75, "sell-off": -1.0, "selloff": -1.0,
+    "slumps": -1.0, "tumbles": -1.0, "plunges": -1.0, "falls": -0.5, "drops": -0.5,
+    "slips": -0.5, "declines": -0.5, "losses": -0.5,
+}
 
-    return {"blocked": False, "event": None, "minutes_away": None}
-
+# Scheduled or shock news the lexicon should not judge on its own
+HIGH_IMPACT_TERMS = [
+    "fomc", "fed decision", "rate decision", "powell", "cpi", "pce", "nonfarm", "payrolls",
+    "nfp", "gdp", "emergency", "invasion", "war", "default", "intervention",
+]
+
+LEXICON_SATURATION = 3.0   # |summed weight| that counts as full confidence
+
+_lexicon_regex = re.compile(
+    r"(?<!\w)(?:(no|not|without)\s+)?("
+    + "|".join(map(re.escape, sorted(GOLD_LEXICON, key=len, reverse=True)))
+    + r")(?!\w)", re.IGNORECASE)
+_impact_regex = re.compile(
+    r"(?<!\w)(?:" + "|".join(map(re.escape, HIGH_IMPACT_TERMS)) + r")(?!\w)", re.IGNORECASE)
+
+
+def score_article_local(article: dict) -> dict:
+    """
+    Lexicon reading of one article in the get_news_sentiment shape, plus
+    high_impact=True when it mentions news the lexicon should not judge alone.
+    """
+    text  = f"{article.get('headline', '')} {article.get('summary', '')}"
+    score = 0.0
+    hits  = []
+    for negation, phrase in _lexicon_regex.findall(text):
+        weight = GOLD_LEXICON[phrase.lower()] * (-1 if negation else 1)
+        score += weight
+        hits.append(f"{negation + ' ' if negation else ''}{phrase.lower()}")
+
+    confidence = min(abs(score) / LEXICON_SATURATION, 1.0)
+    if score > 0:
+        direction = "bullish"
+    elif score < 0:
+        direction = "bearish"
+    else:
+        direction = "neutral"
 
-def _hash_articles(articles: list) -> str:
-    headlines = "".join([a.get("headline", "") for a in articles[:5]])
-    return hashlib.md5(headlines.encode()).hexdigest()
+    return {
+        "direction":   direction,
+        "confidence":  round(confidence, 2),
+        "reasoning":   f"Lexicon: {', '.join(hits[:4])}" if hits else "Lexicon: no gold-relevant cues",
+        "high_impact": bool(_impact_regex.search(text)),
+    }
 
 
+@timed("get_news_sentiment")
 def get_news_sentiment(articles: list) -> dict:
-    global _sentiment_cache
-
+    """
+    Sentiment over the newest SENTIMENT_ARTICLES articles. Each article is
+    scored once and cached. New articles are read with the local lexicon
+    first; only those it is unsure about, or that mention high impact news,
+    go to Claude. The per-article readings are combined locally.
+    """
     if not articles:
         return {"direction": "neutral", "confidence": 0.0, "reasoning": "No news articles available"}
+    if not _sentiment_loaded:
+        _load_sentiment_cache()
+
+    recent  = articles[:SENTIMENT_ARTICLES]
+    keys    = [_article_key(a) for a in recent]
+    entries = {k: e for k in keys if (e := _cached_sentiment(k)) is not None}
+    count("sentiment_cache_hit", len(entries))
+
+    escalate = []
+    local    = {}
+    stored   = 0
+    for key, article in zip(keys, recent):
+        if key in entries:
+            continue
+        reading = score_article_local(article)
+        if reading["confidence"] >= SENTIMENT_CONFIG["local_confidence"] and not reading["high_impact"]:
+            entries[key] = {k: reading[k] for k in ("direction", "confidence", "reasoning")}
+            entries[key]["scored_at"] = time.time()
+            _store_sentiment(key, entries[key])
+            stored += 1
+        else:
+            local[key] = reading
+            escalate.append((key, article))
 
-    current_hash = _hash_articles(articles)
-    if current_hash == _sentiment_cache["articles_hash"] and _sentiment_cache["result"]:
-        cached = _sentiment_cache["result"]
-        print(f"[AI] Using cached sentiment: {cached['direction']}")
-        return cached
-
-    print("[AI] New articles -- analyzing sentiment...")
-    news_text = "\n\n".join([
-        f"Headline: {a['headline']}\nSummary: {a['summary']}"
-        for a in articles[:5]
-    ])
-
-    try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=150,
-            messages=[{"role": "user", "content": f"""Analyze these gold (XAU/USD) news articles.
-
-{news_text}
-
-Respond in exactly this format:
-SENTIMENT: [BULLISH or BEARISH or NEUTRAL]
-CONFIDENCE: [0.0 to 1.0]
-REASONING: [one sentence max]"""}]
-        )
-
-        raw    = response.content[0].text.strip()
-        result = {"direction": "neutral", "confidence": 0.0, "reasoning": raw}
-
-        for line in raw.split("\n"):
-            if line.startswith("SENTIMENT:"):
-                result["direction"] = line.split(":", 1)[1].strip().lower()
-            elif line.startswith("CONFIDENCE:"):
-                try:
-                    result["confidence"] = float(line.split(":", 1)[1].strip())
-                except ValueError:
-                    pass
-            elif line.startswith("REASONING:"):
-                result["reasoning"] = line.split(":", 1)[1].strip()
-
-        _sentiment_cache["articles_hash"] = current_hash
-        _sentiment_cache["result"]        = result
-        return result
-
-    except Exception as e:
-        print(f"[AI] Sentiment error: {e}")
-        return {"direction": "neutral", "confidence": 0.0, "reasoning": f"Claude unavailable: {str(e)[:60]}"}
-
-
-def score_trade(trend: dict, sentiment: dict, sl_hits_today: int) -> dict:
+    count("sentiment_lexicon", stored)
+    count("sentiment_escalated", len(escalate))
+    if not escalate:
+        print(f"[AI] Sentiment from cache/lexicon for {len(entries)} articles ({stored} new)")
+    else:
+        print(f"[AI] {len(escalate)} ambiguous or high impact articles -- asking Claude...")
+        try:
+            scored = _score_articles([a for _, a in escalate])
+            for i, (key, _) in enumerate(escalate):
+                if i in scored:
+                    _store_sentiment(key, scored[i])
+                    entries[key] = scored[i]
+                    stored += 1
+        except Exception as e:
+            print(f"[AI] Sentiment error: {e} -- using lexicon readings")
+        # Whatever Claude did not answer uses the lexicon for this cycle only
+        for key, _ in escalate:
+            entries.setdefault(key, local[key])
+
+    if stored:
+        _save_sentiment_cache()
+    return _aggregate_sentiment([entries[k] for k in keys])
+
+
+def score_trade(trend: dict, sentiment: dict, sl_hits_today: int,
+                now: datetime = None, events: list = None, index: EventIndex = None) -> dict:
     direction  = trend.get("trade_bias")
     daily      = trend.get("daily_bias", {}).get("direction", "unknown")
     htf        = trend.get("htf_bias", {}).get("direction", "unknown")
@@ -180,7 +566,7 @@ def score_trade(trend: dict, sentiment: dict, sl_hits_today: int) -> dict:
     sent_conf  = sentiment.get("confidence", 0.0)
 
     expected    = "bullish" if direction == "buy" else "bearish"
-    event_check = has_upcoming_event(minutes_ahead=60)
+    event_check = has_upcoming_event(minutes_ahead=60, now=now, events=events, index=index)
 
     c1 = daily    == expected
     c2 = htf      == expected
@@ -0,0 +1,147 @@
+"""
+analytics.py - Reject-reason funnel over the decision journal.
+
+Works on the per-check booleans logger.py journals for every cycle
+(check_<name> for each technicals.TREND_CHECKS entry), as one boolean
+matrix, so months of cycles take well under a second:
+
+  funnel      rows still passing after each check, in evaluation order
+  binding     per check: how often it fails, and how often it is the only
+              failing check (relaxing it alone would have confirmed the trend)
+  together    how often each pair of checks fails in the same cycle
+  thresholds  confirmation rate as the ADX threshold or the extreme
+              volatility ATR ratio is moved, other checks held as logged
+
+Usage:
+  python analytics.py [--from 2025-01-01] [--to 2025-04-01] [--instrument XAU_USD]
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from config import TRADE_CONFIG
+from logger import read_journal
+from technicals import TREND_CHECKS
+
+EXTREME_ATR_RATIO = 3.0   # _classify_volatility's "extreme" cut-off
+
+
+CHECK_COLUMNS = [f"check_{c}" for c in TREND_CHECKS]
+
+
+def evaluated_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cycles the funnel can use: enough data to evaluate, and journaled with
+    every check column (rows from before a check was added hold NaN there,
+    which would otherwise read as a pass).
+    """
+    checks   = df.reindex(columns=CHECK_COLUMNS)
+    complete = checks.notna().all(axis=1) & (df["reject_reason"] != "Insufficient data")
+    return df[complete]
+
+
+def check_matrix(df: pd.DataFrame) -> np.ndarray:
+    """(cycles, checks) bool array of passes over evaluated_rows(df)."""
+    return evaluated_rows(df)[CHECK_COLUMNS].to_numpy(dtype=bool)
+
+
+def funnel(passed: np.ndarray) -> pd.DataFrame:
+    remaining = np.logical_and.accumulate(passed, axis=1).sum(axis=0)
+    n = len(passed)
+    return pd.DataFrame({
+        "check":     TREND_CHECKS,
+        "remaining": remaining,
+        "pct":       np.round(100 * remaining / n, 2) if n else 0.0,
+    })
+
+
+def binding(passed: np.ndarray) -> pd.DataFrame:
+    failed = ~passed
+    only   = failed & (failed.sum(axis=1) == 1)[:, None]
+    n      = len(passed)
+    return pd.DataFrame({
+        "check":      TREND_CHECKS,
+        "fails":      failed.sum(axis=0),
+        "fail_pct":   np.round(100 * failed.mean(axis=0), 2) if n else 0.0,
+        "sole_block": only.sum(axis=0),
+        "sole_pct":   np.round(100 * only.mean(axis=0), 2) if n else 0.0,
+    }).sort_values("sole_block", ascending=False, ignore_index=True)
+
+
+def together(passed: np.ndarray) -> pd.DataFrame:
+    """Pairwise co-failure counts (diagonal = each check's own failures)."""
+    failed = (~passed).astype(np.int64)
+    return pd.DataFrame(failed.T @ failed, index=TREND_CHECKS, columns=TREND_CHECKS)
+
+
+def threshold_curve(passed: np.ndarray, values: np.ndarray, check: str, thresholds) -> pd.DataFrame:
+    """
+    Confirmation rate with `check` recomputed as values >= threshold (or < for
+    not_extreme) and every other check as logged.
+    """
+    col    = TREND_CHECKS.index(check)
+    others = np.delete(passed, col, axis=1).all(axis=1)
+    thresholds = np.asarray(thresholds, dtype=float)
+    if check == "not_extreme":
+        ok = values[:, None] < thresholds[None, :]
+    else:
+        ok = values[:, None] >= thresholds[None, :]
+    confirmed = (ok & others[:, None]).sum(axis=0)
+    return pd.DataFrame({
+        "threshold": thresholds,
+        "confirmed": confirmed,
+        "pct":       np.round(100 * confirmed / len(passed), 3) if len(passed) else 0.0,
+    })
+
+
+def report(df: pd.DataFrame) -> dict:
+    """All funnel tables for a read_journal DataFrame."""
+    evaluated = evaluated_rows(df)
+    passed    = evaluated[CHECK_COLUMNS].to_numpy(dtype=bool)
+    adx       = evaluated["tech_strength"].to_numpy(dtype=float)
+    atr_ratio = evaluated["atr_ratio"].to_numpy(dtype=float)
+    return {
+        "cycles":       len(passed),
+        "confirmed":    int(passed.all(axis=1).sum()),
+        "funnel":       funnel(passed),
+        "binding":      binding(passed),
+        "together":     together(passed),
+        "adx":          threshold_curve(passed, adx, "adx_ok", np.arange(10, 41, 2.5)),
+        "extreme_vol":  threshold_curve(passed, atr_ratio, "not_extreme", np.arange(1.5, 5.01, 0.5)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reject-reason funnel over the decision journal")
+    parser.add_argument("--from", dest="start", help="Start date (UTC)")
+    parser.add_argument("--to",   dest="end",   help="End date (UTC, exclusive)")
+    parser.add_argument("--instrument", help="Only this instrument, e.g. XAU_USD")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    df = read_journal(args.start, args.end)
+    if args.instrument:
+        df = df[df["instrument"] == args.instrument]
+    if df.empty:
+        print("[ANALYTICS] No journaled decisions in range")
+        return
+
+    r = report(df)
+    print(f"[ANALYTICS] {r['cycles']} evaluated cycles, {r['confirmed']} confirmed "
+          f"({time.perf_counter() - started:.2f}s)")
+    print("\n── Funnel ──")
+    print(r["funnel"].to_string(index=False))
+    print("\n── Binding constraints ──")
+    print(r["binding"].to_string(index=False))
+    print("\n── Failing together ──")
+    print(r["together"].to_string())
+    print(f"\n── ADX threshold (current {TRADE_CONFIG['adx_threshold']}) ──")
+    print(r["adx"].to_string(index=False))
+    print(f"\n── Extreme volatility ATR ratio (current {EXTREME_ATR_RATIO}) ──")
+    print(r["extreme_vol"].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+backtest.py - Event-driven replay of the live strategy over historical candles.
+
+Steps through completed 5min bars and runs, at each bar close:
+  technicals (StreamingIndicators.trend_signal) -> ai_layer.score_trade -> signalgen.generate_signal
+with the clock injected, so session and event filters see the bar time.
+
+Mirrors main.run_cycle:
+  - one position at a time (no stacking)
+  - 2-cycle cooldown after a close, counted from the cycle that notices it
+  - SL hits counted per UTC day and fed to score_trade
+
+Stored economic calendar days (ai_layer.CALENDAR_DIR) covering the range
+drive the event filter. Fills are at the signal close; TP/SL are checked against each later bar's
+high/low (SL first if both are touched in the same bar). Sentiment is neutral
+unless a sentiment function is supplied, since historical news is not stored.
+
+Usage:
+  python backtest.py --from 2024-01-01 --to 2025-04-01 [--out trades.csv]
+  python backtest.py --m5 m5.csv --h1 h1.csv --daily d.csv
+Without --m5 candles are read from the local archive (see candle_store.py).
+CSV columns: timestamp,open,high,low,close[,volume] (bar open time, UTC).
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+import candle_store
+from config import ASSET_CONFIG, TRADE_CONFIG
+from technicals import StreamingIndicators, get_daily_bias, get_htf_bias, memoized_bias
+from ai_layer import EventIndex, load_calendar, score_trade
+from signalgen import generate_signal
+
+NEUTRAL_SENTIMENT = {"direction": "neutral", "confidence": 0.0, "reasoning": "Backtest -- no news"}
+
+# Complete bars the live bot sees per timeframe (run_cycle requests one more,
+# the last of which is still forming)
+H1_WINDOW    = 199
+DAILY_WINDOW = 99
+
+COOLDOWN_CYCLES = 2
+
+
+def load_csv(path: str) -> pd.DataFrame:
+    """Loads candles in the same shape data.get_candles returns."""
+    df = pd.read_csv(path)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    return df.set_index("timestamp").sort_index()
+
+
+def load_frames(m5: str = None, h1: str = None, daily: str = None, start=None, end=None) -> tuple:
+    """
+    (df_5m, df_1h, df_daily) from CSVs, or from the local archive when no
+    5min CSV is given. Archive higher timeframes start early enough to warm
+    up their EMA windows.
+    """
+    if m5:
+        return (load_csv(m5),
+                load_csv(h1) if h1 else None,
+                load_csv(daily) if daily else None)
+
+    symbol = ASSET_CONFIG["oanda_instrument"]
+    start  = pd.Timestamp(start or "1970-01-01")
+    return (candle_store.get_candles(symbol, TRADE_CONFIG["timeframe"], start=start, end=end),
+            candle_store.get_candles(symbol, "60", start=start - pd.Timedelta(days=15), end=end),
+            candle_store.get_candles(symbol, "D",  start=start - pd.Timedelta(days=150), end=end))
+
+
+def _close_times(df: pd.DataFrame, bar: pd.Timedelta) -> np.ndarray:
+    return (df.index + bar).to_numpy(dtype="datetime64[ns]")
+
+
+def _bias_lookup(df: pd.DataFrame, bar: pd.Timedelta, window: int, bias_fn, decisions: np.ndarray,
+                 instrument: str = ""):
+    """
+    Returns f(i) -> bias dict over the last `window` bars that had closed by
+    decision i. Decisions sharing a window share the dict without slicing
+    df again; new windows go through technicals.memoized_bias, so repeated
+    runs over the same history (sweeps, walk-forward) reuse it too.
+    """
+    if df is None or df.empty:
+        unknown = bias_fn(None)
+        return lambda i: unknown
+
+    ends        = np.searchsorted(_close_times(df, bar), decisions, side="right").tolist()
+    granularity = "D" if bar >= pd.Timedelta(days=1) else "H1"
+    cache       = {}
+
+    def lookup(i: int) -> dict:
+        end = ends[i]
+        if end not in cache:
+            cache[end] = memoized_bias(bias_fn, df.iloc[max(0, end - window):end], instrument, granularity)
+        return cache[end]
+
+    return lookup
+
+
+def run_backtest(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily: pd.DataFrame = None,
+                 calendar: dict = None, sentiment_fn=None) -> dict:
+    """
+    Replays the strategy over df_5m.
+
+    calendar:     optional {"YYYY-MM-DD": [events]} in get_economic_calendar format,
+                  e.g. ai_layer.load_calendar(start, end)
+    sentiment_fn: optional f(decision_time) -> sentiment dict
+
+    Returns {"trades": DataFrame, "equity": Series, "stats": dict}.
+    """
+    n = len(df_5m)
+    bar_5m      = pd.Timedelta(minutes=int(TRADE_CONFIG["timeframe"]))
+    decisions   = _close_times(df_5m, bar_5m)
+    daily_bias  = _bias_lookup(df_daily, pd.Timedelta(days=1), DAILY_WINDOW, get_daily_bias, decisions)
+    htf_bias    = _bias_lookup(df_1h, pd.Timedelta(hours=1), H1_WINDOW, get_htf_bias, decisions)
+    events      = EventIndex(calendar or {})
+    units       = TRADE_CONFIG["oanda_units"]   # submit_order sends the configured size
+
+    # Plain Python floats — numpy scalars are several times slower per op
+    high  = df_5m["high"].to_numpy(dtype=float).tolist()
+    low   = df_5m["low"].to_numpy(dtype=float).tolist()
+    close = df_5m["close"].to_numpy(dtype=float).tolist()
+
+    # Trade ledger — one row per closed trade, preallocated
+    cap         = n // 2 + 1
+    t_entry_idx = np.empty(cap, dtype=np.int64)
+    t_exit_idx  = np.empty(cap, dtype=np.int64)
+    t_side      = np.empty(cap, dtype=np.int8)      # +1 buy, -1 sell
+    t_entry     = np.empty(cap, dtype=float)
+    t_exit      = np.empty(cap, dtype=float)
+    t_tp        = np.empty(cap, dtype=float)
+    t_sl        = np.empty(cap, dtype=float)
+    t_score     = np.empty(cap, dtype=np.int8)
+    t_pnl       = np.empty(cap, dtype=float)
+    equity      = np.zeros(n, dtype=float)
+    n_trades    = 0
+
+    state    = StreamingIndicators()
+    realized = 0.0
+    cooldown = 0
+    sl_hits  = 0
+    last_day = None
+
+    pos_side = 0
+    pos_idx  = pos_entry = pos_tp = pos_sl = pos_score = 0
+
+    for i in range(n):
+        state.update(high[i], low[i], close[i])
+        now = pd.Timestamp(decisions[i], tz="UTC")
+
+        day = now.date()
+        if day != last_day:
+            sl_hits  = 0
+            last_day = day
+
+        # ── Position monitor ──
+        if pos_side and i > pos_idx:
+            hit_sl = low[i] <= pos_sl if pos_side > 0 else high[i] >= pos_sl
+            hit_tp = high[i] >= pos_tp if pos_side > 0 else low[i] <= pos_tp
+            if hit_sl or hit_tp:
+                exit_px = pos_sl if hit_sl else pos_tp
+                pnl     = (exit_px - pos_entry) * pos_side * units
+
+                t_entry_idx[n_trades] = pos_idx
+                t_exit_idx[n_trades]  = i
+                t_side[n_trades]      = pos_side
+                t_entry[n_trades]     = pos_entry
+                t_exit[n_trades]      = exit_px
+                t_tp[n_trades]        = pos_tp
+                t_sl[n_trades]        = pos_sl
+                t_score[n_trades]     = pos_score
+                t_pnl[n_trades]       = pnl
+                n_trades += 1
+
+                realized += pnl
+                if pnl <= 0:
+                    sl_hits += 1
+                pos_side = 0
+                cooldown = COOLDOWN_CYCLES
+
+        equity[i] = realized
+
+        if cooldown > 0:
+            cooldown -= 1
+            continue
+        if pos_side:
+            continue
+
+        # ── Signal ──
+        trend = state.trend_signal(now=now, daily_bias=daily_bias(i), htf_bias=htf_bias(i))
+        if not trend["confirmed"]:
+            continue
+
+        sentiment = sentiment_fn(now) if sentiment_fn else NEUTRAL_SENTIMENT
+        ai_score  = score_trade(trend, sentiment, sl_hits, now=now, index=events)
+        signal    = generate_signal(trend, sentiment, ai_score)
+        if not signal.get("trade"):
+            continue
+
+        pos_side  = 1 if signal["action"] == "buy" else -1
+        pos_idx   = i
+        pos_entry = float(signal["entry_price"])
+        pos_tp    = float(signal["take_profit"])
+        pos_sl    = float(signal["stop_loss"])
+        pos_score = signal["score"]
+
+    index  = df_5m.index
+    trades = pd.DataFrame({
+        "entry_time": index[t_entry_idx[:n_trades]],
+        "exit_time":  index[t_exit_idx[:n_trades]],
+        "side":       np.where(t_side[:n_trades] > 0, "buy", "sell"),
+        "entry":      t_entry[:n_trades],
+        "exit":       t_exit[:n_trades],
+        "take_profit": t_tp[:n_trades],
+        "stop_loss":  t_sl[:n_trades],
+        "score":      t_score[:n_trades],
+        "pnl":        t_pnl[:n_trades],
+    })
+
+    pnl  = t_pnl[:n_trades]
+    wins = int((pnl > 0).sum())
+    peak = np.maximum.accumulate(equity) if n else equity
+    stats = {
+        "bars":         n,
+        "trades":       n_trades,
+        "wins":         wins,
+        "losses":       n_trades - wins,
+        "win_rate":     round(wins / n_trades, 3) if n_trades else 0.0,
+        "total_pnl":    round(float(pnl.sum()), 2),
+        "avg_pnl":      round(float(pnl.mean()), 2) if n_trades else 0.0,
+        "max_drawdown": round(float((peak - equity).max()), 2) if n else 0.0,
+        "open_at_end":  bool(pos_side),
+    }
+
+    return {"trades": trades, "equity": pd.Series(equity, index=index), "stats": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the live strategy over historical candles")
+    parser.add_argument("--m5",    help="5min candles CSV (default: local archive)")
+    parser.add_argument("--h1",    help="1H candles CSV")
+    parser.add_argument("--daily", help="Daily candles CSV")
+    parser.add_argument("--from",  dest="start", help="Archive start date (UTC)")
+    parser.add_argument("--to",    dest="end",   help="Archive end date (UTC)")
+    parser.add_argument("--out",   help="Write closed trades to this CSV")
+    args = parser.parse_args()
+
+    df_5m, df_1h, df_daily = load_frames(args.m5, args.h1, args.daily, args.start, args.end)
+    if df_5m.empty:
+        return
+
+    calendar = load_calendar(df_5m.index[0], df_5m.index[-1] + pd.Timedelta(days=1))
+    print(f"[BACKTEST] Event filter: {sum(map(len, calendar.values()))} stored events")
+
+    started = time.perf_counter()
+    result  = run_backtest(df_5m, df_1h, df_daily, calendar)
+    elapsed = time.perf_counter() - started
+
+    print(f"[BACKTEST] {len(df_5m)} bars in {elapsed:.2f}s")
+    for k, v in result["stats"].items():
+        print(f"  {k:<13} {v}")
+
+    if args.out:
+        result["trades"].to_csv(args.out, index=False)
+        print(f"[BACKTEST] Trades written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
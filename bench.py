@@ -0,0 +1,294 @@
+"""
+bench.py - Reproducible benchmarks for the indicator, signal and parsing hot paths.
+
+Times, on seeded synthetic data:
+  compute_ema, compute_adx, compute_atr, get_volatility_regime,
+  indicator_kernel, get_trend_signal  5min OHLC frames of each --sizes length
+  parse_candles                       data._parse_candles on OANDA-shaped JSON
+                                      (sizes capped at PARSE_MAX candles)
+  news_filter                         get_news keyword matching over an
+                                      in-memory window of --articles articles
+
+Each case runs until it has at least MIN_RUNS samples and MIN_SECONDS of
+timing (at most MAX_RUNS); the median is what gets compared. Results are
+written as JSON, and --compare flags every case slower than the baseline by
+more than --tolerance (exit code 1, so it can gate a change).
+
+Timings only compare on the same machine, so no baseline is committed
+(bench_baseline.json is gitignored). Record one locally before a change,
+e.g. on the parent commit, then compare after it:
+
+  git stash; python bench.py --save-baseline; git stash pop
+  python bench.py --compare
+
+Usage:
+  python bench.py --save-baseline                     # record bench_baseline.json
+  python bench.py --compare                           # run and compare against it
+  python bench.py --sizes 500,100000 --only compute_adx,get_trend_signal
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+import data
+from config import ASSET_CONFIG
+from technicals import (
+    compute_adx, compute_atr, compute_ema, get_trend_signal, get_volatility_regime, indicator_kernel,
+)
+
+RESULTS_FILE  = "bench_results.json"
+BASELINE_FILE = "bench_baseline.json"
+
+DEFAULT_SIZES    = [500, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_ARTICLES = [100, 1_000, 10_000]
+PARSE_MAX        = 100_000   # 20 OANDA pages; the JSON dicts alone need ~1KB per candle
+
+MIN_RUNS    = 3
+MAX_RUNS    = 50
+MIN_SECONDS = 0.5
+SEED        = 42
+
+
+# ─── Synthetic Data ───────────────────────────────────────────────────────────
+
+def synthetic_ohlc(n: int, freq: str = "5min", seed: int = SEED, start: str = "2020-01-01") -> pd.DataFrame:
+    """Random-walk gold-like OHLCV bars with a DatetimeIndex, same every run."""
+    rng   = np.random.default_rng(seed)
+    close = 2000.0 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    span  = np.abs(rng.normal(0, 0.0006, n)) * close
+    high  = np.maximum(open_, close) + span * rng.random(n)
+    low   = np.minimum(open_, close) - span * rng.random(n)
+    index = pd.date_range(start, periods=n, freq=freq, tz="UTC", name="timestamp")
+    return pd.DataFrame({
+        "open":   open_,
+        "high":   high,
+        "low":    low,
+        "close":  close,
+        "volume": rng.integers(1, 500, n),
+    }, index=index)
+
+
+def _resample(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    return df.resample(rule).agg({"open": "first", "high": "max", "low": "min",
+                                  "close": "last", "volume": "sum"}).dropna()
+
+
+def synthetic_candles(df: pd.DataFrame) -> list:
+    """The OANDA v20 candles payload a get_candles call would parse for df."""
+    times = df.index.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+    return [
+        {"complete": True, "volume": int(v), "time": t,
+         "mid": {"o": f"{o:.3f}", "h": f"{h:.3f}", "l": f"{l:.3f}", "c": f"{c:.3f}"}}
+        for t, o, h, l, c, v in zip(times, df["open"], df["high"], df["low"], df["close"], df["volume"])
+    ]
+
+
+WORDS = ("markets stocks oil equities bonds earnings tech china europe shares investors "
+         "central bank yields dollar growth outlook rally slump demand supply traders").split()
+
+
+def synthetic_articles(n: int, seed: int = SEED) -> dict:
+    """{id: article} shaped like data._news_state["articles"]; about 1 in 8 mention gold."""
+    rng      = np.random.default_rng(seed)
+    keywords = ASSET_CONFIG["news_keywords"]
+    now      = datetime.utcnow()
+    articles = {}
+    for i in range(1, n + 1):
+        words = list(rng.choice(WORDS, 24))
+        if rng.random() < 0.125:
+            words.insert(int(rng.integers(0, 24)), str(rng.choice(keywords)))
+        articles[i] = {
+            "id":       i,
+            "headline": " ".join(words[:10]).capitalize(),
+            "summary":  " ".join(words[10:]),
+            "url":      "",
+            "datetime": now,
+            "source":   "bench",
+        }
+    return articles
+
+
+# ─── Timing ───────────────────────────────────────────────────────────────────
+
+def measure(fn) -> dict:
+    """Runs fn repeatedly; returns median/min/max seconds and the run count."""
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_RUNS and (len(samples) < MIN_RUNS or time.perf_counter() - started < MIN_SECONDS):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return {
+        "median": float(np.median(samples)),
+        "min":    float(min(samples)),
+        "max":    float(max(samples)),
+        "runs":   len(samples),
+    }
+
+
+def _news_filter(articles: dict):
+    """Benchmarks a cold keyword scan: fresh matcher, no feed fetch."""
+    keywords = ASSET_CONFIG["news_keywords"]
+
+    def run():
+        data._matchers.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            data.get_news(keywords, lookback_hours=24)
+
+    data._news_state.update({
+        "fetched":   float("inf"),     # never due for a fetch during the run
+        "last_id":   max(articles),
+        "horizon":   24,
+        "articles":  articles,
+        "headlines": {" ".join(a["headline"].lower().split()) for a in articles.values()},
+    })
+    return run
+
+
+def _indicator_cases(n: int) -> dict:
+    df_5m = synthetic_ohlc(n)
+    high, low, close = (df_5m[c].to_numpy() for c in ("high", "low", "close"))
+    cases = {
+        "compute_ema":           lambda: compute_ema(df_5m["close"], 50),
+        "compute_adx":           lambda: compute_adx(df_5m, 14),
+        "compute_atr":           lambda: compute_atr(df_5m, 14),
+        "get_volatility_regime": lambda: get_volatility_regime(df_5m),
+        "indicator_kernel":      lambda: indicator_kernel(high, low, close),
+    }
+    # Higher timeframes come from the same walk, so the biases are consistent
+    df_1h    = _resample(df_5m, "1h")
+    df_daily = _resample(df_5m, "1D")
+    now      = df_5m.index[-1].to_pydatetime()
+    cases["get_trend_signal"] = lambda: get_trend_signal(df_5m, df_1h, df_daily, now=now)
+    return cases
+
+
+def run(sizes=DEFAULT_SIZES, articles=DEFAULT_ARTICLES, only=None) -> dict:
+    """Every case at every size -> {"meta": ..., "results": {"case@size": timing}}."""
+    results = {}
+
+    def record(name, size, fn):
+        if only and name not in only:
+            return
+        key          = f"{name}@{size}"
+        results[key] = measure(fn)
+        r            = results[key]
+        print(f"[BENCH] {key:<32} median {_fmt(r['median']):>10}  min {_fmt(r['min']):>10}  ({r['runs']} runs)")
+
+    for n in sizes:
+        for name, fn in _indicator_cases(n).items():
+            record(name, n, fn)
+
+    if not only or "parse_candles" in only:
+        for n in sorted({min(n, PARSE_MAX) for n in sizes}):
+            candles = synthetic_candles(synthetic_ohlc(n))
+            record("parse_candles", n, lambda: data._parse_candles(candles))
+
+    saved = dict(data._news_state)
+    try:
+        for n in articles:
+            if not only or "news_filter" in only:
+                record("news_filter", n, _news_filter(synthetic_articles(n)))
+    finally:
+        data._news_state.clear()
+        data._news_state.update(saved)
+        data._matchers.clear()
+
+    return {"meta": _meta(), "results": results}
+
+
+def _meta() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "numpy":     np.__version__,
+        "pandas":    pd.__version__,
+        "machine":   platform.machine(),
+        "processor": platform.processor(),
+        "cpus":      os.cpu_count(),
+        "seed":      SEED,
+    }
+
+
+def _fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+# ─── Baseline Compare ─────────────────────────────────────────────────────────
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Cases present in both runs whose median got slower than
+    baseline * (1 + tolerance), as (case, baseline_s, current_s, ratio).
+    """
+    regressions = []
+    print(f"\n── vs baseline from {baseline['meta'].get('timestamp', '?')} ──")
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        ratio = now["median"] / before["median"] if before["median"] > 0 else float("inf")
+        flag  = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append((key, before["median"], now["median"], ratio))
+        elif ratio < 1 / (1 + tolerance):
+            flag = "  faster"
+        print(f"  {key:<32} {_fmt(before['median']):>10} -> {_fmt(now['median']):>10}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the strategy hot paths")
+    parser.add_argument("--sizes",    help="Comma-separated bar counts (default 500..10M)")
+    parser.add_argument("--articles", help="Comma-separated article counts for news_filter")
+    parser.add_argument("--only",     help="Comma-separated case names to run")
+    parser.add_argument("--out",      default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the baseline")
+    parser.add_argument("--compare",  action="store_true", help="Compare against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes    = [int(s) for s in args.sizes.split(",")] if args.sizes else DEFAULT_SIZES
+    articles = [int(s) for s in args.articles.split(",")] if args.articles else DEFAULT_ARTICLES
+    only     = set(args.only.split(",")) if args.only else None
+
+    results = run(sizes, articles, only)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[BENCH] Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[BENCH] Baseline written to {args.baseline}")
+    elif args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"[BENCH] No baseline at {args.baseline} -- run with --save-baseline first")
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regressions over {args.tolerance:.0%}")
+            sys.exit(1)
+        print("[BENCH] No regressions")
+
+
+if __name__ == "__main__":
+    main()
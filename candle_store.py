@@ -0,0 +1,253 @@
+"""
+candle_store.py - Local on-disk candle archive with paginated OANDA backfill.
+
+One .npy file per instrument and granularity under STORE_DIR, e.g.
+  candles/XAU_USD_M5.npy   float64, shape (n, 6), column-major
+  columns: time (epoch seconds, bar open), open, high, low, close, volume
+
+Files are memory-mapped on read and each column is contiguous on disk, so a
+time-range query is a zero-copy slice of the mapped file.
+
+Usage:
+  python candle_store.py backfill XAU_USD M5 --from 2023-01-01 [--to 2024-06-30]
+  python candle_store.py info XAU_USD M5
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import oandapyV20.endpoints.instruments as instruments
+
+from config import ASSET_CONFIG
+from data import GRANULARITY_MAP, parse_candle_arrays
+from http_client import oanda_client
+
+STORE_DIR  = "candles"
+PAGE_SIZE  = 5000          # OANDA's max candles per request
+COLUMNS    = ["time", "open", "high", "low", "close", "volume"]
+GAP_SECONDS = 6 * 3600     # shorter holes are treated as quiet markets, not gaps
+
+GRANULARITY_SECONDS = {
+    "M1":  60,
+    "M5":  300,
+    "M15": 900,
+    "M30": 1800,
+    "H1":  3600,
+    "H4":  14400,
+    "D":   86400,
+}
+
+
+def _path(instrument: str, granularity: str) -> str:
+    return os.path.join(STORE_DIR, f"{instrument}_{granularity}.npy")
+
+
+def _empty() -> np.ndarray:
+    return np.empty((0, len(COLUMNS)), dtype=np.float64, order="F")
+
+
+def _to_epoch(ts) -> float:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.timestamp()
+
+
+def _to_rfc3339(epoch: float) -> str:
+    return pd.Timestamp(epoch, unit="s", tz="UTC").strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# ─── Reading ──────────────────────────────────────────────────────────────────
+
+def load(instrument: str, granularity: str) -> np.ndarray:
+    """Memory-maps the stored array (read-only). Empty if nothing is stored."""
+    path = _path(instrument, granularity)
+    if not os.path.exists(path):
+        return _empty()
+    return np.load(path, mmap_mode="r")
+
+
+def read_range(instrument: str, granularity: str, start=None, end=None) -> np.ndarray:
+    """
+    Returns the stored rows with start <= bar time < end as a view into the
+    mapped file — no data is copied.
+    """
+    arr   = load(instrument, granularity)
+    times = arr[:, 0]
+    lo    = int(np.searchsorted(times, _to_epoch(start), side="left"))  if start is not None else 0
+    hi    = int(np.searchsorted(times, _to_epoch(end),   side="left"))  if end   is not None else len(arr)
+    return arr[lo:hi]
+
+
+def get_candles(symbol: str, resolution: str, lookback_bars: int = 100,
+                start=None, end=None) -> pd.DataFrame:
+    """
+    Offline counterpart of data.get_candles.
+
+    Returns the last `lookback_bars` stored bars ending before `end`, or every
+    bar in [start, end) when `start` is given. The OHLC columns are one
+    block viewing the mapped file (the store is column-major, so they are
+    contiguous); only volume is copied, to int64.
+    """
+    instrument  = symbol or ASSET_CONFIG["oanda_instrument"]
+    granularity = GRANULARITY_MAP.get(resolution, resolution)
+
+    rows = read_range(instrument, granularity, start, end)
+    if start is None:
+        rows = rows[-lookback_bars:]
+    if len(rows) == 0:
+        print(f"[STORE] No stored candles for {instrument} {granularity}")
+        return pd.DataFrame()
+
+    index = pd.DatetimeIndex(pd.to_datetime(rows[:, 0].astype(np.int64), unit="s", utc=True), name="timestamp")
+    # Passing the columns separately would make pandas consolidate them into a new block
+    df = pd.DataFrame(rows[:, 1:5], columns=COLUMNS[1:5], index=index, copy=False)
+    df["volume"] = rows[:, 5].astype(np.int64)
+    return df
+
+
+# ─── Writing ──────────────────────────────────────────────────────────────────
+
+def write(instrument: str, granularity: str, rows: np.ndarray) -> int:
+    """
+    Merges rows into the stored file, keeping it sorted with one row per bar
+    time (new rows win). Returns the stored row count.
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    existing = np.array(load(instrument, granularity))
+    merged   = np.concatenate([existing, rows]) if len(existing) else np.asarray(rows)
+
+    # Stable sort, then keep the last occurrence of each time
+    order  = np.argsort(merged[:, 0], kind="stable")
+    merged = merged[order]
+    keep   = np.ones(len(merged), dtype=bool)
+    keep[:-1] = merged[1:, 0] != merged[:-1, 0]
+    merged = np.asfortranarray(merged[keep])
+
+    path = _path(instrument, granularity)
+    tmp  = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, merged)
+    os.replace(tmp, path)
+    return len(merged)
+
+
+def _candles_to_rows(candles: list) -> np.ndarray:
+    times, columns = parse_candle_arrays(candles)
+    if not len(times):
+        return _empty()
+    rows = np.empty((len(times), len(COLUMNS)), dtype=np.float64, order="F")
+    rows[:, 0] = times.astype(np.int64) / 1e9
+    for i, name in enumerate(COLUMNS[1:], start=1):
+        rows[:, i] = columns[name]
+    return rows
+
+
+def _fetch_range(instrument: str, granularity: str, start: float, end: float) -> np.ndarray:
+    """Pages through OANDA from start to end, PAGE_SIZE candles per request."""
+    pages  = []
+    cursor = start
+    first  = True
+    while cursor < end:
+        params = {
+            "from":         _to_rfc3339(cursor),
+            "includeFirst": "true" if first else "false",
+            "count":        PAGE_SIZE,
+            "granularity":  granularity,
+            "price":        "M",
+        }
+        r       = instruments.InstrumentsCandles(instrument, params=params)
+        candles = oanda_client.request(r).get("candles", [])
+        if not candles:
+            break
+
+        page = _candles_to_rows(candles)
+        pages.append(page[page[:, 0] < end])
+
+        cursor = pd.Timestamp(candles[-1]["time"]).timestamp()
+        first  = False
+        if len(candles) < PAGE_SIZE or not candles[-1].get("complete"):
+            break
+
+    return np.concatenate(pages) if pages else _empty()
+
+
+def _find_gaps(times: np.ndarray, granularity: str) -> list:
+    """
+    Holes between stored bars worth refetching: longer than GAP_SECONDS and
+    not spanning a Saturday, when the market is always closed.
+    """
+    threshold = max(GAP_SECONDS, 2 * GRANULARITY_SECONDS.get(granularity, 60))
+    idx       = np.nonzero(np.diff(times) > threshold)[0]
+    gaps      = []
+    for i in idx:
+        lo, hi = times[i], times[i + 1]
+        days   = np.arange(np.datetime64(int(lo), "s").astype("datetime64[D]"),
+                           np.datetime64(int(hi), "s").astype("datetime64[D]") + 1)
+        # 1970-01-01 was a Thursday, so Saturday is (days + 3) % 7 == 5
+        if not ((days.astype(np.int64) + 3) % 7 == 5).any():
+            gaps.append((lo, hi))
+    return gaps
+
+
+def backfill(instrument: str, granularity: str, start, end=None) -> int:
+    """
+    Fills the archive for [start, end): anything before the first stored bar,
+    after the last one, and any holes in between. Returns rows added.
+    """
+    start  = _to_epoch(start)
+    end    = _to_epoch(end) if end is not None else pd.Timestamp.now(tz="UTC").timestamp()
+    times  = np.array(load(instrument, granularity)[:, 0])
+
+    if len(times) == 0:
+        ranges = [(start, end)]
+    else:
+        ranges = []
+        if start < times[0]:
+            ranges.append((start, times[0]))
+        ranges.extend((lo, hi) for lo, hi in _find_gaps(times, granularity)
+                      if hi > start and lo < end)
+        if times[-1] < end:
+            ranges.append((times[-1], end))
+
+    before = len(times)
+    total  = before
+    for lo, hi in ranges:
+        print(f"[STORE] Fetching {instrument} {granularity} {_to_rfc3339(lo)} -> {_to_rfc3339(hi)}")
+        rows = _fetch_range(instrument, granularity, lo, hi)
+        if len(rows):
+            total = write(instrument, granularity, rows)
+
+    print(f"[STORE] {instrument} {granularity}: {total} bars stored ({total - before} new)")
+    return total - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local candle archive")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    bf = sub.add_parser("backfill", help="Download missing history from OANDA")
+    bf.add_argument("instrument")
+    bf.add_argument("granularity")
+    bf.add_argument("--from", dest="start", required=True)
+    bf.add_argument("--to",   dest="end")
+
+    info = sub.add_parser("info", help="Show what is stored")
+    info.add_argument("instrument")
+    info.add_argument("granularity")
+
+    args = parser.parse_args()
+    if args.command == "backfill":
+        backfill(args.instrument, args.granularity, args.start, args.end)
+    else:
+        arr = load(args.instrument, args.granularity)
+        if len(arr) == 0:
+            print(f"[STORE] Nothing stored for {args.instrument} {args.granularity}")
+        else:
+            print(f"[STORE] {args.instrument} {args.granularity}: {len(arr)} bars "
+                  f"{_to_rfc3339(arr[0, 0])} -> {_to_rfc3339(arr[-1, 0])}")
+
+
+if __name__ == "__main__":
+    main()
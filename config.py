@@ -7,10 +7,18 @@ ASSET_CONFIG = {
     "name": "Gold",
     "finnhub_symbol": "OANDA:XAU_USD",
     "oanda_instrument": "XAU_USD",
-    "news_keywords": ["gold", "XAU", "fed", "inflation", "dollar", "interest rate", "central bank", "safe haven", "geopolitical", "treasury", "tariff", "silver", "commodity"],
+    "news_keywords": ["gold", "XAU", "fed", "federal reserve", "inflation", "inflationary", "dollar", "interest rate", "central bank", "safe haven", "geopolitical", "treasury", "tariff", "silver", "commodity"],
     "description": "Gold Spot vs USD"
 }
 
+# Instruments main.py trades side by side, each with its own state.
+# Add more entries in the same shape as ASSET_CONFIG, e.g.
+#   {"name": "Silver", "finnhub_symbol": "OANDA:XAG_USD", "oanda_instrument": "XAG_USD",
+#    "news_keywords": ["silver", "XAG", "fed", "federal reserve", "dollar"], "description": "Silver Spot vs USD"}
+ASSET_CONFIGS = [
+    ASSET_CONFIG,
+]
+
 # Trading parameters — validated via rigorous walk-forward backtest (15 months)
 TRADE_CONFIG = {
     "timeframe": "5",           # minutes
@@ -23,11 +31,12 @@ TRADE_CONFIG = {
     "htf_confirmation": False,    # NEW — only trade when 1H EMA50 agrees with 15min signal
     "conflict_mode": "risky",
     "news_lookback_hours": 24,
-    "poll_interval_seconds": 300,
+    "bar_close_delay_seconds": 3,  # polling mode: run this long after each bar closes
     "oanda_units": 1,
 }
 
-# Session filter — only trade London + NY overlap (7am-5pm UTC)
+# Session filter — polling mode only wakes for bars closing in these hours
+# (plus any time a trade is open); entries are further limited by is_trading_session
 SESSION_CONFIG = {
     "enabled": True,
     "start_hour_utc": 7,
@@ -39,6 +48,7 @@ SENTIMENT_CONFIG = {
     "bullish_threshold": 0.2,
     "bearish_threshold": -0.2,
     "high_impact_score": 0.6,
+    "local_confidence": 0.5,     # lexicon readings below this go to Claude
 }
 
 # API Keys - loaded from .env file (never hardcode keys here)
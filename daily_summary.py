@@ -4,16 +4,14 @@ Run via cron at 17:00 UTC: 0 17 * * 1-5 cd /home/ec2-user && python3 daily_summa
 """
 
 import os
-import requests
 import anthropic
 from datetime import datetime, timezone, date
 from dotenv import load_dotenv
+from http_client import session, oanda_session
 
 load_dotenv()
 
-OANDA_TOKEN   = os.getenv("OANDA_ACCESS_TOKEN")
 OANDA_BASE    = "https://api-fxpractice.oanda.com/v3"
-HEADERS       = {"Authorization": f"Bearer {OANDA_TOKEN}"}
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT  = os.getenv("TELEGRAM_CHAT_ID")
 
@@ -29,14 +27,14 @@ BOTS = {
 def send_message(text):
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        requests.post(url, json={"chat_id": TELEGRAM_CHAT, "text": text[:4093], "parse_mode": "HTML"}, timeout=5)
+        session.post(url, json={"chat_id": TELEGRAM_CHAT, "text": text[:4093], "parse_mode": "HTML"}, timeout=5)
     except Exception as e:
         print(f"[TELEGRAM] {e}")
 
 
 def get_account(account_id):
     try:
-        resp = requests.get(f"{OANDA_BASE}/accounts/{account_id}/summary", headers=HEADERS, timeout=10)
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{account_id}/summary")
         acc = resp.json().get("account", {})
         return {"balance": float(acc.get("balance", 0)), "nav": float(acc.get("NAV", 0))}
     except Exception:
@@ -45,10 +43,7 @@ def get_account(account_id):
 
 def get_todays_trades(account_id):
     try:
-        resp = requests.get(
-            f"{OANDA_BASE}/accounts/{account_id}/trades?state=CLOSED&count=100",
-            headers=HEADERS, timeout=10
-        )
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{account_id}/trades?state=CLOSED&count=100")
         trades = resp.json().get("trades", [])
         today  = date.today().isoformat()
         result = []
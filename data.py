@@ -2,23 +2,18 @@
 data.py - Price data from OANDA, news from Finnhub free tier
 """
 
-import requests
+import re
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-import oandapyV20
 import oandapyV20.endpoints.instruments as instruments
-from config import (
-    FINNHUB_API_KEY, ASSET_CONFIG,
-    OANDA_ACCESS_TOKEN, OANDA_ENVIRONMENT
-)
+from config import FINNHUB_API_KEY, ASSET_CONFIG
+from http_client import oanda_client, session
+from metrics import count, timed
 
 FINNHUB_BASE = "https://finnhub.io/api/v1"
 
-oanda_client = oandapyV20.API(
-    access_token=OANDA_ACCESS_TOKEN,
-    environment=OANDA_ENVIRONMENT
-)
-
 GRANULARITY_MAP = {
     "1":   "M1",
     "5":   "M5",
@@ -30,76 +25,343 @@ GRANULARITY_MAP = {
 }
 
 
+# Rolling cache of completed bars, keyed on (instrument, granularity).
+# Only bars after the last cached timestamp are requested on later calls.
+_candle_cache = {}
+
+# H1 / D windows are rolled forward from 5min bars (derive_candles) and
+# re-synced with OANDA every DERIVED_RESYNC seconds
+DERIVED_SECONDS = {"H1": 3600, "D": 86400}
+DERIVED_RESYNC  = 6 * 3600
+DAILY_TIMEZONE  = "America/New_York"
+DAILY_ALIGNMENT = pd.Timedelta(hours=17)   # OANDA's default dailyAlignment
+
+# Finnhub general news, ingested incrementally: each fetch asks only for ids
+# after the newest one seen (minId), and articles stay in a deduplicated
+# window keyed by id. The window is shared by every instrument; each keyword
+# list gets a compiled matcher and only scans articles it has not seen yet.
+NEWS_TTL    = 60   # seconds between feed fetches
+_news_state = {
+    "fetched":   float("-inf"),
+    "last_id":   0,
+    "horizon":   0,        # hours of news kept, the longest lookback asked for
+    "articles":  {},       # id -> article, ascending id
+    "headlines": set(),    # normalised headlines in the window, for reposts
+}
+_matchers = {}             # tuple(keywords) -> {"regex", "scanned_id", "matched"}
+
+
+def parse_candle_arrays(candles: list) -> tuple:
+    """
+    Bulk parse of an OANDA candles payload: (times, columns) for the
+    complete candles, times as datetime64[ns] UTC bar opens and columns as
+    {open, high, low, close: float64, volume: int64}. Each field is read in
+    one pass straight into an exactly sized array and timestamps are parsed
+    in a single vectorized call. The incomplete forming candle (always the
+    last one) is dropped with a slice, so nothing is copied afterwards.
+    """
+    n    = len(candles)
+    mids = [c["mid"] for c in candles]
+    columns = {
+        field: np.fromiter((m[key] for m in mids), dtype=float, count=n)
+        for field, key in (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c"))
+    }
+    columns["volume"] = np.fromiter((c.get("volume", 0) for c in candles), dtype=np.int64, count=n)
+    times    = np.array([c["time"].rstrip("Z") for c in candles], dtype="datetime64[ns]")
+    complete = np.fromiter((c.get("complete", False) for c in candles), dtype=bool, count=n)
+
+    if complete.all():
+        return times, columns
+    keep = slice(0, n - 1) if complete[:-1].all() else complete
+    return times[keep], {k: v[keep] for k, v in columns.items()}
+
+
+def _parse_candles(candles: list) -> pd.DataFrame:
+    times, columns = parse_candle_arrays(candles)
+    if not len(times):
+        return pd.DataFrame()
+    index = pd.DatetimeIndex(times, name="timestamp").tz_localize("UTC")
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _fetch_candles(instrument: str, params: dict) -> list:
+    r  = instruments.InstrumentsCandles(instrument, params=params)
+    rv = oanda_client.request(r)
+    return rv.get("candles", [])
+
+
+@timed("get_candles")
 def get_candles(symbol: str, resolution: str, lookback_bars: int = 100) -> pd.DataFrame:
-    """Fetch OHLCV candles from OANDA."""
-    instrument  = ASSET_CONFIG["oanda_instrument"]
+    """
+    Fetch OHLCV candles from OANDA.
+
+    The first call for an (instrument, granularity) pair pulls the full
+    window; later calls only ask for bars from the last cached completed
+    bar onward and roll the window forward. The forming bar is never cached,
+    so it is picked up again once OANDA marks it complete. The last cached
+    bar is refetched too, so OANDA's copy replaces one added by record_bar.
+    """
+    instrument  = symbol or ASSET_CONFIG["oanda_instrument"]
     granularity = GRANULARITY_MAP.get(resolution, "M15")
+    key         = (instrument, granularity)
+
+    cached = _candle_cache.get(key)
+    if cached is not None and cached["lookback"] >= lookback_bars:
+        bars   = cached["bars"]
+        params = {
+            "from":         bars.index[-1].strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "includeFirst": "true",
+            "count":        lookback_bars,
+            "granularity":  granularity,
+            "price":        "M",
+        }
+        candles = _fetch_candles(instrument, params)
 
+        # A full page means we fell a whole window behind — refetch instead
+        if len(candles) < lookback_bars:
+            count("candle_cache_hit")
+            new = _parse_candles(candles)
+            if not new.empty:
+                df   = pd.concat([bars, new])
+                bars = df[~df.index.duplicated(keep="last")].iloc[-cached["window"]:]
+                cached["bars"] = bars
+            _mark_synced(cached)
+            return bars.iloc[-lookback_bars:]
+
+    count("candle_cache_miss")
     params = {
         "count":       lookback_bars,
         "granularity": granularity,
         "price":       "M",
     }
-
-    r  = instruments.InstrumentsCandles(instrument, params=params)
-    rv = oanda_client.request(r)
-
-    candles = rv.get("candles", [])
+    candles = _fetch_candles(instrument, params)
     if not candles:
         print(f"[DATA] No candles returned for {instrument}")
         return pd.DataFrame()
 
-    rows = []
-    for c in candles:
-        if not c.get("complete"):
-            continue
-        mid = c.get("mid", {})
-        rows.append({
-            "timestamp": pd.to_datetime(c["time"]),
-            "open":      float(mid.get("o", 0)),
-            "high":      float(mid.get("h", 0)),
-            "low":       float(mid.get("l", 0)),
-            "close":     float(mid.get("c", 0)),
-            "volume":    int(c.get("volume", 0)),
-        })
-
-    df = pd.DataFrame(rows)
-    df.set_index("timestamp", inplace=True)
+    df = _parse_candles(candles)
+    if not df.empty:
+        # window: completed bars kept (the forming one is dropped, so usually lookback - 1)
+        _candle_cache[key] = _mark_synced({"bars": df, "lookback": lookback_bars, "window": len(df)})
     return df
 
 
-def get_news(keywords: list, lookback_hours: int = 2) -> list:
+def record_bar(instrument: str, granularity: str, bar: dict) -> None:
     """
-    Fetch general market news from Finnhub free tier.
-    Returns articles matching gold-relevant keywords.
+    Appends a locally built completed bar (see stream.BarAggregator) to the
+    cached window, so the next get_candles call already includes it.
     """
-    url    = f"{FINNHUB_BASE}/news"
+    cached = _candle_cache.get((instrument, granularity))
+    if cached is None:
+        return
+
+    bars = cached["bars"]
+    ts   = pd.Timestamp(bar["timestamp"], unit="s", tz="UTC")
+    if ts <= bars.index[-1]:
+        return
+
+    row = pd.DataFrame([{k: bar[k] for k in ("open", "high", "low", "close", "volume")}],
+                       index=pd.DatetimeIndex([ts], name="timestamp"))
+    cached["bars"] = pd.concat([bars, row]).iloc[-cached["window"]:]
+
+
+# ─── Derived Timeframes ───────────────────────────────────────────────────────
+
+def _mark_synced(cached: dict) -> dict:
+    """The window now matches OANDA; local folding restarts after its last bar."""
+    cached["synced"]  = time.monotonic()
+    cached["forming"] = None
+    cached["through"] = None
+    return cached
+
+
+def period_open(index: pd.DatetimeIndex, granularity: str) -> pd.DatetimeIndex:
+    """
+    Open time of the H1 or D bar each timestamp falls in. Daily bars run
+    17:00 to 17:00 New York like OANDA's default alignment, through DST.
+    """
+    if granularity != "D":
+        return index.floor(f"{DERIVED_SECONDS[granularity]}s")
+    # Shift so 17:00 wall clock becomes midnight, floor, shift back
+    local = index.tz_convert(DAILY_TIMEZONE).tz_localize(None)
+    opens = (local - DAILY_ALIGNMENT).floor("D") + DAILY_ALIGNMENT
+    return opens.tz_localize(DAILY_TIMEZONE).tz_convert("UTC")
+
+
+def needs_sync(symbol: str, resolution: str, lookback_bars: int) -> bool:
+    """True when derive_candles would have to go to OANDA (no window yet, too short, or stale)."""
+    granularity = GRANULARITY_MAP.get(resolution, "M15")
+    cached      = _candle_cache.get((symbol or ASSET_CONFIG["oanda_instrument"], granularity))
+    return (granularity not in DERIVED_SECONDS or cached is None
+            or cached["lookback"] < lookback_bars
+            or time.monotonic() - cached.get("synced", float("-inf")) >= DERIVED_RESYNC)
+
+
+def derive_candles(symbol: str, resolution: str, lookback_bars: int, df_5m: pd.DataFrame) -> pd.DataFrame:
+    """
+    H1 or D candles like get_candles, rolled forward from completed 5min
+    bars instead of a REST call. The completed window comes from
+    get_candles; each call folds only the 5min bars after the last one
+    folded into the forming bar and moves bars into the window as their
+    period ends. Falls back to get_candles when a sync is due or df_5m
+    does not reach back far enough to cover the forming bar.
+    """
+    instrument  = symbol or ASSET_CONFIG["oanda_instrument"]
+    granularity = GRANULARITY_MAP.get(resolution, "M15")
+    if needs_sync(instrument, resolution, lookback_bars) or df_5m is None or df_5m.empty:
+        return get_candles(instrument, resolution, lookback_bars)
+
+    cached = _candle_cache[(instrument, granularity)]
+    bars   = cached["bars"]
+    if cached["through"] is not None:
+        new = df_5m[df_5m.index > cached["through"]]
+        gap = df_5m.index[0] > cached["through"]
+    else:
+        last_open = bars.index[-1]
+        opens     = period_open(df_5m.index, granularity)
+        new       = df_5m[opens > last_open]
+        gap       = opens[0] > last_open
+    if gap:
+        count("derive_gap")
+        return get_candles(instrument, resolution, lookback_bars)
+    if new.empty:
+        return bars.iloc[-lookback_bars:]
+
+    # One OHLCV row per period in the new 5min bars
+    opens  = period_open(new.index, granularity)
+    starts = np.flatnonzero(np.r_[True, opens[1:] != opens[:-1]])
+    ends   = np.r_[starts[1:] - 1, len(new) - 1]
+    index  = opens[starts]
+    open_  = new["open"].to_numpy()[starts]
+    high   = np.maximum.reduceat(new["high"].to_numpy(), starts)
+    low    = np.minimum.reduceat(new["low"].to_numpy(), starts)
+    close  = new["close"].to_numpy()[ends]
+    volume = np.add.reduceat(new["volume"].to_numpy(), starts)
+
+    # Fold the first period into the forming bar, or close the forming bar
+    forming = cached["forming"]
+    if forming is not None:
+        if forming["timestamp"] == index[0]:
+            open_[0]  = forming["open"]
+            high[0]   = max(high[0], forming["high"])
+            low[0]    = min(low[0], forming["low"])
+            volume[0] += forming["volume"]
+        else:
+            index  = index.insert(0, forming["timestamp"])
+            open_  = np.r_[forming["open"], open_]
+            high   = np.r_[forming["high"], high]
+            low    = np.r_[forming["low"], low]
+            close  = np.r_[forming["close"], close]
+            volume = np.r_[forming["volume"], volume]
+
+    # The last period is done once its final 5min bar has closed
+    done = period_open(new.index[-1:] + pd.Timedelta(minutes=5), granularity)[0] != index[-1]
+    keep = len(index) if done else len(index) - 1
+
+    cached["through"] = new.index[-1]
+    cached["forming"] = None if done else {
+        "timestamp": index[-1], "open": open_[-1], "high": high[-1],
+        "low": low[-1], "close": close[-1], "volume": volume[-1],
+    }
+    if keep:
+        completed = pd.DataFrame({
+            "open": open_[:keep], "high": high[:keep], "low": low[:keep],
+            "close": close[:keep], "volume": volume[:keep],
+        }, index=pd.DatetimeIndex(index[:keep], name="timestamp"))
+        completed      = completed[completed.index > bars.index[-1]]
+        cached["bars"] = bars = pd.concat([bars, completed]).iloc[-cached["window"]:]
+    count("derive_local")
+    return bars.iloc[-lookback_bars:]
+
+
+def _keyword_matcher(keywords: list) -> dict:
+    key = tuple(keywords)
+    if key not in _matchers:
+        # Whole words only ("gold" but not "Goldman"), plurals allowed. The
+        # lookarounds work as boundaries even next to symbols like "/".
+        words = sorted({kw.lower() for kw in keywords}, key=len, reverse=True)
+        regex = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, words)) + r")s?(?!\w)", re.IGNORECASE)
+        _matchers[key] = {"regex": regex, "scanned_id": 0, "matched": set()}
+    return _matchers[key]
+
+
+def _ingest_news() -> None:
+    """Pulls articles newer than the last seen id into the window."""
     params = {"category": "general", "token": FINNHUB_API_KEY}
+    if _news_state["last_id"]:
+        params["minId"] = _news_state["last_id"]
 
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        articles = resp.json()
-    except Exception as e:
-        print(f"[DATA] News fetch failed: {e}")
-        return []
+    resp = session.get(f"{FINNHUB_BASE}/news", params=params, timeout=10)
+    resp.raise_for_status()
+    _news_state["fetched"] = time.monotonic()
+
+    added = 0
+    for raw in sorted(resp.json(), key=lambda a: a.get("id", 0)):
+        article_id = raw.get("id", 0)
+        headline   = raw.get("headline", "")
+        norm       = " ".join(headline.lower().split())
+        if article_id <= _news_state["last_id"] or article_id in _news_state["articles"]:
+            continue
+        _news_state["last_id"] = article_id
+        if norm in _news_state["headlines"]:
+            continue
+        _news_state["headlines"].add(norm)
+        _news_state["articles"][article_id] = {
+            "id":       article_id,
+            "headline": headline,
+            "summary":  raw.get("summary", ""),
+            "url":      raw.get("url", ""),
+            "datetime": datetime.utcfromtimestamp(raw.get("datetime", 0)),
+            "source":   raw.get("source", ""),
+        }
+        added += 1
+    if added:
+        print(f"[DATA] Ingested {added} new articles")
 
-    cutoff   = datetime.utcnow() - timedelta(hours=lookback_hours)
-    filtered = []
 
-    for article in articles:
-        pub_time = datetime.utcfromtimestamp(article.get("datetime", 0))
-        if pub_time < cutoff:
+def _prune_news(cutoff: datetime) -> None:
+    articles = _news_state["articles"]
+    for article_id in [i for i, a in articles.items() if a["datetime"] < cutoff]:
+        article = articles.pop(article_id)
+        _news_state["headlines"].discard(" ".join(article["headline"].lower().split()))
+        for matcher in _matchers.values():
+            matcher["matched"].discard(article_id)
+
+
+@timed("get_news")
+def get_news(keywords: list, lookback_hours: int = 2) -> list:
+    """
+    Fetch general market news from Finnhub free tier.
+    Returns articles matching gold-relevant keywords, newest first.
+    """
+    if time.monotonic() - _news_state["fetched"] >= NEWS_TTL:
+        count("news_fetch")
+        try:
+            _ingest_news()
+        except Exception as e:
+            count("news_fetch_error")
+            print(f"[DATA] News fetch failed: {e}")
+            if not _news_state["articles"]:
+                return []
+
+    now = datetime.utcnow()
+    _news_state["horizon"] = max(_news_state["horizon"], lookback_hours)
+    _prune_news(now - timedelta(hours=_news_state["horizon"]))
+
+    # Match only articles this keyword list has not scanned yet
+    matcher = _keyword_matcher(keywords)
+    regex   = matcher["regex"]
+    for article_id, article in _news_state["articles"].items():
+        if article_id <= matcher["scanned_id"]:
             continue
-        text = (article.get("headline", "") + " " + article.get("summary", "")).lower()
-        if any(kw.lower() in text for kw in keywords):
-            filtered.append({
-                "headline": article.get("headline", ""),
-                "summary":  article.get("summary", ""),
-                "url":      article.get("url", ""),
-                "datetime": pub_time,
-                "source":   article.get("source", ""),
-            })
+        if regex.search(article["headline"]) or regex.search(article["summary"]):
+            matcher["matched"].add(article_id)
+    matcher["scanned_id"] = _news_state["last_id"]
+
+    cutoff   = now - timedelta(hours=lookback_hours)
+    articles = _news_state["articles"]
+    filtered = [articles[i] for i in sorted(matcher["matched"], reverse=True)
+                if articles[i]["datetime"] >= cutoff]
 
     print(f"[DATA] Found {len(filtered)} relevant articles")
     return filtered
@@ -117,7 +379,7 @@ def get_forex_sentiment(symbol: str = "XAUUSD") -> dict:
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = session.get(url, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
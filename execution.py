@@ -2,21 +2,15 @@
 execution.py - Submits trades to OANDA demo account via v20 REST API
 """
 
-import oandapyV20
 import oandapyV20.endpoints.orders as orders
 import oandapyV20.endpoints.trades as trades_ep
 import oandapyV20.endpoints.positions as positions_ep
 from oandapyV20.contrib.requests import MarketOrderRequest, TakeProfitDetails, StopLossDetails
 from oandapyV20.exceptions import V20Error
 
-from config import OANDA_ACCESS_TOKEN, OANDA_ACCOUNT_ID, OANDA_ENVIRONMENT, TRADE_CONFIG, ASSET_CONFIG
-
-
-# Initialize OANDA client
-client = oandapyV20.API(
-    access_token=OANDA_ACCESS_TOKEN,
-    environment=OANDA_ENVIRONMENT  # "practice" for demo, "live" for real
-)
+from config import OANDA_ACCOUNT_ID, TRADE_CONFIG, ASSET_CONFIG
+from http_client import oanda_client as client
+from metrics import count, timed
 
 
 def get_open_trades() -> list:
@@ -36,12 +30,13 @@ def has_open_position(instrument: str) -> bool:
     return any(t.get("instrument") == instrument for t in open_trades)
 
 
-def submit_order(signal: dict) -> dict:
+@timed("submit_order")
+def submit_order(signal: dict, instrument: str = None) -> dict:
     """
     Submit a market order to OANDA demo account with TP and SL attached.
     Units are positive for buy, negative for sell.
     """
-    instrument = ASSET_CONFIG["oanda_instrument"]
+    instrument = instrument or ASSET_CONFIG["oanda_instrument"]
 
     if not signal.get("trade"):
         return {"status": "skipped", "reason": signal.get("reason")}
@@ -84,6 +79,7 @@ def submit_order(signal: dict) -> dict:
         }
 
     except V20Error as e:
+        count("order_rejected")
         print(f"[EXEC] OANDA error: {e}")
         return {
             "status": "error",
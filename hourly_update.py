@@ -3,18 +3,16 @@ hourly_update.py - Hourly status for both bots.
 Cron: 0 * * * * cd /home/ec2-user && python3 hourly_update.py
 """
 
-import requests
 import os
 from datetime import datetime, timezone, date
 from dotenv import load_dotenv
+from http_client import session, oanda_session
 
 load_dotenv()
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT  = os.getenv("TELEGRAM_CHAT_ID")
-OANDA_TOKEN    = os.getenv("OANDA_ACCESS_TOKEN")
 OANDA_BASE     = "https://api-fxpractice.oanda.com/v3"
-HEADERS        = {"Authorization": f"Bearer {OANDA_TOKEN}"}
 
 BOTS = {
     "Conservative": "101-004-37417354-005",
@@ -25,14 +23,14 @@ BOTS = {
 def send_message(text):
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        requests.post(url, json={"chat_id": TELEGRAM_CHAT, "text": text[:4093], "parse_mode": "HTML"}, timeout=5)
+        session.post(url, json={"chat_id": TELEGRAM_CHAT, "text": text[:4093], "parse_mode": "HTML"}, timeout=5)
     except Exception as e:
         print(f"[TELEGRAM] {e}")
 
 
 def get_summary(account_id):
     try:
-        resp = requests.get(f"{OANDA_BASE}/accounts/{account_id}/summary", headers=HEADERS, timeout=10)
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{account_id}/summary")
         acc  = resp.json().get("account", {})
         return {"balance": float(acc.get("balance", 0)), "nav": float(acc.get("NAV", 0))}
     except Exception:
@@ -41,7 +39,7 @@ def get_summary(account_id):
 
 def get_open_trade(account_id):
     try:
-        resp   = requests.get(f"{OANDA_BASE}/accounts/{account_id}/openTrades", headers=HEADERS, timeout=10)
+        resp   = oanda_session.get(f"{OANDA_BASE}/accounts/{account_id}/openTrades")
         trades = resp.json().get("trades", [])
         for t in trades:
             if t.get("instrument") == "XAU_USD":
@@ -58,7 +56,7 @@ def get_open_trade(account_id):
 
 def get_today(account_id):
     try:
-        resp   = requests.get(f"{OANDA_BASE}/accounts/{account_id}/trades?state=CLOSED&count=100", headers=HEADERS, timeout=10)
+        resp   = oanda_session.get(f"{OANDA_BASE}/accounts/{account_id}/trades?state=CLOSED&count=100")
         trades = resp.json().get("trades", [])
         today  = date.today().isoformat()
         wins = losses = 0
@@ -0,0 +1,66 @@
+"""
+http_client.py - Shared pooled HTTP sessions for OANDA, Finnhub and Telegram.
+
+Every outbound call goes through one of two keep-alive sessions so TCP/TLS
+connections are reused across cycles:
+  session        -- third-party APIs (Finnhub, Telegram); carries no credentials
+  oanda_session  -- OANDA REST; also backs oanda_client (oandapyV20)
+
+Both send gzip Accept-Encoding, apply DEFAULT_TIMEOUT when a call does not set
+its own, and retry idempotent GETs on connection errors and 429/5xx. POSTs are
+never retried so an order or alert cannot be sent twice.
+"""
+
+import requests
+import oandapyV20
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import OANDA_ACCESS_TOKEN, OANDA_ENVIRONMENT
+
+DEFAULT_TIMEOUT = 10     # seconds
+POOL_HOSTS      = 10     # distinct hosts kept pooled per session
+POOL_SIZE       = 10     # keep-alive connections per host
+
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+
+class _PooledSession(requests.Session):
+    """requests.Session with a default timeout."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session(headers: dict = None) -> requests.Session:
+    s       = _PooledSession()
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=_RETRY)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip, deflate"})
+    if headers:
+        s.headers.update(headers)
+    return s
+
+
+session = _build_session()
+
+# oandapyV20 sets the bearer token on its own Session — move those headers
+# onto a pooled one so its calls and our raw REST calls share connections.
+oanda_client = oandapyV20.API(
+    access_token=OANDA_ACCESS_TOKEN,
+    environment=OANDA_ENVIRONMENT,
+    request_params={"timeout": DEFAULT_TIMEOUT},
+)
+oanda_session = _build_session(dict(oanda_client.client.headers))
+oanda_client.client.close()
+oanda_client.client        = oanda_session
+oanda_client.client.stream = False
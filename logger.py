@@ -1,74 +1,311 @@
 """
-logger.py - Logs every decision cycle to CSV for analysis
+logger.py - Logs every decision cycle to a binary journal for analysis
+
+Decisions are appended as fixed-width typed records (see JOURNAL_DTYPE) to
+one file per UTC day under JOURNAL_DIR. The current day's file stays open
+with buffered writes; when the day rolls over it is closed and gzipped:
+
+  journal/decisions-2025-04-01.bin.gz   (past days)
+  journal/decisions-2025-04-02.bin      (today, still appending)
+
+Each file starts with a small header holding the record dtype, so
+read_journal can load any mix of days straight into numpy arrays. A restart
+after JOURNAL_DTYPE changes never appends to a file with the old header;
+the rest of that day goes to decisions-<day>-1.bin.
+
+  python logger.py --from 2025-01-01 --to 2025-04-01 [--csv decisions.csv]
 """
-import csv
+import argparse
+import atexit
+import gzip
+import json
 import os
-from datetime import datetime
-
-LOG_FILE = "trade_log.csv"
-HEADERS = [
-    "timestamp",
-    "price",
-    "tech_direction",
-    "tech_strength",
-    "tech_confirmed",
-    "slope",
-    "crossover_age",
-    "reject_reason",
-    "sentiment_direction",
-    "sentiment_confidence",
-    "sentiment_reasoning",
-    "signals_agree",
-    "action",
-    "signal_type",
-    "take_profit",
-    "stop_loss",
-    "reason",
-    "execution_status",
-]
+import shutil
+import struct
+import threading
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+from metrics import timed
+from technicals import TREND_CHECKS
+
+JOURNAL_DIR   = "journal"
+MAGIC         = b"MMJ1"
+FLUSH_SECONDS = 30     # buffered records reach disk at least this often
+
+SCORE_CHECKS = ["daily_agrees", "htf_agrees", "5min_agrees", "adx_ok",
+                "sentiment_ok", "no_event", "vol_normal", "sl_limit_ok"]
+
+# Strings are stored fixed-width (UTF-8, truncated); gzip removes the padding
+JOURNAL_DTYPE = np.dtype([
+    ("timestamp",            "M8[us]"),
+    ("instrument",           "S12"),
+    ("price",                "f8"),
+    ("tech_direction",       "S8"),
+    ("tech_strength",        "f8"),
+    ("tech_confirmed",       "?"),
+    ("slope",                "f8"),
+    ("ema_fast",             "f8"),
+    ("ema_slow",             "f8"),
+    ("reject_reason",        "S256"),
+    *[(f"check_{c}", "?") for c in TREND_CHECKS],
+    ("daily_bias",           "S8"),
+    ("htf_bias",             "S8"),
+    ("volatility_regime",    "S8"),
+    ("atr_ratio",            "f8"),
+    ("in_session",           "?"),
+    ("sentiment_direction",  "S8"),
+    ("sentiment_confidence", "f8"),
+    ("sentiment_reasoning",  "S256"),
+    ("signals_agree",        "?"),
+    ("score",                "i1"),
+    *[(f"score_{c}", "?") for c in SCORE_CHECKS],
+    ("event_blocked",        "?"),
+    ("action",               "S4"),
+    ("take_profit",          "f8"),
+    ("stop_loss",            "f8"),
+    ("units",                "i2"),
+    ("reason",               "S256"),
+    ("execution_status",     "S12"),
+])
+
+
+def _header(dtype: np.dtype) -> bytes:
+    descr = json.dumps(dtype.descr).encode()
+    return MAGIC + struct.pack("<I", len(descr)) + descr
+
+
+def _read_header(f, path: str) -> tuple:
+    """(record dtype, header length) from an open journal file."""
+    head = f.read(8)
+    if head[:4] != MAGIC:
+        raise ValueError(f"{path} is not a decision journal")
+    size  = struct.unpack("<I", head[4:8])[0]
+    dtype = np.dtype([tuple(d) for d in json.loads(f.read(size))])
+    return dtype, 8 + size
+
+
+def _compress(path: str):
+    with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(path + ".gz.tmp", path + ".gz")
+    os.remove(path)
+
+
+def _text(value, width: int = 256) -> bytes:
+    """UTF-8, cut to width without splitting a character."""
+    return str(value or "").encode()[:width].decode("utf-8", errors="ignore").encode()
+
+
+def _num(value, default=np.nan) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _appendable(path: str) -> bool:
+    """
+    True if records of JOURNAL_DTYPE can go on the end of `path`: it is
+    missing, empty, or has the same layout. A torn last record is cut off.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "r+b") as f:
+        try:
+            dtype, start = _read_header(f, path)
+        except (ValueError, TypeError, struct.error):
+            return False
+        if dtype != JOURNAL_DTYPE:
+            print(f"[LOG] {path} has a different record layout, starting a new file")
+            return False
+        size = os.path.getsize(path)
+        torn = (size - start) % dtype.itemsize
+        if torn:
+            f.truncate(size - torn)
+    return True
+
+
+# ─── Writer ───────────────────────────────────────────────────────────────────
+
+class DecisionJournal:
+    """Append-only daily journal; one open file, rotated and gzipped per UTC day."""
+
+    def __init__(self, directory: str = None):
+        self.directory  = directory or JOURNAL_DIR
+        self.day        = None
+        self.file       = None
+        self.last_flush = 0.0
+        self.lock       = threading.RLock()
+
+    def _open(self, day: str):
+        """
+        Appends to the day's file only if its header matches JOURNAL_DTYPE;
+        after a schema change the day continues in decisions-<day>-1.bin, -2, ...
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        n = 0
+        while True:
+            path = os.path.join(self.directory, f"decisions-{day}{f'-{n}' if n else ''}.bin")
+            if not os.path.exists(path + ".gz") and _appendable(path):
+                break
+            n += 1
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab")
+        if fresh:
+            self.file.write(_header(JOURNAL_DTYPE))
+        self.day = day
+
+    def _rotate(self, day: str):
+        self.close()
+        # Compress every finished day, including any left open by a crash
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".bin") and not name.startswith(f"decisions-{day}"):
+                    _compress(os.path.join(self.directory, name))
+        self._open(day)
+
+    def write(self, record: np.ndarray):
+        day = str(record["timestamp"][0].astype("datetime64[D]"))
+        with self.lock:
+            if day != self.day:
+                self._rotate(day)
+            self.file.write(record.tobytes())
+            if time.monotonic() - self.last_flush >= FLUSH_SECONDS:
+                self.file.flush()
+                self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                self.day  = None
+
+
+_journal = DecisionJournal()
+atexit.register(_journal.close)
 
 
 def init_log():
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=HEADERS)
-            writer.writeheader()
-        print(f"[LOG] Created {LOG_FILE}")
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    print(f"[LOG] Journaling decisions to {JOURNAL_DIR}/")
 
 
-def log_decision(trend: dict, sentiment: dict, signal: dict, execution: dict):
-    signals_agree = trend.get("direction") == sentiment.get("direction")
-    row = {
-        "timestamp":            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "price":                trend.get("close", ""),
-        "tech_direction":       trend.get("direction", ""),
-        "tech_strength":        trend.get("strength", ""),
-        "tech_confirmed":       trend.get("confirmed", ""),
-        "slope":                trend.get("slope", ""),
-        "crossover_age":        trend.get("crossover_age", ""),
-        "reject_reason":        trend.get("reject_reason", ""),
-        "sentiment_direction":  sentiment.get("direction", ""),
-        "sentiment_confidence": sentiment.get("confidence", ""),
-        "sentiment_reasoning":  sentiment.get("reasoning", ""),
-        "signals_agree":        signals_agree,
-        "action":               signal.get("action", ""),
-        "signal_type":          signal.get("signal_type", ""),
-        "take_profit":          signal.get("take_profit", ""),
-        "stop_loss":            signal.get("stop_loss", ""),
-        "reason":               signal.get("reason", ""),
-        "execution_status":     execution.get("status", ""),
-    }
-    with open(LOG_FILE, "a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=HEADERS)
-        writer.writerow(row)
-
-
-def print_decision(trend: dict, sentiment: dict, signal: dict, execution: dict):
+@timed("log_decision")
+def log_decision(trend: dict, sentiment: dict, signal: dict, execution: dict,
+                 score: dict = None, instrument: str = ""):
+    score     = score or {}
+    breakdown = score.get("breakdown", {})
+    vol       = trend.get("volatility", {})
+
+    rec = np.zeros(1, dtype=JOURNAL_DTYPE)
+    r   = rec[0]
+    r["timestamp"]            = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+    r["instrument"]           = instrument.encode()
+    r["price"]                = _num(trend.get("close"))
+    r["tech_direction"]       = trend.get("direction", "").encode()
+    r["tech_strength"]        = _num(trend.get("strength"))
+    r["tech_confirmed"]       = bool(trend.get("confirmed"))
+    r["slope"]                = _num(trend.get("slope"))
+    r["ema_fast"]             = _num(trend.get("ema_fast"))
+    r["ema_slow"]             = _num(trend.get("ema_slow"))
+    r["reject_reason"]        = _text(trend.get("reject_reason", ""))
+    for c in TREND_CHECKS:
+        r[f"check_{c}"]       = bool(trend.get("checks", {}).get(c, False))
+    r["daily_bias"]           = trend.get("daily_bias", {}).get("direction", "").encode()
+    r["htf_bias"]             = trend.get("htf_bias", {}).get("direction", "").encode()
+    r["volatility_regime"]    = vol.get("regime", "").encode()
+    r["atr_ratio"]            = _num(vol.get("atr_ratio"))
+    r["in_session"]           = bool(trend.get("in_session"))
+    r["sentiment_direction"]  = sentiment.get("direction", "").encode()
+    r["sentiment_confidence"] = _num(sentiment.get("confidence"))
+    r["sentiment_reasoning"]  = _text(sentiment.get("reasoning", ""))
+    r["signals_agree"]        = trend.get("direction") == sentiment.get("direction")
+    r["score"]                = score.get("score", 0)
+    for c in SCORE_CHECKS:
+        r[f"score_{c}"]       = bool(breakdown.get(c, False))
+    r["event_blocked"]        = bool(score.get("event", {}).get("blocked", False))
+    r["action"]               = (signal.get("action") or "").encode()
+    r["take_profit"]          = _num(signal.get("take_profit"))
+    r["stop_loss"]            = _num(signal.get("stop_loss"))
+    r["units"]                = signal.get("units") or 0
+    r["reason"]               = _text(signal.get("reason", ""))
+    r["execution_status"]     = execution.get("status", "").encode()
+    _journal.write(rec)
+
+
+# ─── Reader ───────────────────────────────────────────────────────────────────
+
+def _read_file(path: str) -> np.ndarray:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        dtype, _ = _read_header(f, path)
+        body     = memoryview(f.read())
+    usable = len(body) - len(body) % dtype.itemsize   # ignore a torn last record
+    return np.frombuffer(body[:usable], dtype=dtype)
+
+
+def _to_frame(arr: np.ndarray) -> pd.DataFrame:
+    """Structured records -> DataFrame; text columns become categoricals."""
+    cols = {}
+    for name in arr.dtype.names:
+        col = arr[name]
+        if col.dtype.kind == "S":
+            # Few distinct strings repeat across many rows — decode each once
+            codes, values = pd.factorize(col.astype(object))
+            col = pd.Categorical.from_codes(codes, [v.decode() for v in values])
+        cols[name] = col
+    return pd.DataFrame(cols)
+
+
+def read_journal(start=None, end=None, directory: str = None) -> pd.DataFrame:
+    """
+    Every journaled decision with start <= timestamp < end (UTC), as a
+    DataFrame indexed by timestamp. String columns are decoded to str.
+    """
+    directory = directory or JOURNAL_DIR
+    start     = pd.Timestamp(start, tz="UTC") if start is not None else None
+    end       = pd.Timestamp(end, tz="UTC") if end is not None else None
+
+    parts = []
+    names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    for name in names:
+        if not name.startswith("decisions-") or not name.endswith((".bin", ".bin.gz")):
+            continue
+        day = pd.Timestamp(name[len("decisions-"):len("decisions-") + 10], tz="UTC")
+        if (start is not None and day + pd.Timedelta(days=1) <= start) or (end is not None and day >= end):
+            continue
+        parts.append(_read_file(os.path.join(directory, name)))
+
+    if not parts:
+        return pd.DataFrame(columns=JOURNAL_DTYPE.names).set_index("timestamp")
+
+    # Days sharing a schema are joined as raw records; older files may lack
+    # newer columns, which then come back as NaN
+    groups = {}
+    for arr in parts:
+        groups.setdefault(arr.dtype, []).append(arr)
+    frames = [_to_frame(np.concatenate(g)) for g in groups.values()]
+    df     = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df = df.set_index("timestamp").sort_index()
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index < end]
+    return df
+
+
+def print_decision(trend: dict, sentiment: dict, signal: dict, execution: dict, name: str = "Gold"):
     signals_agree = trend.get("direction") == sentiment.get("direction")
     agree_str = "✅ AGREE" if signals_agree else "⚠️  CONFLICT"
 
     print("\n" + "="*60)
-    print(f"[{datetime.utcnow().strftime('%H:%M:%S')}] Gold @ {trend.get('close', '?')}")
+    print(f"[{datetime.utcnow().strftime('%H:%M:%S')}] {name} @ {trend.get('close', '?')}")
     print(f"  TECH:      {trend.get('direction','?').upper()} | ADX={trend.get('strength','?')} | confirmed={trend.get('confirmed','?')}")
     print(f"  SLOPE:     {trend.get('slope','?')} | Crossover: {trend.get('crossover_age','?')} candles ago")
     if not trend.get("confirmed"):
@@ -81,3 +318,24 @@ def print_decision(trend: dict, sentiment: dict, signal: dict, execution: dict):
         print(f"  TP={signal.get('take_profit')} | SL={signal.get('stop_loss')}")
     print(f"  EXECUTION: {execution.get('status','')}")
     print("="*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the decision journal")
+    parser.add_argument("--from", dest="start", help="Start date (UTC)")
+    parser.add_argument("--to",   dest="end",   help="End date (UTC, exclusive)")
+    parser.add_argument("--csv",  help="Export the selected decisions to CSV")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    df      = read_journal(args.start, args.end)
+    print(f"[LOG] {len(df)} decisions loaded in {time.perf_counter() - started:.3f}s")
+    if not df.empty:
+        print(df[["instrument", "price", "tech_direction", "score", "action", "execution_status"]].tail(10).to_string())
+    if args.csv:
+        df.to_csv(args.csv)
+        print(f"[LOG] Written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
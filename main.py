@@ -1,6 +1,9 @@
 """
 main.py - Gold trading bot v2.
 
+Runs every ASSET_CONFIGS instrument in one process, each with its own
+InstrumentState (tracked trade, cooldown, SL hits).
+
 Top-down strategy:
   Daily EMA50 bias -> 1H confirmation -> 5min entry
   AI scoring (8 point rubric) required
@@ -9,19 +12,26 @@ Top-down strategy:
   Re-entry checks after TP
 """
 
+import argparse
+import threading
 import time
 import traceback
-from datetime import datetime, timezone
-import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, time as dtime, timezone
+import pandas as pd
 import os
 
-from config import ASSET_CONFIG, TRADE_CONFIG, validate_keys
-from data import get_candles, get_news
-from technicals import get_trend_signal
-from ai_layer import get_news_sentiment, score_trade, get_economic_calendar
+from config import ASSET_CONFIGS, SESSION_CONFIG, TRADE_CONFIG, validate_keys
+from data import GRANULARITY_MAP, derive_candles, get_candles, get_news, needs_sync, record_bar
+from technicals import get_trend_signal, is_market_open
+from ai_layer import CALENDAR_REFRESH, get_news_sentiment, score_trade, prefetch_calendar
 from signalgen import generate_signal
 from execution import submit_order
+from http_client import oanda_session
+from stream import stream_bars, stream_transactions, get_transactions_since
 from logger import init_log, log_decision, print_decision
+from metrics import serve_metrics, stage, write_metrics
+from scheduler import Scheduler
 from telegram_alerts import (
     alert_bot_started, alert_trade_opened,
     alert_trade_closed, alert_error, alert_no_credits, alert_standing_down
@@ -30,115 +40,229 @@ from telegram_alerts import (
 from dotenv import load_dotenv
 load_dotenv()
 
-OANDA_TOKEN   = os.getenv("OANDA_ACCESS_TOKEN")
 OANDA_ACCOUNT = os.getenv("OANDA_ACCOUNT_ID")
 OANDA_BASE    = "https://api-fxpractice.oanda.com/v3"
-HEADERS       = {"Authorization": f"Bearer {OANDA_TOKEN}"}
-
-# State
-_tracked_trade = {
-    "trade_id":    None,
-    "side":        None,
-    "entry_price": None,
-    "tp_price":    None,
-    "sl_price":    None,
-    "units":       1,
-    "reasoning":   "",
-}
-_cooldown_cycles    = 0   # cycles to wait after trade close
-_sl_hits_today      = 0
-_trades_today       = 0
-_last_tp_price      = None   # for re-entry check
-_last_tp_side       = None
-
-
-def get_open_trade():
+
+# Independent per-cycle fetches run side by side on a small pool
+IO_WORKERS     = 6
+IO_TIMEOUT     = 10   # seconds, shared deadline for one fan-out
+_io_pool       = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+
+# (frame, resolution, lookback) of the bias timeframes, derived from 5min bars
+HIGHER_TIMEFRAMES = [("df_1h", "60", 200), ("df_daily", "D", 100)]
+
+# Cycles skipped after a close, counting the cycle that notices it (as backtest.py)
+COOLDOWN_CYCLES = 2
+
+# State — one InstrumentState per ASSET_CONFIGS entry
+class InstrumentState:
+    """Everything run_cycle tracks for one instrument."""
+
+    def __init__(self, asset: dict):
+        self.asset           = asset
+        self.instrument      = asset["oanda_instrument"]
+        self.tracked_trade   = _empty_tracked_trade()
+        self.cooldown_cycles = 0      # cycles to wait after trade close
+        self.sl_hits_today   = 0
+        self.trades_today    = 0
+        self.last_tp_price   = None   # for re-entry check
+        self.last_tp_side    = None
+
+
+def _empty_tracked_trade() -> dict:
+    return {
+        "trade_id":    None,
+        "side":        None,
+        "entry_price": None,
+        "tp_price":    None,
+        "sl_price":    None,
+        "units":       1,
+        "reasoning":   "",
+    }
+
+
+_states = {a["oanda_instrument"]: InstrumentState(a) for a in ASSET_CONFIGS}
+
+# Transaction stream — closes are applied under _state_lock from its thread;
+# the cycle takes the lock only for InstrumentState reads and writes
+_state_lock           = threading.RLock()
+_tx_stream_connected  = threading.Event()
+_last_transaction_id  = None
+
+
+def get_open_trades():
+    """
+    All open trades on the account in one call, as {instrument: [trades,
+    oldest first]}. None if the request failed: unknown, not "no trades".
+    """
     try:
-        resp = requests.get(
-            f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/openTrades",
-            headers=HEADERS, timeout=10
-        )
-        trades = resp.json().get("trades", [])
-        for t in trades:
-            if t.get("instrument") == ASSET_CONFIG["oanda_instrument"]:
-                return t
-        return None
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/openTrades")
+        resp.raise_for_status()
+        trades = resp.json()["trades"]
     except Exception as e:
         print(f"[MONITOR] Error fetching open trades: {e}")
         return None
+    by_instrument = {}
+    for t in sorted(trades, key=lambda t: int(t.get("id", 0))):
+        by_instrument.setdefault(t.get("instrument"), []).append(t)
+    return by_instrument
 
 
-def get_closed_trade(trade_id):
+def get_trade(trade_id) -> dict:
+    """/trades/{id}; its "state" is OPEN or CLOSED. {} if the lookup failed."""
     try:
-        resp = requests.get(
-            f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/trades/{trade_id}",
-            headers=HEADERS, timeout=10
-        )
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/trades/{trade_id}")
+        resp.raise_for_status()
         return resp.json().get("trade", {})
-    except Exception:
+    except Exception as e:
+        print(f"[MONITOR] Error fetching trade {trade_id}: {e}")
         return {}
 
 
 def get_account_balance():
     try:
-        resp = requests.get(
-            f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/summary",
-            headers=HEADERS, timeout=10
-        )
+        resp = oanda_session.get(f"{OANDA_BASE}/accounts/{OANDA_ACCOUNT}/summary")
         return float(resp.json().get("account", {}).get("balance", 0))
     except Exception:
         return 0.0
 
 
-def monitor_position():
-    global _tracked_trade, _cooldown_cycles, _sl_hits_today
+def fetch_concurrently(calls: dict, timeout: float = IO_TIMEOUT) -> dict:
+    """
+    Runs {name: (fn, args, default)} on the I/O pool and joins the results.
+    A call that misses the shared deadline yields its default; exceptions
+    propagate like they would from a sequential call.
+    """
+    deadline = time.monotonic() + timeout
+    futures  = {name: _io_pool.submit(fn, *args) for name, (fn, args, _) in calls.items()}
+    results  = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            print(f"[IO] {name} timed out after {timeout}s")
+            results[name] = calls[name][2]
+    return results
+
+
+def _record_close(state: InstrumentState, exit_price: float, pnl: float, balance: float):
+    result = "TP" if pnl > 0 else "SL"
+    entry  = float(state.tracked_trade["entry_price"])
+
+    if result == "SL":
+        state.sl_hits_today += 1
+
+    alert_trade_closed(
+        side=state.tracked_trade["side"],
+        entry=entry,
+        exit_price=exit_price,
+        result=result,
+        pnl_dollar=round(pnl, 2),
+        balance=balance,
+    )
+    print(f"[MONITOR] {state.instrument} closed {result} @ {exit_price} | PnL: ${pnl:.2f} | Balance: ${balance:.2f}")
+
+
+def _reset_tracked_trade(state: InstrumentState):
+    state.tracked_trade   = _empty_tracked_trade()
+    state.cooldown_cycles = COOLDOWN_CYCLES
+    print(f"[BOT] {state.instrument} cooldown started — waiting {COOLDOWN_CYCLES} cycles")
 
-    if not _tracked_trade["trade_id"]:
+
+def _cooldown_skip(state: InstrumentState) -> bool:
+    """Counts one cycle of cooldown; True if this cycle is skipped for it."""
+    with _state_lock:
+        if state.cooldown_cycles <= 0:
+            return False
+        state.cooldown_cycles -= 1
+        print(f"[BOT] {state.instrument} cooldown — {state.cooldown_cycles} cycles remaining, skipping")
+        return True
+
+
+def monitor_position(state: InstrumentState, force: bool = False):
+    """
+    Polling fallback: detects a close via /trades/{id}, and only acts when
+    OANDA reports the trade CLOSED (a failed lookup changes nothing).
+    Skipped while the transaction stream is connected, since that reports
+    closes as they happen, unless force is set. The lookups run unlocked;
+    the close is applied only if the stream has not applied it meanwhile.
+    """
+    trade_id = state.tracked_trade["trade_id"]
+    if not trade_id:
+        return False
+    if _tx_stream_connected.is_set() and not force:
         return False
 
-    open_trade = get_open_trade()
-    if open_trade is not None:
+    trade = get_trade(trade_id)
+    if trade.get("state") != "CLOSED":
         return False
 
-    trade = get_closed_trade(_tracked_trade["trade_id"])
-    if trade:
+    balance = get_account_balance()
+    with _state_lock:
+        if state.tracked_trade["trade_id"] != trade_id:
+            return True
         try:
-            exit_price = float(trade.get("averageClosePrice", _tracked_trade["entry_price"]))
+            exit_price = float(trade.get("averageClosePrice", state.tracked_trade["entry_price"]))
             pnl        = float(trade.get("realizedPL", 0))
-            result     = "TP" if pnl > 0 else "SL"
-            entry      = float(_tracked_trade["entry_price"])
-            balance    = get_account_balance()
-
-            if result == "SL":
-                _sl_hits_today += 1
-
-            alert_trade_closed(
-                side=_tracked_trade["side"],
-                entry=entry,
-                exit_price=exit_price,
-                result=result,
-                pnl_dollar=round(pnl, 2),
-                balance=balance,
-            )
-            print(f"[MONITOR] Trade closed {result} @ {exit_price} | PnL: ${pnl:.2f} | Balance: ${balance:.2f}")
+            _record_close(state, exit_price, pnl, balance)
         except Exception as e:
             print(f"[MONITOR] Error processing close: {e}")
-
-    _tracked_trade = {k: None for k in _tracked_trade}
-    _tracked_trade["units"] = 1
-    _cooldown_cycles = 2
-    print(f"[BOT] Cooldown started — waiting 2 cycles")
+        _reset_tracked_trade(state)
     return True
 
 
-def check_reentry(current_price: float, trend: dict) -> tuple:
+def _on_transaction(tx: dict):
+    """Applies an ORDER_FILL that closes a tracked trade (TP, SL or manual)."""
+    global _last_transaction_id
+
+    _last_transaction_id = tx.get("id") or tx.get("lastTransactionID") or _last_transaction_id
+    if tx.get("type") != "ORDER_FILL":
+        return
+
+    with _state_lock:
+        tracked = {str(s.tracked_trade["trade_id"]): s for s in _states.values() if s.tracked_trade["trade_id"]}
+        for closed in tx.get("tradesClosed", []):
+            state = tracked.get(str(closed.get("tradeID")))
+            if state is None:
+                continue
+            try:
+                exit_price = float(closed.get("price", tx.get("price", state.tracked_trade["entry_price"])))
+                pnl        = float(closed.get("realizedPL", 0))
+                balance    = float(tx.get("accountBalance", 0)) or get_account_balance()
+                _record_close(state, exit_price, pnl, balance)
+            except Exception as e:
+                print(f"[MONITOR] Error processing close: {e}")
+            _reset_tracked_trade(state)
+
+
+def _consume_transactions():
+    def on_connect():
+        _tx_stream_connected.set()
+        # Replay anything that filled while we were disconnected
+        if _last_transaction_id:
+            return get_transactions_since(_last_transaction_id)
+        return []
+
+    for tx in stream_transactions(on_connect=on_connect, on_disconnect=_tx_stream_connected.clear):
+        try:
+            _on_transaction(tx)
+        except Exception as e:
+            print(f"[MONITOR] Transaction handling failed: {e}")
+
+
+def start_transaction_monitor() -> threading.Thread:
+    """Runs the transaction-stream consumer on a daemon thread."""
+    thread = threading.Thread(target=_consume_transactions, name="tx-monitor", daemon=True)
+    thread.start()
+    return thread
+
+
+def check_reentry(state: InstrumentState, current_price: float, trend: dict) -> tuple:
     """
     After TP, check if re-entry conditions are met.
     Returns (allowed: bool, reason: str)
     """
-    global _last_tp_price, _last_tp_side
-
-    if _last_tp_price is None:
+    if state.last_tp_price is None:
         return True, "No previous TP"
 
     # Check trend still intact
@@ -149,54 +273,123 @@ def check_reentry(current_price: float, trend: dict) -> tuple:
         return False, "Trend unknown after TP"
 
     # Check price hasnt retraced 50% of previous move
-    if _last_tp_side == "buy" and _last_tp_price:
-        retracement = (_last_tp_price - current_price) / _last_tp_price
+    if state.last_tp_side == "buy" and state.last_tp_price:
+        retracement = (state.last_tp_price - current_price) / state.last_tp_price
         if retracement > 0.003:  # more than 0.3% retraced
-            _last_tp_price = None
-            _last_tp_side  = None
+            state.last_tp_price = None
+            state.last_tp_side  = None
             return True, "Retracement cleared — fresh entry allowed"
 
     return True, "Re-entry conditions met"
 
 
-def run_cycle():
-    global _tracked_trade, _cooldown_cycles, _trades_today, _last_tp_price, _last_tp_side
-
-    symbol    = ASSET_CONFIG["oanda_instrument"]
-    keywords  = ASSET_CONFIG["news_keywords"]
-    timeframe = TRADE_CONFIG["timeframe"]
+def compute_trends(frames: dict) -> dict:
+    """
+    get_trend_signal for every {instrument: (df_5m, df_1h, df_daily)}.
+    Runs in-process: the fused kernel takes about a millisecond per
+    instrument, far less than pickling the frames to a worker would, and
+    the bias memo stays in this process where the next cycle can hit it.
+    """
+    now = datetime.now(timezone.utc)
+    return {k: get_trend_signal(*v, now=now, instrument=k) for k, v in frames.items()}
 
-    monitor_position()
 
-    if _cooldown_cycles > 0:
-        _cooldown_cycles -= 1
-        print(f"[BOT] Cooldown — {_cooldown_cycles} cycles remaining, skipping")
-        return
+def run_cycle(states: list = None):
+    """
+    One decision cycle for each instrument in `states` (default: all).
+    Open trades and every instrument's candles are fetched in one fan-out.
+    _state_lock is taken only around InstrumentState reads and writes, never
+    across network calls, so the transaction stream can apply a fill mid-cycle.
+    """
+    states    = list(_states.values()) if states is None else states
+    timeframe = TRADE_CONFIG["timeframe"]
 
-    open_trade   = get_open_trade()
-    has_position = open_trade is not None
+    active = []
+    for state in states:
+        with stage("cycle_monitor"):
+            monitor_position(state)
 
-    if has_position and not _tracked_trade["trade_id"]:
-        _tracked_trade["trade_id"]    = open_trade.get("id")
-        _tracked_trade["side"]        = "buy" if float(open_trade.get("currentUnits", 0)) > 0 else "sell"
-        _tracked_trade["entry_price"] = float(open_trade.get("price", 0))
-        print(f"[MONITOR] Synced: {_tracked_trade['side']} @ {_tracked_trade['entry_price']}")
+        if _cooldown_skip(state):
+            continue
+        active.append(state)
 
-    df_5m    = get_candles(symbol, timeframe, lookback_bars=500)
-    df_1h    = get_candles(symbol, "60",      lookback_bars=200)
-    df_daily = get_candles(symbol, "D",       lookback_bars=100)
+    if not active:
+        return
 
-    if df_5m.empty:
-        print("[WARN] No 5min data, skipping")
+    # H1 / D only go to OANDA when their window needs a (re)sync; otherwise
+    # they are rolled forward from the 5min bars below
+    calls = {"open_trades": (get_open_trades, (), None)}
+    for state in active:
+        symbol = state.instrument
+        calls[(symbol, "df_5m")] = (get_candles, (symbol, timeframe, 500), pd.DataFrame())
+        for name, resolution, lookback in HIGHER_TIMEFRAMES:
+            if needs_sync(symbol, resolution, lookback):
+                calls[(symbol, name)] = (get_candles, (symbol, resolution, lookback), pd.DataFrame())
+    with stage("cycle_fetch"):
+        fetched = fetch_concurrently(calls)
+
+    # Without the open trades a tracked trade would look closed and a new
+    # entry could stack on it — sit this cycle out instead
+    if fetched["open_trades"] is None:
+        print("[WARN] Open trades unknown this cycle, skipping")
         return
 
-    trend = get_trend_signal(df_5m, df_1h if not df_1h.empty else None, df_daily if not df_daily.empty else None)
+    frames = {}
+    ready  = []
+    for state in active:
+        symbol       = state.instrument
+        open_trades  = fetched["open_trades"].get(symbol, [])
+        open_ids     = {str(t.get("id")) for t in open_trades}
+        has_position = bool(open_trades)
+
+        # Tracked trade is gone but the stream never reported it — look it up.
+        # This cycle is skipped, so it is the first cycle of the cooldown
+        tracked_id = state.tracked_trade["trade_id"]
+        if tracked_id and str(tracked_id) not in open_ids and monitor_position(state, force=True):
+            _cooldown_skip(state)
+            continue
+
+        with _state_lock:
+            if has_position and not state.tracked_trade["trade_id"]:
+                open_trade = open_trades[0]
+                if len(open_trades) > 1:
+                    print(f"[MONITOR] {symbol} has {len(open_trades)} open trades — tracking the oldest, "
+                          f"{open_trade.get('id')}; the others follow as it closes")
+                state.tracked_trade["trade_id"]    = open_trade.get("id")
+                state.tracked_trade["side"]        = "buy" if float(open_trade.get("currentUnits", 0)) > 0 else "sell"
+                state.tracked_trade["entry_price"] = float(open_trade.get("price", 0))
+                print(f"[MONITOR] Synced {symbol}: {state.tracked_trade['side']} @ {state.tracked_trade['entry_price']}")
+
+        df_5m = fetched[(symbol, "df_5m")]
+        if df_5m.empty:
+            print(f"[WARN] No 5min data for {symbol}, skipping")
+            continue
+
+        df_1h, df_daily = (fetched[(symbol, name)] if (symbol, name) in fetched
+                           else derive_candles(symbol, resolution, lookback, df_5m)
+                           for name, resolution, lookback in HIGHER_TIMEFRAMES)
+
+        frames[symbol] = (df_5m, df_1h if not df_1h.empty else None, df_daily if not df_daily.empty else None)
+        ready.append((state, has_position))
+
+    with stage("cycle_trends"):
+        trends = compute_trends(frames)
+    for state, has_position in ready:
+        with stage("cycle_decide"):
+            _decide(state, trends[state.instrument], has_position)
+
+
+def _decide(state: InstrumentState, trend: dict, has_position: bool):
+    """Sentiment, scoring, order and logging for one instrument's trend."""
+    keywords = state.asset["news_keywords"]
+    with _state_lock:
+        sl_hits = state.sl_hits_today
 
     # Fetch news and score only if trend confirmed
     if trend["confirmed"]:
         articles  = get_news(keywords, lookback_hours=TRADE_CONFIG["news_lookback_hours"])
         sentiment = get_news_sentiment(articles)
-        ai_score  = score_trade(trend, sentiment, _sl_hits_today)
+        ai_score  = score_trade(trend, sentiment, sl_hits)
     else:
         sentiment = {"direction": "neutral", "confidence": 0.0, "reasoning": "Trend not confirmed"}
         ai_score  = {"score": 0, "tradeable": False, "reasoning": trend.get("reject_reason", ""), "breakdown": {}, "event": {"blocked": False}}
@@ -205,13 +398,14 @@ def run_cycle():
 
     if not has_position:
         # Re-entry check
-        reentry_ok, reentry_reason = check_reentry(trend["close"], trend)
+        with _state_lock:
+            reentry_ok, reentry_reason = check_reentry(state, trend["close"], trend)
         if not reentry_ok:
             print(f"[BOT] Re-entry blocked: {reentry_reason}")
             signal = {"trade": False, "reason": reentry_reason, "action": None}
 
         if signal.get("trade"):
-            execution = submit_order(signal)
+            execution = submit_order(signal, state.instrument)
 
             if execution.get("status") == "submitted":
                 side = signal["action"]
@@ -223,23 +417,23 @@ def run_cycle():
                 tp = signal["take_profit"]
                 sl = signal["stop_loss"]
 
-                _tracked_trade.update({
-                    "trade_id":    execution.get("order_id"),
-                    "side":        side,
-                    "entry_price": entry_price,
-                    "tp_price":    tp,
-                    "sl_price":    sl,
-                    "units":       signal["units"],
-                    "reasoning":   sentiment.get("reasoning", ""),
-                })
-                _trades_today += 1
-
-                # Track for re-entry check
-                if side == "buy":
-                    _last_tp_price = tp
-                    _last_tp_side  = side
-
-                balance = get_account_balance()
+                with _state_lock:
+                    state.tracked_trade.update({
+                        "trade_id":    execution.get("order_id"),
+                        "side":        side,
+                        "entry_price": entry_price,
+                        "tp_price":    tp,
+                        "sl_price":    sl,
+                        "units":       signal["units"],
+                        "reasoning":   sentiment.get("reasoning", ""),
+                    })
+                    state.trades_today += 1
+
+                    # Track for re-entry check
+                    if side == "buy":
+                        state.last_tp_price = tp
+                        state.last_tp_side  = side
+
                 alert_trade_opened(
                     side=side,
                     price=entry_price,
@@ -256,56 +450,129 @@ def run_cycle():
             print(f"[BOT] No trade: {signal.get('reason', '')}")
     else:
         execution = {"status": "skipped", "reason": "Position already open"}
-        print(f"[BOT] Position open (trade {_tracked_trade['trade_id']}) — skipping")
+        print(f"[BOT] Position open (trade {state.tracked_trade['trade_id']}) — skipping")
+
+    log_decision(trend, sentiment, signal, execution, ai_score, state.instrument)
+    print_decision(trend, sentiment, signal, execution, name=state.asset["name"])
+
+
+def _daily_reset():
+    """Scheduled at 00:00 UTC: clears the per-day trade and stop-loss counts."""
+    with _state_lock:
+        for state in _states.values():
+            state.sl_hits_today = 0
+            state.trades_today  = 0
+    print("[BOT] Daily counters reset")
 
-    log_decision(trend, sentiment, signal, execution)
-    print_decision(trend, sentiment, signal, execution)
+
+def _cycle_due(close: datetime) -> bool:
+    """
+    Whether the bar closing at `close` gets a cycle: the market is open and
+    we are inside SESSION_CONFIG's hours, or a trade is open and needs watching.
+    """
+    if not is_market_open(close):
+        return False
+    if not SESSION_CONFIG["enabled"]:
+        return True
+    if SESSION_CONFIG["start_hour_utc"] <= close.hour < SESSION_CONFIG["end_hour_utc"]:
+        return True
+    return any(s.tracked_trade["trade_id"] for s in _states.values())
+
+
+def _safe_cycle(states: list = None):
+    """run_cycle with error alerting around it."""
+    try:
+        with stage("cycle"):
+            run_cycle(states)
+    except KeyboardInterrupt:
+        raise
+    except Exception as e:
+        err = str(e)
+        print(f"[ERROR] {err}")
+        traceback.print_exc()
+        if "credit balance is too low" in err:
+            alert_no_credits()
+        else:
+            alert_error(err)
+    finally:
+        try:
+            write_metrics()
+        except OSError as e:
+            print(f"[METRICS] Could not write metrics: {e}")
+
+
+def _daily_jobs(scheduler: Scheduler) -> Scheduler:
+    # The reset shares the cycle's group; the calendar fetch (up to
+    # CALENDAR_DEADLINE per day) runs beside the cycle, never ahead of it
+    scheduler.daily("daily_reset", _daily_reset, at=dtime(0, 0), group="trading")
+    scheduler.every("calendar", prefetch_calendar, seconds=CALENDAR_REFRESH)
+    return scheduler
+
+
+def run_polling():
+    """
+    One cycle a few seconds after each trading-timeframe bar closes, for
+    bars where _cycle_due holds; nights and weekends are slept through.
+    """
+    scheduler = _daily_jobs(Scheduler())
+    scheduler.every_bar("cycle", lambda close: _safe_cycle(),
+                        minutes=int(TRADE_CONFIG["timeframe"]),
+                        delay=TRADE_CONFIG["bar_close_delay_seconds"],
+                        active=_cycle_due, group="trading")
+    scheduler.run()
+
+
+def run_streaming():
+    """
+    Evaluates the strategy the moment a locally aggregated bar of the
+    trading timeframe completes, instead of on a fixed poll interval.
+    """
+    trigger = GRANULARITY_MAP[TRADE_CONFIG["timeframe"]]
+    _daily_jobs(Scheduler()).start_background()
+
+    for instrument, granularity, bar in stream_bars(list(_states), granularities=("M1", "M5", "H1")):
+        record_bar(instrument, granularity, bar)
+        if granularity == trigger:
+            _safe_cycle([_states[instrument]])
 
 
 def main():
-    global _sl_hits_today, _trades_today
+    parser = argparse.ArgumentParser(description="Gold AI Trading Bot")
+    parser.add_argument("--stream", action="store_true",
+                        help="Trigger cycles from the OANDA pricing stream instead of polling")
+    parser.add_argument("--poll-positions", action="store_true",
+                        help="Detect closes by polling /openTrades instead of the transaction stream")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="Serve Prometheus metrics on this local port (0 = file only)")
+    args = parser.parse_args()
 
     validate_keys()
     balance = get_account_balance()
 
     print("\n Gold AI Trading Bot v2")
-    print(f"   Top-Down | Daily+1H+5min | ADX>={TRADE_CONFIG[chr(39)+'adx_threshold'+chr(39)]}")
+    print(f"   Top-Down | Daily+1H+5min | ADX>={TRADE_CONFIG['adx_threshold']}")
     print(f"   Session: 07:00-12:00 | 13:30-17:00 UTC")
     print(f"   Balance: ${balance:,.2f}")
+    print(f"   Instruments: {', '.join(_states)}")
+    print(f"   Mode: {'stream' if args.stream else 'polling'}")
     print("="*60)
 
     init_log()
-    get_economic_calendar()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    prefetch_calendar()     # then re-checked every CALENDAR_REFRESH by the scheduler
     alert_bot_started(balance)
 
-    last_day = None
+    if not args.poll_positions:
+        start_transaction_monitor()
 
-    while True:
-        try:
-            today = datetime.now(timezone.utc).date()
-            if today != last_day:
-                _sl_hits_today = 0
-                _trades_today  = 0
-                last_day       = today
-                if last_day is not None:
-                    get_economic_calendar()
-
-            run_cycle()
-
-        except KeyboardInterrupt:
-            print("\n[BOT] Stopped.")
-            break
-        except Exception as e:
-            err = str(e)
-            print(f"[ERROR] {err}")
-            traceback.print_exc()
-            if "credit balance is too low" in err:
-                alert_no_credits()
-            else:
-                alert_error(err)
-
-        print(f"\n[BOT] Sleeping {TRADE_CONFIG[chr(39)+'poll_interval_seconds'+chr(39)]}s...")
-        time.sleep(TRADE_CONFIG[chr(39)+'poll_interval_seconds'+chr(39)])
+    try:
+        if args.stream:
+            run_streaming()
+        else:
+            run_polling()
+    except KeyboardInterrupt:
+        print("\n[BOT] Stopped.")
 
 
 if __name__ == "__main__":
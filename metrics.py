@@ -0,0 +1,179 @@
+"""
+metrics.py - Per-stage timings and counters for the trading cycle.
+
+  @timed("get_candles")        times every call of a function
+  with stage("cycle_fetch"):   times a block
+  count("candle_cache_hit")    bumps an event counter
+
+Each stage keeps its last WINDOW durations for p50/p95/p99 plus running
+totals and an error count (calls that raised). Recording is a perf_counter
+pair and a deque append under one lock, about a microsecond next to the
+network calls it measures.
+
+Exposed in Prometheus text format, written to METRICS_FILE after every
+cycle and optionally served over HTTP:
+
+  python main.py --metrics-port 9108      # curl localhost:9108/metrics
+  python metrics.py                       # print the last written file
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE = "metrics.prom"
+WINDOW       = 1024                 # recent durations kept per stage
+QUANTILES    = (0.5, 0.95, 0.99)
+PREFIX       = "moneymaker"
+
+_lock     = threading.Lock()
+_stages   = {}   # name -> {"recent": deque, "count": int, "sum": float, "errors": int}
+_counters = {}   # name -> int
+_started  = time.time()
+
+
+# ─── Recording ────────────────────────────────────────────────────────────────
+
+def observe(name: str, seconds: float, error: bool = False):
+    with _lock:
+        s = _stages.get(name)
+        if s is None:
+            s = _stages[name] = {"recent": deque(maxlen=WINDOW), "count": 0, "sum": 0.0, "errors": 0}
+        s["recent"].append(seconds)
+        s["count"] += 1
+        s["sum"]   += seconds
+        if error:
+            s["errors"] += 1
+
+
+def count(name: str, n: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class stage:
+    """Context manager timing one block; an exception counts as an error."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                observe(name, time.perf_counter() - start, True)
+                raise
+            observe(name, time.perf_counter() - start)
+            return result
+        return inner
+    return wrap
+
+
+# ─── Export ───────────────────────────────────────────────────────────────────
+
+def _quantile(ordered: list, q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def snapshot() -> dict:
+    """{stage: {count, sum, errors, p50, p95, p99}} over the recent window, plus counters."""
+    with _lock:
+        stages   = {k: (sorted(v["recent"]), v["count"], v["sum"], v["errors"]) for k, v in _stages.items()}
+        counters = dict(_counters)
+
+    out = {}
+    for name, (ordered, n, total, errors) in stages.items():
+        out[name] = {"count": n, "sum": total, "errors": errors}
+        for q in QUANTILES:
+            out[name][f"p{int(q * 100)}"] = _quantile(ordered, q) if ordered else 0.0
+    return {"stages": out, "counters": counters}
+
+
+def render() -> str:
+    """Prometheus text exposition of every stage and counter."""
+    snap  = snapshot()
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Duration of a cycle stage or external call (recent window)",
+        f"# TYPE {PREFIX}_stage_seconds summary",
+    ]
+    for name, s in sorted(snap["stages"].items()):
+        for q in QUANTILES:
+            lines.append(f'{PREFIX}_stage_seconds{{stage="{name}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {s["sum"]:.6f}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+
+    lines += [
+        f"# HELP {PREFIX}_stage_errors_total Calls of a stage that raised",
+        f"# TYPE {PREFIX}_stage_errors_total counter",
+    ]
+    for name, s in sorted(snap["stages"].items()):
+        lines.append(f'{PREFIX}_stage_errors_total{{stage="{name}"}} {s["errors"]}')
+
+    lines += [
+        f"# HELP {PREFIX}_events_total Cache hits/misses and other counted events",
+        f"# TYPE {PREFIX}_events_total counter",
+    ]
+    for name, n in sorted(snap["counters"].items()):
+        lines.append(f'{PREFIX}_events_total{{event="{name}"}} {n}')
+
+    lines += [
+        f"# TYPE {PREFIX}_start_time_seconds gauge",
+        f"{PREFIX}_start_time_seconds {_started:.0f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str = METRICS_FILE):
+    """Atomically replaces `path` (e.g. for node_exporter's textfile collector)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves render() on http://host:port/metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"[METRICS] Serving on http://{host}:{port}/metrics")
+    return server
+
+
+if __name__ == "__main__":
+    with open(METRICS_FILE) as f:
+        print(f.read(), end="")
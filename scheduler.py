@@ -0,0 +1,145 @@
+"""
+scheduler.py - Bar-close aligned asyncio scheduler.
+
+  every_bar(name, fn, minutes, delay, active)   fn(close) `delay` seconds after
+                                                each bar close for which
+                                                active(close) is True
+  daily(name, fn, at)                           fn() once a day at `at` UTC
+  every(name, fn, seconds)                      fn() every `seconds`, first run
+                                                one interval after start
+
+Each also takes group=: jobs in the same group never run at the same time.
+A job is its own group by default, so a slow job (a calendar fetch, say)
+never delays another unless they are grouped on purpose.
+
+Bar jobs skip straight over closes that are not active (weekends, nights)
+instead of waking for each one, so a closed market costs one timer, not
+a poll every interval. Sleeps are capped at MAX_SLEEP and the next wake is
+recomputed after each, which absorbs clock jumps and lets a change in
+active() (e.g. a trade that needs watching) take effect within a minute.
+
+Jobs run on worker threads. How late each bar job starts after its
+close is recorded as the "bar_close_lag" metric.
+"""
+
+import asyncio
+import threading
+import traceback
+from datetime import datetime, time as dtime, timedelta, timezone
+
+from metrics import observe
+
+MAX_SLEEP     = 60                 # seconds between schedule re-checks
+MAX_LOOKAHEAD = timedelta(days=8)  # longest gap searched for an active bar
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def next_bar_close(after: datetime, step: timedelta) -> datetime:
+    """First bar close strictly after `after`, closes being multiples of step since midnight UTC."""
+    midnight = after.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed  = after - midnight
+    return midnight + (elapsed // step + 1) * step
+
+
+def next_active_close(after: datetime, step: timedelta, active=None):
+    """First close after `after` where active(close) holds, or None within MAX_LOOKAHEAD."""
+    close = next_bar_close(after, step)
+    limit = after + MAX_LOOKAHEAD
+    while active is not None and not active(close):
+        close += step
+        if close > limit:
+            return None
+    return close
+
+
+class Scheduler:
+    """A handful of timed jobs on one event loop; see the module docstring."""
+
+    def __init__(self):
+        self.jobs   = []
+        self.groups = {}      # job name -> group name
+        self._locks = {}      # group name -> asyncio.Lock, created on the loop
+
+    def _add(self, loop, name: str, group: str, *args):
+        self.groups[name] = group or name
+        self.jobs.append((loop, (name, *args)))
+
+    def every_bar(self, name: str, fn, minutes: int, delay: float = 0.0, active=None, group: str = None):
+        self._add(self._bar_loop, name, group, fn, timedelta(minutes=minutes), timedelta(seconds=delay), active)
+
+    def daily(self, name: str, fn, at: dtime = dtime(0, 0), group: str = None):
+        self._add(self._daily_loop, name, group, fn, at)
+
+    def every(self, name: str, fn, seconds: float, group: str = None):
+        self._add(self._interval_loop, name, group, fn, timedelta(seconds=seconds))
+
+    def run(self):
+        """Blocks, running every job until interrupted."""
+        asyncio.run(self._main())
+
+    def start_background(self) -> threading.Thread:
+        """Runs the scheduler on its own daemon thread (e.g. next to the pricing stream)."""
+        thread = threading.Thread(target=self.run, daemon=True, name="scheduler")
+        thread.start()
+        return thread
+
+    async def _main(self):
+        self._locks = {g: asyncio.Lock() for g in set(self.groups.values())}
+        await asyncio.gather(*(loop(*args) for loop, args in self.jobs))
+
+    async def _call(self, name: str, fn, *args):
+        async with self._locks[self.groups[name]]:
+            try:
+                await asyncio.to_thread(fn, *args)
+            except Exception as e:
+                print(f"[SCHED] {name} failed: {e}")
+                traceback.print_exc()
+
+    async def _wait_until(self, when: datetime) -> bool:
+        """Sleeps toward `when` for at most MAX_SLEEP; True once it is due."""
+        remaining = (when - _utcnow()).total_seconds()
+        if remaining > 0:
+            await asyncio.sleep(min(remaining, MAX_SLEEP))
+        return _utcnow() >= when
+
+    async def _bar_loop(self, name: str, fn, step: timedelta, delay: timedelta, active):
+        last      = None
+        announced = None
+        while True:
+            now   = _utcnow()
+            after = now - delay if last is None else max(now - delay, last)
+            close = next_active_close(after, step, active)
+            if close is None:
+                await asyncio.sleep(MAX_SLEEP)
+                continue
+
+            # Say so once when the next run is more than a bar away
+            if close - now > step + delay and close != announced:
+                print(f"[SCHED] {name}: idle until {close + delay:%a %Y-%m-%d %H:%M:%S} UTC")
+                announced = close
+            if not await self._wait_until(close + delay):
+                continue
+
+            observe("bar_close_lag", (_utcnow() - close).total_seconds())
+            await self._call(name, fn, close)
+            last = close
+
+    async def _daily_loop(self, name: str, fn, at: dtime):
+        while True:
+            now = _utcnow()
+            due = datetime.combine(now.date(), at, tzinfo=timezone.utc)
+            if due <= now:
+                due += timedelta(days=1)
+            while not await self._wait_until(due):
+                pass
+            await self._call(name, fn)
+
+    async def _interval_loop(self, name: str, fn, interval: timedelta):
+        while True:
+            due = _utcnow() + interval
+            while not await self._wait_until(due):
+                pass
+            await self._call(name, fn)
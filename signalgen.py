@@ -12,11 +12,21 @@ Rules:
 from config import TRADE_CONFIG
 
 
-def generate_signal(trend: dict, sentiment: dict, score: dict) -> dict:
+def generate_signal(trend: dict, sentiment: dict, score: dict,
+                    take_profit_pct: float = None, stop_loss_pct: float = None) -> dict:
+    """
+    take_profit_pct / stop_loss_pct override TRADE_CONFIG's buy-side values
+    (e.g. for a parameter sweep) without touching the shared config.
+    """
+    if take_profit_pct is None:
+        take_profit_pct = TRADE_CONFIG["take_profit_pct"]
+    if stop_loss_pct is None:
+        stop_loss_pct = TRADE_CONFIG["stop_loss_pct"]
+
     trade_bias = trend.get("trade_bias")   # "buy", "sell", or None
     volatility = trend.get("volatility", {})
     regime     = volatility.get("regime", "normal")
-    dynamic_sl = volatility.get("dynamic_sl", TRADE_CONFIG["stop_loss_pct"])
+    dynamic_sl = volatility.get("dynamic_sl", stop_loss_pct)
     price      = trend.get("close", 0)
 
     # No trade if technicals not confirmed
@@ -32,8 +42,8 @@ def generate_signal(trend: dict, sentiment: dict, score: dict) -> dict:
     # TP/SL based on direction and volatility
     if action == "buy":
         if regime == "normal":
-            sl_pct = TRADE_CONFIG["stop_loss_pct"]        # 0.3%
-            tp_pct = TRADE_CONFIG["take_profit_pct"]      # 0.6%
+            sl_pct = stop_loss_pct                         # 0.3%
+            tp_pct = take_profit_pct                       # 0.6%
         else:
             sl_pct = dynamic_sl                            # wider dynamic SL
             tp_pct = dynamic_sl * 2                       # maintains 2:1
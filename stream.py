@@ -0,0 +1,268 @@
+"""
+stream.py - OANDA pricing and transaction streams, with local bar aggregation.
+
+Consumes the pricing stream, folds each mid price into M1/M5/H1 bars in
+constant time and yields every bar the moment its period ends (on the first
+tick or heartbeat past the boundary). The transaction stream reports fills
+(including TP/SL closes) as they happen. Drops and stalls reconnect with
+exponential backoff.
+
+Also includes a recorder and a local stand-in server that replays recorded
+ticks in OANDA's stream format, so streaming mode can run offline:
+
+  python stream.py record ticks.jsonl              # capture the live pricing stream
+  python stream.py replay ticks.jsonl --port 8765  # serve it locally
+  OANDA_STREAM_URL=http://127.0.0.1:8765 python main.py --stream
+"""
+
+import argparse
+import calendar
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import oandapyV20.endpoints.transactions as transactions_ep
+from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+
+from config import ASSET_CONFIG, OANDA_ACCOUNT_ID, OANDA_ENVIRONMENT
+from http_client import oanda_client, oanda_session
+
+STREAM_URL = os.getenv("OANDA_STREAM_URL", TRADING_ENVIRONMENTS[OANDA_ENVIRONMENT]["stream"])
+
+BAR_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "H1": 3600,
+}
+
+BACKOFF_START = 1     # seconds
+BACKOFF_MAX   = 30
+
+
+def _parse_time(ts: str) -> float:
+    """OANDA RFC3339 (nanosecond) timestamp -> epoch seconds."""
+    whole, _, frac = ts.rstrip("Z").partition(".")
+    seconds = calendar.timegm(time.strptime(whole, "%Y-%m-%dT%H:%M:%S"))
+    return seconds + (float("0." + frac) if frac else 0.0)
+
+
+def _mid(msg: dict) -> float:
+    bid = msg.get("bids") or [{"price": msg.get("closeoutBid")}]
+    ask = msg.get("asks") or [{"price": msg.get("closeoutAsk")}]
+    return (float(bid[0]["price"]) + float(ask[0]["price"])) / 2
+
+
+# ─── Bar Aggregation ──────────────────────────────────────────────────────────
+
+class BarAggregator:
+    """
+    Builds OHLC bars for several granularities from a tick stream.
+
+    update() and advance() touch one forming bar per granularity, so each
+    tick costs O(number of granularities). Completed bars are returned as
+    (granularity, bar) pairs where bar is a dict with the same fields as a
+    data.get_candles row, "timestamp" being the bar open in epoch seconds.
+    """
+
+    def __init__(self, granularities=("M1", "M5", "H1")):
+        self.steps     = {g: BAR_SECONDS[g] for g in granularities}
+        self.forming   = {g: None for g in granularities}
+        self.last_time = 0.0
+
+    def update(self, t: float, price: float) -> list:
+        # Replayed ticks after a reconnect can arrive out of order — drop them
+        if t < self.last_time:
+            return []
+        completed = self.advance(t)
+        for g, step in self.steps.items():
+            bar = self.forming[g]
+            if bar is None:
+                start = t - t % step
+                self.forming[g] = {"timestamp": start, "open": price, "high": price,
+                                   "low": price, "close": price, "volume": 1}
+            else:
+                if price > bar["high"]:
+                    bar["high"] = price
+                if price < bar["low"]:
+                    bar["low"] = price
+                bar["close"]   = price
+                bar["volume"] += 1
+        return completed
+
+    def advance(self, t: float) -> list:
+        """Closes every forming bar whose period ended at or before t."""
+        self.last_time = max(self.last_time, t)
+        completed = []
+        for g, step in self.steps.items():
+            bar = self.forming[g]
+            if bar is not None and t >= bar["timestamp"] + step:
+                completed.append((g, bar))
+                self.forming[g] = None
+        return completed
+
+
+# ─── Stream Client ────────────────────────────────────────────────────────────
+
+def _stream(path: str, params: dict = None, url: str = None, on_connect=None, on_disconnect=None):
+    """
+    Yields messages from an OANDA stream endpoint forever, reconnecting after
+    drops. A stalled connection is detected by the session read timeout,
+    which is longer than OANDA's 5s heartbeat interval. on_connect may return
+    messages to replay before the live ones (e.g. a catch-up fetch).
+    """
+    url     = f"{url or STREAM_URL}/v3/accounts/{OANDA_ACCOUNT_ID}/{path}"
+    backoff = BACKOFF_START
+
+    while True:
+        try:
+            with oanda_session.get(url, params=params, stream=True) as resp:
+                resp.raise_for_status()
+                print(f"[STREAM] Connected to {url}")
+                if on_connect:
+                    yield from on_connect()
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    backoff = BACKOFF_START
+                    yield json.loads(line)
+            print("[STREAM] Stream closed by server")
+        except Exception as e:
+            print(f"[STREAM] Disconnected: {e}")
+        finally:
+            if on_disconnect:
+                on_disconnect()
+
+        print(f"[STREAM] Reconnecting in {backoff}s...")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, BACKOFF_MAX)
+
+
+def stream_prices(instruments=None, url: str = None):
+    """Yields PRICE and HEARTBEAT messages for one instrument or a list of them."""
+    instruments = instruments or ASSET_CONFIG["oanda_instrument"]
+    if not isinstance(instruments, str):
+        instruments = ",".join(instruments)
+    for msg in _stream("pricing/stream", {"instruments": instruments}, url):
+        if msg.get("type") in ("PRICE", "HEARTBEAT"):
+            yield msg
+
+
+def stream_transactions(url: str = None, on_connect=None, on_disconnect=None):
+    """Yields account transactions and HEARTBEATs (which carry lastTransactionID)."""
+    yield from _stream("transactions/stream", url=url,
+                       on_connect=on_connect, on_disconnect=on_disconnect)
+
+
+def get_transactions_since(transaction_id: str) -> list:
+    """REST catch-up: every transaction after transaction_id."""
+    r = transactions_ep.TransactionsSinceID(OANDA_ACCOUNT_ID, params={"id": transaction_id})
+    return oanda_client.request(r).get("transactions", [])
+
+
+def stream_bars(instruments=None, granularities=("M1", "M5", "H1"), url: str = None):
+    """
+    Yields (instrument, granularity, bar) as soon as each bar completes.
+    All instruments share one connection; each has its own BarAggregator,
+    and heartbeats close due bars on every one of them.
+    """
+    instruments = instruments or [ASSET_CONFIG["oanda_instrument"]]
+    if isinstance(instruments, str):
+        instruments = [instruments]
+    aggregators = {i: BarAggregator(granularities) for i in instruments}
+
+    for msg in stream_prices(instruments, url):
+        t = _parse_time(msg["time"])
+        if msg["type"] == "PRICE":
+            instrument = msg.get("instrument", instruments[0])
+            aggregator = aggregators.get(instrument)
+            if aggregator is None:
+                continue
+            for g, bar in aggregator.update(t, _mid(msg)):
+                yield instrument, g, bar
+        else:
+            for instrument, aggregator in aggregators.items():
+                for g, bar in aggregator.advance(t):
+                    yield instrument, g, bar
+
+
+# ─── Record / Replay ──────────────────────────────────────────────────────────
+
+def record(path: str, instruments=None):
+    """Appends raw stream messages to a JSON-lines file."""
+    with open(path, "a") as f:
+        for msg in stream_prices(instruments):
+            f.write(json.dumps(msg) + "\n")
+            f.flush()
+
+
+def serve_replay(path: str, port: int = 8765, speed: float = 0.0,
+                 background: bool = False) -> ThreadingHTTPServer:
+    """
+    Serves recorded messages on any /v3/accounts/<id>/.../stream path in
+    OANDA's newline-delimited format (pricing ticks or transactions).
+    speed=0 sends as fast as possible, 1.0 keeps the recorded pacing. The
+    connection closes at the end of the file, which exercises the client's
+    reconnect path; server.connections counts the connections served.
+    background=True serves from a daemon thread and returns the server
+    (port=0 picks a free port, see server.server_address).
+    """
+    with open(path) as f:
+        messages = [line.strip() for line in f if line.strip()]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not self.path.split("?")[0].endswith("/stream"):
+                self.send_error(404)
+                return
+            self.server.connections += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.end_headers()
+            prev = None
+            try:
+                for line in messages:
+                    if speed:
+                        t = _parse_time(json.loads(line)["time"])
+                        if prev is not None and t > prev:
+                            time.sleep((t - prev) / speed)
+                        prev = t
+                    self.wfile.write(line.encode() + b"\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.connections = 0
+    print(f"[STREAM] Replaying {len(messages)} messages on http://127.0.0.1:{server.server_address[1]}")
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True, name="replay").start()
+    else:
+        server.serve_forever()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OANDA pricing stream tools")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record the live pricing stream")
+    rec.add_argument("path")
+
+    rep = sub.add_parser("replay", help="Serve recorded ticks locally")
+    rep.add_argument("path")
+    rep.add_argument("--port",  type=int,   default=8765)
+    rep.add_argument("--speed", type=float, default=0.0, help="1.0 = recorded pace, 0 = no delay")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.path)
+    else:
+        serve_replay(args.path, args.port, args.speed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+sweep.py - Parallel parameter sweep and walk-forward optimizer for TRADE_CONFIG.
+
+Runs the strategy's technical and signal rules over a grid of
+  ema_fast x ema_slow x adx_period x adx_threshold x take_profit_pct x stop_loss_pct
+on a process pool and writes a ranked results table.
+
+Everything that does not depend on the grid (volatility regime, session,
+daily/1H bias, event blocks) is computed once. Each distinct EMA span and ADX
+period is computed once with the technicals.py functions and shared by every
+grid point that uses it. Per grid point the entry checks are evaluated as
+whole-array masks. Only the trade walk itself (one position, cooldown, SL
+count per day) is sequential, and it only visits bars that pass the masks.
+
+Trades follow backtest.run_backtest rules exactly, with neutral sentiment.
+
+Usage:
+  python sweep.py --from 2024-01-01 --to 2025-01-01 \\
+      --ema-fast 5:13:2 --ema-slow 30:80:10 --adx-threshold 20,25,30 \\
+      --tp 0.003,0.004,0.006 --sl 0.0015,0.002,0.003 [--out sweep.csv]
+  python sweep.py ... --train-months 6 --test-months 1     # walk-forward
+Values are comma lists or start:stop:step ranges (stop included).
+"""
+
+import argparse
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest import DAILY_WINDOW, H1_WINDOW, COOLDOWN_CYCLES, _bias_lookup, _close_times, load_frames
+from config import TRADE_CONFIG
+from technicals import (
+    compute_adx, compute_atr, compute_ema, get_daily_bias, get_htf_bias, is_trading_session,
+)
+from ai_layer import EventIndex, load_calendar
+from signalgen import generate_signal
+
+PARAMS = ["ema_fast", "ema_slow", "adx_period", "adx_threshold", "take_profit_pct", "stop_loss_pct"]
+
+RANK_METRICS = ["total_pnl", "avg_pnl", "win_rate", "profit_factor"]
+
+SLOPE_LOOKBACK = 5
+ATR_WINDOW     = 20
+EXIT_SCAN      = 256    # bars searched per step when looking for a TP/SL hit
+
+_DIRECTION = {"bullish": 1, "bearish": -1}
+_REGIME    = {"normal": 0, "elevated": 1, "extreme": 2}
+
+# Precomputed arrays, set in each worker by _init_worker
+_shared = None
+
+
+# ─── Precompute ───────────────────────────────────────────────────────────────
+
+def prepare(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily: pd.DataFrame = None,
+            grid: list = None, calendar: dict = None) -> dict:
+    """Arrays every grid point reads, plus one EMA/ADX series per distinct period."""
+    bar       = pd.Timedelta(minutes=int(TRADE_CONFIG["timeframe"]))
+    decisions = _close_times(df_5m, bar)
+    n         = len(df_5m)
+
+    daily_bias = _bias_lookup(df_daily, pd.Timedelta(days=1), DAILY_WINDOW, get_daily_bias, decisions)
+    htf_bias   = _bias_lookup(df_1h, pd.Timedelta(hours=1), H1_WINDOW, get_htf_bias, decisions)
+
+    close = df_5m["close"].to_numpy(dtype=float)
+    atr   = compute_atr(df_5m, period=14)
+    avg   = atr.rolling(ATR_WINDOW, min_periods=1).mean().to_numpy()
+    atr   = atr.to_numpy()
+    ratio = np.divide(atr, avg, out=np.ones(n), where=avg > 0)
+
+    times   = pd.DatetimeIndex(decisions, tz="UTC")
+    days    = decisions.astype("datetime64[D]")
+    no_event = ~EventIndex(calendar or {}).blocked_mask(decisions.astype("datetime64[s]").astype(np.int64))
+
+    grid = grid or [dict((k, TRADE_CONFIG[k]) for k in PARAMS)]
+    return {
+        "high":       df_5m["high"].to_numpy(dtype=float),
+        "low":        df_5m["low"].to_numpy(dtype=float),
+        "close":      close,
+        "day":        days.astype(np.int64),
+        "session":    np.fromiter((is_trading_session(t) for t in times), dtype=bool, count=n),
+        "daily":      np.fromiter((_DIRECTION.get(daily_bias(i)["direction"], 0) for i in range(n)), dtype=np.int8, count=n),
+        "htf":        np.fromiter((_DIRECTION.get(htf_bias(i)["direction"], 0) for i in range(n)), dtype=np.int8, count=n),
+        "regime":     np.where(ratio >= 3.0, 2, np.where(ratio >= 1.5, 1, 0)).astype(np.int8),
+        "dynamic_sl": np.round(np.divide(atr * 1.5, close, out=np.full(n, TRADE_CONFIG["stop_loss_pct"]), where=close > 0), 5),
+        "no_event":   no_event,
+        "ema":        {p: compute_ema(df_5m["close"], p).to_numpy() for p in
+                       sorted({g["ema_fast"] for g in grid} | {g["ema_slow"] for g in grid})},
+        "adx":        {p: compute_adx(df_5m, p).to_numpy() for p in sorted({g["adx_period"] for g in grid})},
+        "index":      df_5m.index,
+    }
+
+
+def _init_worker(shared: dict):
+    global _shared
+    _shared = shared
+
+
+# ─── Evaluation ───────────────────────────────────────────────────────────────
+
+def _entry_masks(s: dict, p: dict, lo: int, hi: int) -> tuple:
+    """
+    (candidates, strict) window-local bar indices.
+    candidates pass _evaluate_trend and score >= 7 with no SL hits counted;
+    strict also score 8 without the SL check, for days with 3+ SL hits.
+    """
+    fast_full = s["ema"][p["ema_fast"]]
+    fast  = fast_full[lo:hi]
+    slow  = s["ema"][p["ema_slow"]][lo:hi]
+    adx   = s["adx"][p["adx_period"]][lo:hi]
+    close = s["close"][lo:hi]
+
+    # get_ema_slope: ema[-1] - ema[-lookback], 0 until lookback + 1 bars exist
+    idx   = np.arange(lo, hi)
+    back  = np.maximum(idx - (SLOPE_LOOKBACK - 1), 0)
+    slope = np.where(idx >= SLOPE_LOOKBACK, fast - fast_full[back], 0.0)
+
+    direction = np.sign(fast - slow).astype(np.int8)
+    confirmed = (
+        (direction != 0) &
+        (adx >= p["adx_threshold"]) &
+        (np.sign(slope) == direction) &
+        (np.sign(close - slow) == direction) &
+        (s["daily"][lo:hi] == direction) &
+        (s["htf"][lo:hi] == direction) &
+        (s["regime"][lo:hi] != 2) &
+        s["session"][lo:hi] &
+        (idx >= p["ema_slow"] + 19)            # get_trend_signal warm-up
+    )
+
+    # score_trade checks that can still fail once the trend is confirmed
+    failed = ((np.round(adx, 2) < 25).astype(np.int8) +
+              (~s["no_event"][lo:hi]) +
+              (s["regime"][lo:hi] != 0))
+    return np.flatnonzero(confirmed & (failed <= 1)), confirmed & (failed == 0)
+
+
+def _find_exit(s: dict, start: int, hi: int, side: int, tp: float, sl: float) -> tuple:
+    """First bar in [start, hi) touching SL or TP -> (index, price), SL first."""
+    high, low = s["high"], s["low"]
+    while start < hi:
+        stop = min(start + EXIT_SCAN, hi)
+        h, l = high[start:stop], low[start:stop]
+        hit_sl = l <= sl if side > 0 else h >= sl
+        hit_tp = h >= tp if side > 0 else l <= tp
+        hits   = np.flatnonzero(hit_sl | hit_tp)
+        if len(hits):
+            j = int(hits[0])
+            return start + j, sl if hit_sl[j] else tp
+        start = stop
+    return None, None
+
+
+def evaluate(params: dict, lo: int = 0, hi: int = None, shared: dict = None) -> dict:
+    """Stats for one grid point over decision bars [lo, hi)."""
+    s  = shared or _shared
+    hi = len(s["close"]) if hi is None else hi
+    candidates, strict = _entry_masks(s, params, lo, hi)
+    close, day, regime, dynamic_sl = s["close"], s["day"], s["regime"], s["dynamic_sl"]
+    units = TRADE_CONFIG["oanda_units"]
+    score = {"tradeable": True, "score": 8, "reasoning": ""}
+
+    pnls     = []
+    next_bar = 0
+    cur_day  = None
+    sl_hits  = 0
+    open_at_end = False
+
+    while True:
+        k = int(np.searchsorted(candidates, next_bar))
+        if k >= len(candidates):
+            break
+        i = lo + int(candidates[k])
+        if day[i] != cur_day:
+            cur_day, sl_hits = day[i], 0
+        if sl_hits >= 3 and not strict[i - lo]:
+            next_bar = i - lo + 1
+            continue
+
+        direction = 1 if (s["ema"][params["ema_fast"]][i] > s["ema"][params["ema_slow"]][i]) else -1
+        signal = generate_signal({
+            "trade_bias": "buy" if direction > 0 else "sell",
+            "volatility": {"regime": "normal" if regime[i] == 0 else "elevated",
+                           "dynamic_sl": float(dynamic_sl[i])},
+            "close":      round(float(close[i]), 4),
+        }, {}, score, take_profit_pct=params["take_profit_pct"], stop_loss_pct=params["stop_loss_pct"])
+
+        entry = float(signal["entry_price"])
+        j, exit_px = _find_exit(s, i + 1, hi, direction, signal["take_profit"], signal["stop_loss"])
+        if j is None:
+            open_at_end = True
+            break
+
+        pnl = (exit_px - entry) * direction * units
+        pnls.append(pnl)
+        if day[j] != cur_day:
+            cur_day, sl_hits = day[j], 0
+        if pnl <= 0:
+            sl_hits += 1
+        next_bar = j - lo + COOLDOWN_CYCLES
+
+    return {**params, **_stats(np.array(pnls)), "open_at_end": open_at_end}
+
+
+def _stats(pnl: np.ndarray) -> dict:
+    n      = len(pnl)
+    wins   = int((pnl > 0).sum())
+    equity = np.concatenate([[0.0], np.cumsum(pnl)])
+    gross_loss = -pnl[pnl <= 0].sum()
+    return {
+        "trades":        n,
+        "wins":          wins,
+        "losses":        n - wins,
+        "win_rate":      round(wins / n, 3) if n else 0.0,
+        "total_pnl":     round(float(pnl.sum()), 2),
+        "avg_pnl":       round(float(pnl.mean()), 2) if n else 0.0,
+        "profit_factor": round(float(pnl[pnl > 0].sum() / gross_loss), 2) if gross_loss > 0 else 0.0,
+        "max_drawdown":  round(float((np.maximum.accumulate(equity) - equity).max()), 2),
+    }
+
+
+def _evaluate_chunk(chunk: list, lo: int, hi: int) -> list:
+    return [evaluate(p, lo, hi) for p in chunk]
+
+
+# ─── Sweep ────────────────────────────────────────────────────────────────────
+
+def build_grid(**values) -> list:
+    """Cartesian product of PARAMS values, skipping ema_fast >= ema_slow."""
+    grid = []
+    for combo in itertools.product(*(values[k] for k in PARAMS)):
+        p = dict(zip(PARAMS, combo))
+        if p["ema_fast"] < p["ema_slow"]:
+            grid.append(p)
+    return grid
+
+
+def run_grid(grid: list, windows: list, shared: dict, workers: int = None) -> list:
+    """
+    Evaluates every grid point on every (lo, hi) window. Returns one list of
+    result rows per window.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [[evaluate(p, lo, hi, shared) for p in grid] for lo, hi in windows]
+
+    size   = max(1, len(grid) // (workers * 8))
+    chunks = [grid[i:i + size] for i in range(0, len(grid), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        futures = [[pool.submit(_evaluate_chunk, c, lo, hi) for c in chunks] for lo, hi in windows]
+        return [[row for f in window for row in f.result()] for window in futures]
+
+
+def rank(rows: list, metric: str = "total_pnl", min_trades: int = 1) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    df = df[df["trades"] >= min_trades] if min_trades else df
+    return df.sort_values([metric, "trades"], ascending=False).reset_index(drop=True)
+
+
+def walk_forward(grid: list, shared: dict, train_months: int, test_months: int,
+                 metric: str = "total_pnl", min_trades: int = 1, workers: int = None) -> pd.DataFrame:
+    """
+    Rolling walk-forward: pick the best grid point on each train window and
+    score it on the test window that follows. Windows step by test_months.
+    """
+    index = shared["index"]
+    folds = []
+    start = index[0]
+    while True:
+        train_end = start + pd.DateOffset(months=train_months)
+        test_end  = train_end + pd.DateOffset(months=test_months)
+        if train_end >= index[-1]:
+            break
+        folds.append((start, train_end, min(test_end, index[-1] + pd.Timedelta(seconds=1))))
+        start = start + pd.DateOffset(months=test_months)
+
+    bounds  = [(int(index.searchsorted(a)), int(index.searchsorted(b))) for a, b, _ in folds]
+    trained = run_grid(grid, bounds, shared, workers)
+
+    rows = []
+    for (a, b, c), rows_train in zip(folds, trained):
+        ranked = rank(rows_train, metric, min_trades)
+        if ranked.empty:
+            continue
+        best = {k: ranked.iloc[0][k].item() for k in PARAMS}
+        test = evaluate(best, int(index.searchsorted(b)), int(index.searchsorted(c)), shared)
+        rows.append({
+            "train_start": a, "test_start": b, "test_end": c, **best,
+            f"train_{metric}": ranked.iloc[0][metric],
+            **{f"test_{k}": test[k] for k in ("trades", "win_rate", "total_pnl", "max_drawdown")},
+        })
+    return pd.DataFrame(rows)
+
+
+def _values(spec: str, cast=float) -> list:
+    """'5,9,13' or '5:13:2' (stop included)."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return [cast(round(v, 10)) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(x) for x in spec.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep / walk-forward over TRADE_CONFIG")
+    parser.add_argument("--m5",    help="5min candles CSV (default: local archive)")
+    parser.add_argument("--h1",    help="1H candles CSV")
+    parser.add_argument("--daily", help="Daily candles CSV")
+    parser.add_argument("--from",  dest="start", help="Archive start date (UTC)")
+    parser.add_argument("--to",    dest="end",   help="Archive end date (UTC)")
+
+    parser.add_argument("--ema-fast",      default=str(TRADE_CONFIG["ema_fast"]))
+    parser.add_argument("--ema-slow",      default=str(TRADE_CONFIG["ema_slow"]))
+    parser.add_argument("--adx-period",    default=str(TRADE_CONFIG["adx_period"]))
+    parser.add_argument("--adx-threshold", default=str(TRADE_CONFIG["adx_threshold"]))
+    parser.add_argument("--tp",            default=str(TRADE_CONFIG["take_profit_pct"]))
+    parser.add_argument("--sl",            default=str(TRADE_CONFIG["stop_loss_pct"]))
+
+    parser.add_argument("--train-months", type=int, help="Walk-forward train window")
+    parser.add_argument("--test-months",  type=int, default=1, help="Walk-forward test window / step")
+    parser.add_argument("--rank",       default="total_pnl", choices=RANK_METRICS)
+    parser.add_argument("--min-trades", type=int, default=10)
+    parser.add_argument("--workers",    type=int, help="Processes (default: all cores)")
+    parser.add_argument("--out",        default="sweep_results.csv")
+    args = parser.parse_args()
+
+    grid = build_grid(
+        ema_fast=_values(args.ema_fast, int),
+        ema_slow=_values(args.ema_slow, int),
+        adx_period=_values(args.adx_period, int),
+        adx_threshold=_values(args.adx_threshold),
+        take_profit_pct=_values(args.tp),
+        stop_loss_pct=_values(args.sl),
+    )
+
+    df_5m, df_1h, df_daily = load_frames(args.m5, args.h1, args.daily, args.start, args.end)
+    if df_5m.empty:
+        return
+
+    started = time.perf_counter()
+    calendar = load_calendar(df_5m.index[0], df_5m.index[-1] + pd.Timedelta(days=1))
+    shared   = prepare(df_5m, df_1h, df_daily, grid, calendar)
+    print(f"[SWEEP] {len(df_5m)} bars, {len(grid)} grid points, "
+          f"{len(shared['ema'])} EMA spans, {len(shared['adx'])} ADX periods "
+          f"(precompute {time.perf_counter() - started:.1f}s)")
+
+    if args.train_months:
+        result = walk_forward(grid, shared, args.train_months, args.test_months,
+                              args.rank, args.min_trades, args.workers)
+    else:
+        result = rank(run_grid(grid, [(0, len(df_5m))], shared, args.workers)[0],
+                      args.rank, args.min_trades)
+
+    print(f"[SWEEP] Done in {time.perf_counter() - started:.1f}s")
+    print(result.head(10).to_string())
+    result.to_csv(args.out, index=False)
+    print(f"[SWEEP] Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,24 @@ Strategy:
 
 import pandas as pd
 import numpy as np
+from collections import OrderedDict, deque
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timezone
 from config import TRADE_CONFIG
 
+# Entry checks in _evaluate_trend, in the order they are reported
+TREND_CHECKS = ["ema_crossover", "adx_ok", "slope_agrees", "price_agrees",
+                "daily_agrees", "htf_agrees", "not_extreme", "in_session"]
+
+# Daily / 1H bias: EMA period, slope lookback and the bars needed
+BIAS_EMA            = 50
+BIAS_SLOPE_LOOKBACK = 5
+BIAS_MIN_BARS       = 55
+
+# Bias dicts memoized on the window they were computed from
+BIAS_CACHE_SIZE = 8192
+_bias_cache     = OrderedDict()
+
 
 # ─── Core Indicators ──────────────────────────────────────────────────────────
 
@@ -23,42 +38,115 @@ def compute_ema(series: pd.Series, period: int) -> pd.Series:
 
 
 def compute_adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high  = df["high"]
-    low   = df["low"]
-    close = df["close"]
+    high, low, close = _ohlc_arrays(df)
+    buf = np.empty((6, len(df)))
+    _true_range(high, low, close, buf[0], buf[1])
+    _adx(high, low, _ewm(buf[0], period, buf[5]), period, buf[1:])
+    return pd.Series(buf[5], index=df.index)
 
-    tr = pd.concat([
-        high - low,
-        (high - close.shift()).abs(),
-        (low  - close.shift()).abs()
-    ], axis=1).max(axis=1)
 
-    dm_plus  = ((high - high.shift()) > (low.shift() - low)).astype(float) * \
-               (high - high.shift()).clip(lower=0)
-    dm_minus = ((low.shift() - low) > (high - high.shift())).astype(float) * \
-               (low.shift() - low).clip(lower=0)
+def compute_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    high, low, close = _ohlc_arrays(df)
+    buf = np.empty((2, len(df)))
+    _true_range(high, low, close, buf[0], buf[1])
+    return pd.Series(_ewm(buf[0], period, buf[1]), index=df.index)
 
-    atr      = tr.ewm(span=period, adjust=False).mean()
-    di_plus  = 100 * dm_plus.ewm(span=period,  adjust=False).mean() / atr
-    di_minus = 100 * dm_minus.ewm(span=period, adjust=False).mean() / atr
 
-    dx  = (100 * (di_plus - di_minus).abs() / (di_plus + di_minus).replace(0, np.nan)).fillna(0)
-    adx = dx.ewm(span=period, adjust=False).mean()
-    return adx
+# ─── Fused Kernel ─────────────────────────────────────────────────────────────
 
+# Rows of the buffer indicator_kernel fills
+KERNEL_ROWS = ["tr", "ema_fast", "ema_slow", "atr", "atr_mean",
+               "scratch", "dx", "di_plus", "di_minus", "adx"]
+
+
+def _ohlc_arrays(df: pd.DataFrame) -> tuple:
+    return (df["high"].to_numpy(dtype=float), df["low"].to_numpy(dtype=float),
+            df["close"].to_numpy(dtype=float))
 
-def compute_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high  = df["high"]
-    low   = df["low"]
-    close = df["close"]
 
-    tr = pd.concat([
-        high - low,
-        (high - close.shift()).abs(),
-        (low  - close.shift()).abs()
-    ], axis=1).max(axis=1)
+def _ewm(values: np.ndarray, span: int, out: np.ndarray) -> np.ndarray:
+    """series.ewm(span=span, adjust=False).mean() of an array, written into out."""
+    out[:] = pd.Series(values, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+    return out
 
-    return tr.ewm(span=period, adjust=False).mean()
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                out: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|); the first bar is high - low."""
+    np.subtract(high, low, out=out)
+    if len(out) > 1:
+        tail = scratch[1:]
+        np.abs(np.subtract(high[1:], close[:-1], out=tail), out=tail)
+        np.fmax(out[1:], tail, out=out[1:])
+        np.abs(np.subtract(low[1:], close[:-1], out=tail), out=tail)
+        np.fmax(out[1:], tail, out=out[1:])
+    return out
+
+
+def _adx(high: np.ndarray, low: np.ndarray, atr: np.ndarray, period: int, rows: np.ndarray) -> None:
+    """
+    ADX from TR smoothed with the same span (atr), into rows scratch, dx,
+    di_plus, di_minus, adx. atr may be the adx row itself; it is only
+    overwritten by the final smoothing.
+    """
+    scratch, dx, di_plus, di_minus, adx = rows
+    dm_plus, dm_minus = scratch, dx
+
+    # +DM where the up move beats the down move, -DM the other way round
+    dm_plus[0] = dm_minus[0] = np.nan
+    up   = np.subtract(high[1:], high[:-1], out=di_plus[1:])
+    down = np.subtract(low[:-1], low[1:], out=di_minus[1:])
+    np.multiply(up > down, np.maximum(up, 0.0), out=dm_plus[1:])
+    np.multiply(down > up, np.maximum(down, 0.0), out=dm_minus[1:])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(np.multiply(100, _ewm(dm_plus, period, di_plus), out=di_plus), atr, out=di_plus)
+        np.divide(np.multiply(100, _ewm(dm_minus, period, di_minus), out=di_minus), atr, out=di_minus)
+
+        # DX, 0 where +DI + -DI is 0 or undefined
+        total = np.add(di_plus, di_minus, out=scratch)
+        np.multiply(100, np.abs(np.subtract(di_plus, di_minus, out=dx), out=dx), out=dx)
+        np.divide(dx, total, out=dx, where=total != 0)
+        dx[total == 0] = 0.0
+    dx[np.isnan(dx)] = 0.0
+    _ewm(dx, period, adx)
+
+
+def indicator_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     ema_fast: int = None, ema_slow: int = None, adx_period: int = None,
+                     atr_period: int = 14, atr_window: int = 20) -> dict:
+    """
+    Every 5min indicator get_trend_signal needs, from the OHLC arrays in one
+    pass: {row: array} for each KERNEL_ROWS entry, all views into a single
+    preallocated buffer. True range is computed once and shared by ATR and
+    ADX (as is its smoothing when the periods match). Values match
+    compute_ema / compute_adx / compute_atr exactly; atr_mean is the
+    trailing atr_window mean get_volatility_regime takes (shorter at the
+    start of the series).
+    """
+    ema_fast   = ema_fast   or TRADE_CONFIG["ema_fast"]
+    ema_slow   = ema_slow   or TRADE_CONFIG["ema_slow"]
+    adx_period = adx_period or TRADE_CONFIG["adx_period"]
+
+    n   = len(close)
+    buf = np.empty((len(KERNEL_ROWS), n))
+    out = dict(zip(KERNEL_ROWS, buf))
+    if n == 0:
+        return out
+
+    _true_range(high, low, close, out["tr"], out["atr_mean"])
+    _ewm(close, ema_fast, out["ema_fast"])
+    _ewm(close, ema_slow, out["ema_slow"])
+    atr     = _ewm(out["tr"], atr_period, out["atr"])
+    adx_atr = atr if adx_period == atr_period else _ewm(out["tr"], adx_period, out["adx"])
+    _adx(high, low, adx_atr, adx_period, buf[KERNEL_ROWS.index("scratch"):])
+
+    mean = out["atr_mean"]
+    head = min(atr_window - 1, n)
+    np.divide(np.cumsum(atr[:head]), np.arange(1, head + 1), out=mean[:head])
+    if n >= atr_window:
+        np.mean(sliding_window_view(atr, atr_window), axis=1, out=mean[atr_window - 1:])
+    return out
 
 
 def get_ema_slope(ema_series: pd.Series, lookback: int = 5) -> float:
@@ -70,13 +158,14 @@ def get_ema_slope(ema_series: pd.Series, lookback: int = 5) -> float:
 
 # ─── Session & Market Hours ───────────────────────────────────────────────────
 
-def is_market_open() -> bool:
+def is_market_open(now: datetime = None) -> bool:
     """
     Returns True during real gold market hours.
     Gold trades Sunday 22:00 UTC to Friday 22:00 UTC.
     Daily maintenance break: 22:00-23:00 UTC.
+    Pass `now` (UTC) to evaluate a historical time instead of the wall clock.
     """
-    now     = datetime.now(timezone.utc)
+    now     = now or datetime.now(timezone.utc)
     weekday = now.weekday()  # 0=Mon, 6=Sun
     hour    = now.hour
 
@@ -92,16 +181,16 @@ def is_market_open() -> bool:
     return True
 
 
-def is_trading_session() -> bool:
+def is_trading_session(now: datetime = None) -> bool:
     """
     Returns True during high liquidity gold sessions.
     London: 07:00-12:00 UTC
     NY:     13:30-17:00 UTC
     """
-    if not is_market_open():
+    now  = now or datetime.now(timezone.utc)
+    if not is_market_open(now):
         return False
 
-    now  = datetime.now(timezone.utc)
     hour = now.hour
     minute = now.minute
     time_decimal = hour + minute / 60.0
@@ -128,6 +217,10 @@ def get_volatility_regime(df_5m: pd.DataFrame) -> dict:
     atr     = compute_atr(df_5m, period=14)
     current = atr.iloc[-1]
     average = atr.iloc[-20:].mean()
+    return _classify_volatility(current, average, df_5m["close"].iloc[-1])
+
+
+def _classify_volatility(current: float, average: float, price: float) -> dict:
     ratio   = current / average if average > 0 else 1.0
 
     if ratio >= 3.0:
@@ -138,7 +231,6 @@ def get_volatility_regime(df_5m: pd.DataFrame) -> dict:
         regime = "normal"
 
     # Dynamic SL = 1.5x ATR as percentage of price
-    price         = df_5m["close"].iloc[-1]
     dynamic_sl    = (current * 1.5) / price if price > 0 else TRADE_CONFIG["stop_loss_pct"]
 
     return {
@@ -158,13 +250,13 @@ def get_daily_bias(df_daily: pd.DataFrame) -> dict:
     bullish = price above EMA50 and slope positive
     bearish = price below EMA50 and slope negative
     """
-    if df_daily is None or df_daily.empty or len(df_daily) < 55:
+    if df_daily is None or df_daily.empty or len(df_daily) < BIAS_MIN_BARS:
         return {"direction": "unknown", "slope": 0.0, "ema50": 0.0}
 
-    ema50        = compute_ema(df_daily["close"], 50)
+    ema50        = compute_ema(df_daily["close"], BIAS_EMA)
     latest_close = df_daily["close"].iloc[-1]
     latest_ema   = ema50.iloc[-1]
-    slope        = get_ema_slope(ema50, lookback=5)
+    slope        = get_ema_slope(ema50, lookback=BIAS_SLOPE_LOOKBACK)
 
     if latest_close > latest_ema and slope > 0:
         direction = "bullish"
@@ -187,13 +279,13 @@ def get_htf_bias(df_1h: pd.DataFrame) -> dict:
     """
     Returns session trend direction from 1H EMA50.
     """
-    if df_1h is None or df_1h.empty or len(df_1h) < 55:
+    if df_1h is None or df_1h.empty or len(df_1h) < BIAS_MIN_BARS:
         return {"direction": "unknown", "slope": 0.0, "ema50": 0.0}
 
-    ema50        = compute_ema(df_1h["close"], 50)
+    ema50        = compute_ema(df_1h["close"], BIAS_EMA)
     latest_close = df_1h["close"].iloc[-1]
     latest_ema   = ema50.iloc[-1]
-    slope        = get_ema_slope(ema50, lookback=5)
+    slope        = get_ema_slope(ema50, lookback=BIAS_SLOPE_LOOKBACK)
 
     if latest_close > latest_ema:
         direction = "bullish"
@@ -210,9 +302,36 @@ def get_htf_bias(df_1h: pd.DataFrame) -> dict:
     }
 
 
+# ─── Bias Memo ────────────────────────────────────────────────────────────────
+
+def memoized_bias(bias_fn, df: pd.DataFrame, instrument: str = "", granularity: str = "") -> dict:
+    """
+    bias_fn(df) (get_daily_bias / get_htf_bias), reused until the window
+    changes. The key is the instrument, granularity, bias parameters and the
+    window's first and last bar plus last close, so the answer is recomputed
+    once per closed daily / 1H bar (or when OANDA revises the last bar), not
+    on every 5min cycle.
+    """
+    if df is None or df.empty:
+        return bias_fn(df)
+
+    key = (instrument, granularity, bias_fn.__name__, BIAS_EMA, BIAS_SLOPE_LOOKBACK,
+           len(df), df.index[0], df.index[-1], float(df["close"].iat[-1]))
+    bias = _bias_cache.get(key)
+    if bias is not None:
+        _bias_cache.move_to_end(key)
+        return bias
+
+    bias = _bias_cache[key] = bias_fn(df)
+    if len(_bias_cache) > BIAS_CACHE_SIZE:
+        _bias_cache.popitem(last=False)
+    return bias
+
+
 # ─── 5min Signal ──────────────────────────────────────────────────────────────
 
-def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily: pd.DataFrame = None) -> dict:
+def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily: pd.DataFrame = None,
+                     now: datetime = None, instrument: str = "") -> dict:
     """
     Full top-down trend analysis.
 
@@ -225,29 +344,51 @@ def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily:
     - volatility:     regime dict
     - in_session:     bool
     - reject_reason:  why confirmed=False
+
+    `now` overrides the wall clock for the session check (backtests).
+    The daily / 1H biases are memoized per instrument (memoized_bias).
     """
-    empty = {
+    if df_5m is None or df_5m.empty or len(df_5m) < TRADE_CONFIG["ema_slow"] + 20:
+        return _empty_signal()
+
+    # ── Indicators (one fused pass) ──
+    high, low, close = _ohlc_arrays(df_5m)
+    k            = indicator_kernel(high, low, close)
+    latest_fast  = k["ema_fast"][-1]
+    latest_slow  = k["ema_slow"][-1]
+    latest_adx   = k["adx"][-1]
+    latest_close = close[-1]
+    slope        = float(k["ema_fast"][-1] - k["ema_fast"][-5])   # get_ema_slope, lookback 5
+
+    # ── Higher timeframe bias ──
+    daily_bias = memoized_bias(get_daily_bias, df_daily, instrument, "D")
+    htf_bias   = memoized_bias(get_htf_bias, df_1h, instrument, "H1")
+
+    # ── Volatility regime (get_volatility_regime) ──
+    volatility = _classify_volatility(k["atr"][-1], k["atr_mean"][-1], latest_close)
+
+    # ── Session ──
+    in_session = is_trading_session(now)
+
+    return _evaluate_trend(latest_close, latest_fast, latest_slow, latest_adx, slope,
+                           daily_bias, htf_bias, volatility, in_session)
+
+
+def _empty_signal() -> dict:
+    return {
         "direction": "neutral", "strength": 0, "confirmed": False,
         "trade_bias": None, "reject_reason": "Insufficient data",
         "daily_bias": {"direction": "unknown"},
         "htf_bias":   {"direction": "unknown"},
         "volatility": {"regime": "normal", "atr_ratio": 1.0},
-        "in_session": False, "close": 0, "slope": 0,
+        "in_session": False, "close": 0, "slope": 0, "checks": {},
     }
 
-    if df_5m is None or df_5m.empty or len(df_5m) < TRADE_CONFIG["ema_slow"] + 20:
-        return empty
-
-    # ── Indicators ──
-    ema_fast     = compute_ema(df_5m["close"], TRADE_CONFIG["ema_fast"])
-    ema_slow     = compute_ema(df_5m["close"], TRADE_CONFIG["ema_slow"])
-    adx          = compute_adx(df_5m, TRADE_CONFIG["adx_period"])
-    latest_fast  = ema_fast.iloc[-1]
-    latest_slow  = ema_slow.iloc[-1]
-    latest_adx   = adx.iloc[-1]
-    latest_close = df_5m["close"].iloc[-1]
-    slope        = get_ema_slope(ema_fast, lookback=5)
 
+def _evaluate_trend(latest_close: float, latest_fast: float, latest_slow: float,
+                    latest_adx: float, slope: float, daily_bias: dict, htf_bias: dict,
+                    volatility: dict, in_session: bool) -> dict:
+    """Applies the entry checks to the latest indicator values."""
     # ── 5min direction ──
     if latest_fast > latest_slow:
         direction = "bullish"
@@ -256,16 +397,6 @@ def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily:
     else:
         direction = "neutral"
 
-    # ── Higher timeframe bias ──
-    daily_bias = get_daily_bias(df_daily)
-    htf_bias   = get_htf_bias(df_1h)
-
-    # ── Volatility regime ──
-    volatility = get_volatility_regime(df_5m)
-
-    # ── Session ──
-    in_session = is_trading_session()
-
     # ── Checks ──
     adx_ok        = latest_adx >= TRADE_CONFIG["adx_threshold"]
     slope_agrees  = (direction == "bullish" and slope > 0) or \
@@ -295,16 +426,17 @@ def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily:
     if not in_session:
         reject_reasons.append("Outside session hours")
 
-    confirmed = (
-        direction != "neutral" and
-        adx_ok and
-        slope_agrees and
-        price_agrees and
-        daily_agrees and
-        htf_agrees and
-        not_extreme and
-        in_session
-    )
+    checks = {
+        "ema_crossover": direction != "neutral",
+        "adx_ok":        bool(adx_ok),
+        "slope_agrees":  bool(slope_agrees),
+        "price_agrees":  bool(price_agrees),
+        "daily_agrees":  daily_agrees,
+        "htf_agrees":    htf_agrees,
+        "not_extreme":   not_extreme,
+        "in_session":    bool(in_session),
+    }
+    confirmed = all(checks.values())
 
     # Trade bias — what direction are we allowed to trade
     trade_bias = None
@@ -320,9 +452,151 @@ def get_trend_signal(df_5m: pd.DataFrame, df_1h: pd.DataFrame = None, df_daily:
         "confirmed":    confirmed,
         "trade_bias":   trade_bias,
         "reject_reason": " | ".join(reject_reasons) if reject_reasons else "All conditions met",
+        "checks":       checks,
         "daily_bias":   daily_bias,
         "htf_bias":     htf_bias,
         "volatility":   volatility,
         "in_session":   in_session,
         "close":        round(latest_close, 4),
     }
+
+
+# ─── Streaming Indicators ─────────────────────────────────────────────────────
+
+class _Ema:
+    """Recursive EMA matching series.ewm(span=period, adjust=False).mean()."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, period: int):
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+
+    def update(self, x: float) -> float:
+        if x != x:                          # NaN — ewm carries the last value
+            return self.value if self.value is not None else np.nan
+        if self.value is None:
+            self.value = x
+        else:
+            # Same weighting pandas uses so results match to the last bit
+            old_wt     = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class StreamingIndicators:
+    """
+    Incremental EMA fast/slow, ADX and ATR state for the 5min series.
+
+    Each update() is O(1) and produces the same values as compute_ema,
+    compute_adx, compute_atr and get_volatility_regime run over the whole
+    history, so get_trend_signal-equivalent output can be produced on every
+    bar without recomputing the window.
+    """
+
+    def __init__(self, ema_fast: int = None, ema_slow: int = None, adx_period: int = None,
+                 atr_period: int = 14, atr_window: int = 20, slope_lookback: int = 5):
+        self.ema_fast_period = ema_fast or TRADE_CONFIG["ema_fast"]
+        self.ema_slow_period = ema_slow or TRADE_CONFIG["ema_slow"]
+        adx_period           = adx_period or TRADE_CONFIG["adx_period"]
+
+        self._ema_fast  = _Ema(self.ema_fast_period)
+        self._ema_slow  = _Ema(self.ema_slow_period)
+        self._adx_tr    = _Ema(adx_period)
+        self._dm_plus   = _Ema(adx_period)
+        self._dm_minus  = _Ema(adx_period)
+        self._adx       = _Ema(adx_period)
+        self._atr       = _Ema(atr_period)
+
+        self._atr_window  = deque(maxlen=atr_window)
+        self._fast_window = deque(maxlen=slope_lookback)
+        self._slope_lookback = slope_lookback
+
+        self._prev_high  = None
+        self._prev_low   = None
+        self._prev_close = None
+
+        self.bars     = 0
+        self.close    = np.nan
+        self.ema_fast = np.nan
+        self.ema_slow = np.nan
+        self.adx      = np.nan
+        self.atr      = np.nan
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "StreamingIndicators":
+        """Seeds the state by replaying an OHLC DataFrame."""
+        state = cls(**kwargs)
+        for high, low, close in zip(df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy()):
+            state.update(float(high), float(low), float(close))
+        return state
+
+    def update(self, high: float, low: float, close: float) -> None:
+        """Folds one completed bar into the running state."""
+        if self._prev_close is None:
+            tr       = high - low
+            dm_plus  = np.nan
+            dm_minus = np.nan
+        else:
+            tr   = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            up   = high - self._prev_high
+            down = self._prev_low - low
+            dm_plus  = max(up, 0.0)   if up > down else 0.0
+            dm_minus = max(down, 0.0) if down > up else 0.0
+
+        adx_atr  = self._adx_tr.update(tr)
+        smooth_p = self._dm_plus.update(dm_plus)
+        smooth_m = self._dm_minus.update(dm_minus)
+
+        dx = 0.0
+        if adx_atr and smooth_p == smooth_p and smooth_m == smooth_m:
+            di_plus  = 100 * smooth_p / adx_atr
+            di_minus = 100 * smooth_m / adx_atr
+            if di_plus + di_minus != 0:
+                dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
+
+        self.adx      = self._adx.update(dx)
+        self.atr      = self._atr.update(tr)
+        self.ema_fast = self._ema_fast.update(close)
+        self.ema_slow = self._ema_slow.update(close)
+        self.close    = close
+        self._atr_window.append(self.atr)
+        self._fast_window.append(self.ema_fast)
+
+        self._prev_high  = high
+        self._prev_low   = low
+        self._prev_close = close
+        self.bars       += 1
+
+    @property
+    def slope(self) -> float:
+        """Same as get_ema_slope(ema_fast, lookback) on the full history."""
+        if self.bars < self._slope_lookback + 1:
+            return 0.0
+        return float(self._fast_window[-1] - self._fast_window[0])
+
+    @property
+    def atr_average(self) -> float:
+        return sum(self._atr_window) / len(self._atr_window) if self._atr_window else np.nan
+
+    def volatility(self) -> dict:
+        """Same dict as get_volatility_regime."""
+        return _classify_volatility(self.atr, self.atr_average, self.close)
+
+    def trend_signal(self, df_1h: pd.DataFrame = None, df_daily: pd.DataFrame = None,
+                     now: datetime = None, daily_bias: dict = None, htf_bias: dict = None) -> dict:
+        """
+        get_trend_signal on the current state instead of a DataFrame window.
+        Already computed daily_bias / htf_bias dicts may be passed in place
+        of the frames.
+        """
+        if self.bars < self.ema_slow_period + 20:
+            return _empty_signal()
+
+        if daily_bias is None:
+            daily_bias = memoized_bias(get_daily_bias, df_daily, granularity="D")
+        if htf_bias is None:
+            htf_bias = memoized_bias(get_htf_bias, df_1h, granularity="H1")
+
+        return _evaluate_trend(self.close, self.ema_fast, self.ema_slow, self.adx, self.slope,
+                               daily_bias, htf_bias, self.volatility(), is_trading_session(now))
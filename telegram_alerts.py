@@ -1,9 +1,19 @@
 """
 telegram_alerts.py - Clean Telegram alerts with dollar PnL and balance.
+
+Alerts never block the caller: send_message queues the text and a daemon
+worker delivers it, spacing messages MIN_INTERVAL apart (Telegram allows
+about one per second per chat), retrying with backoff and honouring 429
+retry_after. Repeats of an error that is still waiting to be sent are
+merged into one message with a count. The queue is flushed at exit.
 """
-import requests
+import atexit
 import os
+import queue
+import threading
+import time
 from dotenv import load_dotenv
+from http_client import session
 
 load_dotenv()
 
@@ -11,23 +21,101 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID   = os.getenv("TELEGRAM_CHAT_ID")
 TELEGRAM_LIMIT     = 4096
 
+QUEUE_SIZE    = 100    # alerts beyond this are dropped rather than block trading
+MIN_INTERVAL  = 1.0    # seconds between messages to one chat
+MAX_RETRIES   = 3
+BACKOFF_START = 1.0    # seconds, doubled per retry
+FLUSH_TIMEOUT = 10     # seconds spent draining the queue at shutdown
+
+_queue          = queue.Queue(maxsize=QUEUE_SIZE)
+_pending_errors = {}   # error text -> times raised while waiting to be sent
+_errors_lock    = threading.Lock()
+_worker         = None
+_worker_lock    = threading.Lock()
+
+def _post(text):
+    """One sendMessage call. Returns seconds to wait before retrying, or None when done."""
+    url  = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    resp = session.post(url, json={
+        "chat_id": TELEGRAM_CHAT_ID,
+        "text": text,
+        "parse_mode": "HTML"
+    }, timeout=5)
+    if resp.ok:
+        return None
+    if resp.status_code == 429:
+        try:
+            return float(resp.json().get("parameters", {}).get("retry_after", BACKOFF_START))
+        except ValueError:
+            return BACKOFF_START
+    if resp.status_code >= 500:
+        return BACKOFF_START
+    print(f"[TELEGRAM] Failed: {resp.status_code}")
+    return None
+
+def _deliver(text):
+    if len(text) > TELEGRAM_LIMIT:
+        text = text[:TELEGRAM_LIMIT - 3] + "..."
+    backoff = BACKOFF_START
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            wait = _post(text)
+        except Exception as e:
+            print(f"[TELEGRAM] Error: {e}")
+            wait = backoff
+        if wait is None:
+            return
+        if attempt < MAX_RETRIES:
+            time.sleep(max(wait, backoff))
+            backoff *= 2
+    print(f"[TELEGRAM] Gave up after {MAX_RETRIES} retries")
+
+def _run_worker():
+    last_sent = 0.0
+    while True:
+        kind, text = _queue.get()
+        try:
+            if kind == "error":
+                with _errors_lock:
+                    count = _pending_errors.pop(text, 1)
+                text = _format_error(text, count)
+            wait = last_sent + MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            _deliver(text)
+            last_sent = time.monotonic()
+        except Exception as e:
+            print(f"[TELEGRAM] Worker error: {e}")
+        finally:
+            _queue.task_done()
+
+def _enqueue(kind, text):
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name="telegram", daemon=True)
+            _worker.start()
+    try:
+        _queue.put_nowait((kind, text))
+        return True
+    except queue.Full:
+        print("[TELEGRAM] Queue full -- alert dropped")
+        return False
+
 def send_message(text):
+    """Queues text for delivery and returns immediately."""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         print("[TELEGRAM] Missing credentials")
         return
-    try:
-        if len(text) > TELEGRAM_LIMIT:
-            text = text[:TELEGRAM_LIMIT - 3] + "..."
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        resp = requests.post(url, json={
-            "chat_id": TELEGRAM_CHAT_ID,
-            "text": text,
-            "parse_mode": "HTML"
-        }, timeout=5)
-        if not resp.ok:
-            print(f"[TELEGRAM] Failed: {resp.status_code}")
-    except Exception as e:
-        print(f"[TELEGRAM] Error: {e}")
+    _enqueue("message", text)
+
+def flush(timeout=FLUSH_TIMEOUT):
+    """Waits up to `timeout` seconds for queued alerts to be sent."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+atexit.register(flush)
 
 def _bot_name():
     try:
@@ -44,35 +132,24 @@ def alert_bot_started(balance=0):
     tf   = TRADE_CONFIG.get("timeframe", "5")
     mode = TRADE_CONFIG.get("conflict_mode", "conservative").upper()
     send_message(
-        f"<b>🟢 {_bot_name()} Started</b>
-"
-        f"{_hr()}
-"
-        f"EMA {TRADE_CONFIG[chr(39)+chr(101)+chr(109)+chr(97)+chr(95)+chr(102)+chr(97)+chr(115)+chr(116)+chr(39)]}/{TRADE_CONFIG[chr(39)+chr(101)+chr(109)+chr(97)+chr(95)+chr(115)+chr(108)+chr(111)+chr(119)+chr(39)]} | ADX>={TRADE_CONFIG[chr(39)+chr(97)+chr(100)+chr(120)+chr(95)+chr(116)+chr(104)+chr(114)+chr(101)+chr(115)+chr(104)+chr(111)+chr(108)+chr(100)+chr(39)]} | {tf}min
-"
-        f"Session: 07:00-12:00 UTC | 13:30-17:00 UTC
-"
+        f"<b>🟢 {_bot_name()} Started</b>\n"
+        f"{_hr()}\n"
+        f"EMA {TRADE_CONFIG['ema_fast']}/{TRADE_CONFIG['ema_slow']} | ADX>={TRADE_CONFIG['adx_threshold']} | {tf}min\n"
+        f"Session: 07:00-12:00 UTC | 13:30-17:00 UTC\n"
         f"Balance: <b>${balance:,.2f}</b>"
     )
 
 def alert_trade_opened(side, price, tp, sl, tp_dollar, sl_dollar, units, score, reasoning=""):
     emoji = "🟢 BUY" if side == "buy" else "🔴 SELL"
     send_message(
-        f"{emoji} <b>Trade Opened</b> — {_bot_name()}
-"
-        f"{_hr()}
-"
-        f"Entry:  <b>${price:,.3f}</b>
-"
-        f"TP:     ${tp:,.3f}  (+${tp_dollar:.2f})
-"
-        f"SL:     ${sl:,.3f}  (-${sl_dollar:.2f})
-"
-        f"Units:  {units}
-"
-        f"Score:  {score}/8
-"
-        f"📰 {reasoning[:150] if reasoning else chr(39)+chr(39)}"
+        f"{emoji} <b>Trade Opened</b> — {_bot_name()}\n"
+        f"{_hr()}\n"
+        f"Entry:  <b>${price:,.3f}</b>\n"
+        f"TP:     ${tp:,.3f}  (+${tp_dollar:.2f})\n"
+        f"SL:     ${sl:,.3f}  (-${sl_dollar:.2f})\n"
+        f"Units:  {units}\n"
+        f"Score:  {score}/8\n"
+        f"📰 {reasoning[:150] if reasoning else ''}"
     )
 
 def alert_trade_closed(side, entry, exit_price, result, pnl_dollar, balance):
@@ -80,34 +157,39 @@ def alert_trade_closed(side, entry, exit_price, result, pnl_dollar, balance):
     pnl_str   = f"+${pnl_dollar:.2f}" if pnl_dollar >= 0 else f"-${abs(pnl_dollar):.2f}"
     pnl_emoji = "📈" if pnl_dollar >= 0 else "📉"
     send_message(
-        f"{emoji} <b>Trade Closed — {result}</b> — {_bot_name()}
-"
-        f"{_hr()}
-"
-        f"Side:    {chr(39)+chr(66)+chr(85)+chr(89)+chr(39) if side == chr(39)+chr(98)+chr(117)+chr(121)+chr(39) else chr(39)+chr(83)+chr(69)+chr(76)+chr(76)+chr(39)}
-"
-        f"Entry:   ${entry:,.3f}
-"
-        f"Exit:    ${exit_price:,.3f}
-"
-        f"PnL:     <b>{pnl_emoji} {pnl_str}</b>
-"
+        f"{emoji} <b>Trade Closed — {result}</b> — {_bot_name()}\n"
+        f"{_hr()}\n"
+        f"Side:    {'BUY' if side == 'buy' else 'SELL'}\n"
+        f"Entry:   ${entry:,.3f}\n"
+        f"Exit:    ${exit_price:,.3f}\n"
+        f"PnL:     <b>{pnl_emoji} {pnl_str}</b>\n"
         f"Balance: <b>${balance:,.2f}</b>"
     )
 
 def alert_standing_down(reason):
     send_message(
-        f"⏸ <b>Standing Down</b> — {_bot_name()}
-"
-        f"{_hr()}
-"
+        f"⏸ <b>Standing Down</b> — {_bot_name()}\n"
+        f"{_hr()}\n"
         f"{reason}"
     )
 
+def _format_error(error_msg, count=1):
+    repeats = f"\n(repeated {count}x)" if count > 1 else ""
+    return f"⚠️ <b>Error</b> — {_bot_name()}\n<code>{error_msg[:300]}</code>{repeats}"
+
 def alert_error(error_msg):
-    send_message(f"⚠️ <b>Error</b> — {_bot_name()}
-<code>{error_msg[:300]}</code>")
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        print("[TELEGRAM] Missing credentials")
+        return
+    # Merge into the copy still waiting in the queue, if any
+    with _errors_lock:
+        if error_msg in _pending_errors:
+            _pending_errors[error_msg] += 1
+            return
+        _pending_errors[error_msg] = 1
+    if not _enqueue("error", error_msg):
+        with _errors_lock:
+            _pending_errors.pop(error_msg, None)
 
 def alert_no_credits():
-    send_message(f"💳 <b>Credits Exhausted</b> — {_bot_name()}
-Top up at console.anthropic.com")
+    send_message(f"💳 <b>Credits Exhausted</b> — {_bot_name()}\nTop up at console.anthropic.com")
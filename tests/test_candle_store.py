@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+import candle_store
+
+
+def _rows(n: int) -> np.ndarray:
+    rng   = np.random.default_rng(7)
+    times = pd.Timestamp("2025-01-06", tz="UTC").timestamp() + 300.0 * np.arange(n)
+    close = 2000.0 + np.cumsum(rng.normal(0, 1, n))
+    return np.column_stack([times, close, close + 1, close - 1, close, rng.integers(1, 500, n)])
+
+
+def test_get_candles_ohlc_is_a_view_of_the_mapped_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(candle_store, "STORE_DIR", str(tmp_path))
+    candle_store.write("XAU_USD", "M5", _rows(1000))
+
+    # Each np.load maps the file anew, so hand get_candles this one mapping
+    mapped = candle_store.load("XAU_USD", "M5")
+    monkeypatch.setattr(candle_store, "load", lambda instrument, granularity: mapped)
+    df     = candle_store.get_candles("XAU_USD", "5", lookback_bars=300)
+
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert len(df) == 300
+    for col in ("open", "high", "low", "close"):
+        assert np.shares_memory(df[col].to_numpy(), mapped), col
+    # Still a view once pandas consolidates, which separate columns would not survive
+    df._consolidate_inplace()
+    assert np.shares_memory(df[["open", "high", "low", "close"]].to_numpy(), mapped)
+    assert df["volume"].dtype == np.int64
+    np.testing.assert_array_equal(df["close"].to_numpy(), mapped[-300:, 4])
+    assert df.index[0] == pd.Timestamp(mapped[-300, 0], unit="s", tz="UTC")
+
+
+def test_get_candles_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(candle_store, "STORE_DIR", str(tmp_path))
+    candle_store.write("XAU_USD", "M5", _rows(1000))
+
+    df = candle_store.get_candles("XAU_USD", "5", start="2025-01-06 01:00", end="2025-01-06 02:00")
+    assert len(df) == 12
+    assert df.index[0] == pd.Timestamp("2025-01-06 01:00", tz="UTC")
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+from bench import synthetic_ohlc
+
+
+class FakeOanda:
+    """Serves H1 candles resampled from the first `now` 5min bars, the last one forming."""
+
+    def __init__(self, m5: pd.DataFrame):
+        self.m5  = m5
+        self.now = 0
+
+    def __call__(self, instrument: str, params: dict) -> list:
+        assert params["granularity"] == "H1"
+        seen = self.m5.iloc[:self.now]
+        h1   = seen.resample("1h").agg({"open": "first", "high": "max", "low": "min",
+                                        "close": "last", "volume": "sum"}).dropna()
+        done = h1.index + pd.Timedelta(hours=1) <= seen.index[-1] + pd.Timedelta(minutes=5)
+        rows = list(zip(h1.index, h1.itertuples(index=False), done))
+        if "from" in params:
+            start = pd.Timestamp(params["from"])
+            rows  = [r for r in rows if r[0] >= start][:params["count"]]
+        else:
+            rows = rows[-params["count"]:]
+        return [{"time": ts.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"), "complete": bool(ok), "volume": int(b.volume),
+                 "mid": {"o": repr(b.open), "h": repr(b.high), "l": repr(b.low), "c": repr(b.close)}}
+                for ts, b, ok in rows]
+
+
+@pytest.fixture
+def oanda(monkeypatch):
+    fake = FakeOanda(synthetic_ohlc(4000))
+    monkeypatch.setattr(data, "_fetch_candles", fake)
+    monkeypatch.setattr(data, "_candle_cache", {})
+    return fake
+
+
+def _walk(oanda, fetch, start=2600, stop=3900, step=7) -> list:
+    oanda.now = start
+    seed = data.get_candles("XAU_USD", "60", 200)
+    out  = [seed]
+    for now in range(start + step, stop, step):
+        oanda.now = now
+        out.append(fetch(now))
+    return out
+
+
+def test_derived_window_matches_polling(oanda, monkeypatch):
+    polled = _walk(oanda, lambda now: data.get_candles("XAU_USD", "60", 200))
+
+    monkeypatch.setattr(data, "_candle_cache", {})
+    derived = _walk(oanda, lambda now: data.derive_candles("XAU_USD", "60", 200,
+                                                           oanda.m5.iloc[:now].tail(500)))
+
+    assert len(polled[0]) == 199                      # forming bar dropped
+    for p, d in zip(polled, derived):
+        assert len(d) == len(p) == 199
+        assert d.index.equals(p.index)
+        np.testing.assert_allclose(d["close"].to_numpy(), p["close"].to_numpy())
+        np.testing.assert_allclose(d["high"].to_numpy(), p["high"].to_numpy())
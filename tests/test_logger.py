@@ -0,0 +1,110 @@
+import numpy as np
+
+import analytics
+import logger
+
+OLD_DTYPE = np.dtype([("timestamp", "M8[us]"), ("instrument", "S12"), ("price", "f8")])
+NEW_DTYPE = np.dtype([("timestamp", "M8[us]"), ("instrument", "S12"), ("price", "f8"), ("flag", "?")])
+
+
+def _records(dtype, n, price, start="2025-04-02T08:00"):
+    rec = np.zeros(n, dtype=dtype)
+    rec["timestamp"]  = np.datetime64(start, "us") + np.arange(n) * np.timedelta64(5, "m")
+    rec["instrument"] = b"XAU_USD"
+    rec["price"]      = price
+    return rec
+
+
+def _write(directory, records):
+    journal = logger.DecisionJournal(str(directory))
+    for i in range(len(records)):
+        journal.write(records[i:i + 1])
+    journal.close()
+
+
+def test_schema_change_mid_day_starts_new_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", OLD_DTYPE)
+    _write(tmp_path, _records(OLD_DTYPE, 40, 2000.0))
+
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", NEW_DTYPE)
+    _write(tmp_path, _records(NEW_DTYPE, 30, 2100.0, start="2025-04-02T12:00"))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "decisions-2025-04-02-1.bin", "decisions-2025-04-02.bin"]
+
+    df = logger.read_journal(directory=str(tmp_path))
+    assert len(df) == 70
+    assert (df["price"].iloc[:40] == 2000.0).all()
+    assert (df["price"].iloc[40:] == 2100.0).all()
+    assert df["flag"].iloc[:40].isna().all()
+
+
+def test_same_schema_appends_and_drops_torn_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", NEW_DTYPE)
+    _write(tmp_path, _records(NEW_DTYPE, 10, 2000.0))
+    path = tmp_path / "decisions-2025-04-02.bin"
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")                       # crash mid-record
+
+    _write(tmp_path, _records(NEW_DTYPE, 5, 2100.0, start="2025-04-02T12:00"))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["decisions-2025-04-02.bin"]
+    df = logger.read_journal(directory=str(tmp_path))
+    assert len(df) == 15
+    assert (df["price"].iloc[10:] == 2100.0).all()
+
+
+def test_rollover_compresses_every_file_of_the_finished_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", OLD_DTYPE)
+    _write(tmp_path, _records(OLD_DTYPE, 3, 2000.0))
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", NEW_DTYPE)
+    _write(tmp_path, np.concatenate([_records(NEW_DTYPE, 3, 2100.0, start="2025-04-02T12:00"),
+                                     _records(NEW_DTYPE, 3, 2200.0, start="2025-04-03T08:00")]))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "decisions-2025-04-02-1.bin.gz", "decisions-2025-04-02.bin.gz", "decisions-2025-04-03.bin"]
+    assert len(logger.read_journal(directory=str(tmp_path))) == 9
+
+
+def test_check_columns_upgrade_keeps_earlier_records(tmp_path, monkeypatch):
+    # The layout before the per-check trend columns were added
+    pre_checks = np.dtype([d for d in logger.JOURNAL_DTYPE.descr if not d[0].startswith("check_")])
+    day        = np.datetime_as_string(np.datetime64("now", "D"))
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", pre_checks)
+    _write(tmp_path, _records(pre_checks, 20, 2000.0, start=f"{day}T00:00"))
+    monkeypatch.undo()
+
+    journal = logger.DecisionJournal(str(tmp_path))
+    monkeypatch.setattr(logger, "_journal", journal)
+    trend = {"close": 2100.0, "direction": "bullish", "checks": {"adx_ok": True}}
+    for _ in range(3):
+        logger.log_decision(trend, {"direction": "bullish"}, {}, {"status": "skipped"}, instrument="XAU_USD")
+    journal.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"decisions-{day}-1.bin", f"decisions-{day}.bin"]
+    df = logger.read_journal(directory=str(tmp_path))
+    assert len(df) == 23
+    assert (df["price"].iloc[:20] == 2000.0).all()
+    assert (df["price"].iloc[20:] == 2100.0).all()
+    assert df["check_adx_ok"].iloc[20:].astype(bool).all()
+    assert df["check_adx_ok"].iloc[:20].isna().all()
+
+
+def test_funnel_skips_rows_from_before_the_check_columns(tmp_path, monkeypatch):
+    pre_checks = np.dtype([d for d in logger.JOURNAL_DTYPE.descr if not d[0].startswith("check_")])
+    day        = np.datetime_as_string(np.datetime64("now", "D"))
+    monkeypatch.setattr(logger, "JOURNAL_DTYPE", pre_checks)
+    _write(tmp_path, _records(pre_checks, 20, 2000.0, start=f"{day}T00:00"))
+    monkeypatch.undo()
+
+    journal = logger.DecisionJournal(str(tmp_path))
+    monkeypatch.setattr(logger, "_journal", journal)
+    confirmed = {"close": 2100.0, "direction": "bullish", "checks": {c: True for c in analytics.TREND_CHECKS}}
+    rejected  = {"close": 2100.0, "direction": "bullish", "checks": {"adx_ok": True}}
+    for trend in (confirmed, rejected, rejected):
+        logger.log_decision(trend, {"direction": "bullish"}, {}, {"status": "skipped"}, instrument="XAU_USD")
+    journal.close()
+
+    r = analytics.report(logger.read_journal(directory=str(tmp_path)))
+    assert r["cycles"] == 3
+    assert r["confirmed"] == 1
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import backtest
+import main
+from config import ASSET_CONFIGS
+
+TRADE_ID = "101"
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    """One tracked trade that has closed at OANDA; run_cycle with every network call stubbed."""
+    state = main.InstrumentState(ASSET_CONFIGS[0])
+    state.tracked_trade.update({"trade_id": TRADE_ID, "side": "buy", "entry_price": 2000.0})
+    decided = []
+
+    monkeypatch.setattr(main, "_states", {state.instrument: state})
+    monkeypatch.setattr(main, "_last_transaction_id", None)
+    monkeypatch.setattr(main, "get_open_trades", lambda: {})
+    monkeypatch.setattr(main, "get_trade", lambda trade_id: {"id": trade_id, "state": "CLOSED",
+                                                             "averageClosePrice": "1990.0", "realizedPL": "-10"})
+    monkeypatch.setattr(main, "get_account_balance", lambda: 1000.0)
+    monkeypatch.setattr(main, "alert_trade_closed", lambda **kwargs: None)
+    monkeypatch.setattr(main, "get_candles", lambda *args: pd.DataFrame({"close": [2000.0]}))
+    monkeypatch.setattr(main, "needs_sync", lambda *args: False)
+    monkeypatch.setattr(main, "derive_candles", lambda *args: pd.DataFrame())
+    monkeypatch.setattr(main, "compute_trends", lambda frames: dict.fromkeys(frames))
+    monkeypatch.setattr(main, "_decide", lambda state, trend, has_position: decided.append(state.instrument))
+    monkeypatch.setattr(main._tx_stream_connected, "is_set", lambda: False)
+    return state, decided
+
+
+def _skipped_cycles(state, decided) -> int:
+    for cycle in range(1, 10):
+        main.run_cycle([state])
+        if decided:
+            return cycle - 1
+    raise AssertionError("never traded again")
+
+
+@pytest.mark.parametrize("noticed_by", ["polling", "fetch_loop", "transaction"])
+def test_cooldown_skips_as_many_cycles_as_backtest(bot, monkeypatch, noticed_by):
+    state, decided = bot
+    if noticed_by == "fetch_loop":
+        # Stream connected but it missed the fill: seen only after the cooldown check
+        monkeypatch.setattr(main._tx_stream_connected, "is_set", lambda: True)
+    elif noticed_by == "transaction":
+        # Stream applies the fill between two cycles
+        main._on_transaction({"id": "7", "type": "ORDER_FILL", "accountBalance": "990",
+                              "tradesClosed": [{"tradeID": TRADE_ID, "price": "1990.0", "realizedPL": "-10"}]})
+
+    assert _skipped_cycles(state, decided) == backtest.COOLDOWN_CYCLES == 2
+    assert state.sl_hits_today == 1
+    assert state.tracked_trade["trade_id"] is None
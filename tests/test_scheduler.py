@@ -0,0 +1,55 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import scheduler
+
+
+def _run_for(sched: scheduler.Scheduler, seconds: float):
+    async def main():
+        try:
+            await asyncio.wait_for(sched._main(), seconds)
+        except asyncio.TimeoutError:
+            pass
+    asyncio.run(main())
+
+
+def test_slow_job_does_not_hold_up_other_groups():
+    ran  = []
+    sched = scheduler.Scheduler()
+    sched.every("calendar", lambda: time.sleep(1.0), seconds=0.05)
+    sched.every("cycle", lambda: ran.append(time.monotonic()), seconds=0.2, group="trading")
+    _run_for(sched, 1.5)
+
+    gaps = [b - a for a, b in zip(ran, ran[1:])]
+    assert len(ran) >= 5
+    assert max(gaps) < 0.5
+
+
+def test_jobs_in_one_group_never_overlap():
+    running, overlaps = [0], []
+
+    def job():
+        running[0] += 1
+        overlaps.append(running[0])
+        time.sleep(0.1)
+        running[0] -= 1
+
+    sched = scheduler.Scheduler()
+    sched.every("cycle", job, seconds=0.05, group="trading")
+    sched.every("daily_reset", job, seconds=0.05, group="trading")
+    _run_for(sched, 1.0)
+
+    assert len(overlaps) >= 4
+    assert max(overlaps) == 1
+
+
+def test_next_active_close_skips_inactive_bars():
+    step  = timedelta(minutes=5)
+    after = datetime(2026, 10, 16, 19, 52, 10, tzinfo=timezone.utc)    # a Friday
+    assert scheduler.next_bar_close(after, step) == datetime(2026, 10, 16, 19, 55, tzinfo=timezone.utc)
+
+    weekday_day = lambda close: close.weekday() < 5 and 7 <= close.hour < 20
+    assert scheduler.next_active_close(after.replace(hour=20), step, weekday_day) == \
+        datetime(2026, 10, 19, 7, 0, tzinfo=timezone.utc)
+    assert scheduler.next_active_close(after, step, lambda close: False) is None
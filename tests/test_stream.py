@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import stream
+
+START = pd.Timestamp("2025-01-06 10:00", tz="UTC")
+
+
+class _Stop(BaseException):
+    """Ends the client's reconnect loop from outside."""
+
+
+def _ts(t: pd.Timestamp) -> str:
+    return t.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+
+
+@pytest.fixture
+def ticks(tmp_path):
+    """Ticks every 20s for 12 minutes, a heartbeat mid-bar and one that closes the last bars."""
+    rng    = np.random.default_rng(11)
+    times  = START + pd.to_timedelta(np.arange(36) * 20, unit="s")
+    prices = np.round(2000 + np.cumsum(rng.normal(0, 0.5, len(times))), 2)
+    msgs   = [{"type": "PRICE", "instrument": "XAU_USD", "time": _ts(t),
+               "bids": [{"price": f"{p - 0.1:.2f}"}], "asks": [{"price": f"{p + 0.1:.2f}"}]}
+              for t, p in zip(times, prices)]
+    msgs.insert(11, {"type": "HEARTBEAT", "time": _ts(START + pd.Timedelta(seconds=215))})
+    msgs.append({"type": "HEARTBEAT", "time": _ts(START + pd.Timedelta(minutes=15))})
+
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(m) for m in msgs) + "\n")
+    mids = pd.Series(prices, index=times)
+    return path, mids
+
+
+def _expected(mids: pd.Series, rule: str) -> list:
+    ohlc = mids.resample(rule).agg(["first", "max", "min", "last", "count"]).dropna()
+    return [(ts.timestamp(), r["first"], r["max"], r["min"], r["last"], r["count"]) for ts, r in ohlc.iterrows()]
+
+
+def test_stream_bars_over_replay(ticks, monkeypatch):
+    path, mids = ticks
+    monkeypatch.setattr(stream, "BACKOFF_START", 0.05)
+    server = stream.serve_replay(str(path), port=0, background=True)
+    url    = f"http://127.0.0.1:{server.server_address[1]}"
+
+    bars = []
+
+    def consume():
+        try:
+            for instrument, g, bar in stream.stream_bars(["XAU_USD"], granularities=("M1", "M5"), url=url):
+                bars.append((instrument, g, dict(bar)))
+        except _Stop:
+            pass
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    # Let the server close the stream and the client come back a few times
+    deadline = time.monotonic() + 10
+    while (server.connections < 3 or len(bars) < 15) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.2)
+
+    class Refuse:
+        def get(self, *args, **kwargs):
+            raise _Stop()
+    monkeypatch.setattr(stream, "oanda_session", Refuse())
+    server.shutdown()
+    server.server_close()
+    consumer.join(5)
+    assert not consumer.is_alive()
+
+    assert server.connections >= 3
+    got = {g: [(b["timestamp"], b["open"], b["high"], b["low"], b["close"], b["volume"])
+               for i, gg, b in bars if gg == g] for g in ("M1", "M5")}
+    assert all(i == "XAU_USD" for i, _, _ in bars)
+
+    # Every bar exactly once: replayed ticks after a reconnect are older and dropped
+    for g, rule in (("M1", "1min"), ("M5", "5min")):
+        want = _expected(mids, rule)
+        assert len(got[g]) == len(want), g
+        for a, b in zip(got[g], want):
+            assert a[0] == b[0] and a[5] == b[5]
+            np.testing.assert_allclose(a[1:5], b[1:5])
+
+    # The final M5 bar (10:10) has no tick after it — only the heartbeat closes it
+    assert got["M5"][-1][0] == (START + pd.Timedelta(minutes=10)).timestamp()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from technicals import (
+    StreamingIndicators, compute_adx, compute_atr, compute_ema, get_ema_slope, indicator_kernel,
+)
+
+RTOL = 1e-9
+
+
+def _ohlc(n: int, seed: int, flat: slice = None) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 2000.0 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high  = np.maximum(open_, close) + rng.random(n) * 2
+    low   = np.minimum(open_, close) - rng.random(n) * 2
+    if flat is not None:
+        # A quiet stretch: every price equal, no range, no directional move
+        high[flat] = low[flat] = close[flat] = close[flat.start - 1]
+    index = pd.date_range("2025-01-06", periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+
+
+def _replay(df: pd.DataFrame, **kwargs) -> dict:
+    """Every StreamingIndicators output after each bar."""
+    state = StreamingIndicators(**kwargs)
+    out   = {k: np.empty(len(df)) for k in ("ema_fast", "ema_slow", "adx", "atr", "atr_mean", "slope")}
+    for i, (h, l, c) in enumerate(zip(df["high"], df["low"], df["close"])):
+        state.update(float(h), float(l), float(c))
+        out["ema_fast"][i] = state.ema_fast
+        out["ema_slow"][i] = state.ema_slow
+        out["adx"][i]      = state.adx
+        out["atr"][i]      = state.atr
+        out["atr_mean"][i] = state.atr_average
+        out["slope"][i]    = state.slope
+    return out
+
+
+CASES = [
+    ("random", _ohlc(600, 1)),
+    ("flat_run", _ohlc(600, 2, flat=slice(200, 260))),
+    ("flat_start", _ohlc(300, 3, flat=slice(1, 40))),
+    ("warmup_only", _ohlc(12, 4)),
+]
+
+
+@pytest.mark.parametrize("name,df", CASES, ids=[c[0] for c in CASES])
+def test_streaming_matches_batch(name, df):
+    got = _replay(df, ema_fast=9, ema_slow=50, adx_period=14)
+
+    np.testing.assert_allclose(got["ema_fast"], compute_ema(df["close"], 9), rtol=RTOL)
+    np.testing.assert_allclose(got["ema_slow"], compute_ema(df["close"], 50), rtol=RTOL)
+    np.testing.assert_allclose(got["adx"], compute_adx(df, 14), rtol=RTOL, atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(got["atr"], compute_atr(df, 14), rtol=RTOL, equal_nan=True)
+
+
+@pytest.mark.parametrize("name,df", CASES, ids=[c[0] for c in CASES])
+def test_streaming_matches_kernel(name, df):
+    got    = _replay(df, ema_fast=9, ema_slow=50, adx_period=14)
+    kernel = indicator_kernel(df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy(),
+                              ema_fast=9, ema_slow=50, adx_period=14)
+
+    for row in ("ema_fast", "ema_slow", "atr", "atr_mean"):
+        np.testing.assert_allclose(got[row], kernel[row], rtol=RTOL, equal_nan=True, err_msg=row)
+    np.testing.assert_allclose(got["adx"], kernel["adx"], rtol=RTOL, atol=1e-9, equal_nan=True)
+
+    fast  = pd.Series(kernel["ema_fast"])
+    slope = [get_ema_slope(fast.iloc[:i + 1], 5) for i in range(len(df))]
+    np.testing.assert_allclose(got["slope"], slope, rtol=RTOL, atol=1e-9)
+
+
+def test_from_frame_then_update_matches_replay():
+    df    = _ohlc(400, 5)
+    state = StreamingIndicators.from_frame(df.iloc[:300], ema_fast=9, ema_slow=50, adx_period=14)
+    for h, l, c in zip(df["high"].iloc[300:], df["low"].iloc[300:], df["close"].iloc[300:]):
+        state.update(float(h), float(l), float(c))
+
+    assert state.bars == 400
+    assert state.ema_slow == pytest.approx(compute_ema(df["close"], 50).iloc[-1], rel=RTOL)
+    assert state.adx == pytest.approx(compute_adx(df, 14).iloc[-1], rel=RTOL)
+    assert state.atr == pytest.approx(compute_atr(df, 14).iloc[-1], rel=RTOL)